@@ -1,9 +1,11 @@
-from collections import defaultdict
 from dataclasses import dataclass, field
 from api.classes import Agent, AvailableActions, Action, Observation, Rules
 import random
-import openai
-import api.util as util
+from agents.llm_batching import get_broker
+from agents.llm_cache import LLMCache, get_cache
+from agents.llm_client import get_scheduler
+from agents.llm_metrics import metrics, tagged
+from typing import ClassVar, Optional
 import ast
 import json
 from PIL import Image
@@ -28,19 +30,35 @@ Return actions in json with the following keys.
 Include the openended response only if you have chosen an openended action.
 """
 
-openai_client = openai.Client(
-    api_key=util.load_json("credentials.json")["openai_api_key"]
-)
+def create_completion(**kwargs):
+    """Send a chat completion through the shared, rate-limited client for our API key."""
+    return get_scheduler().chat_completion(**kwargs)
 
-tokens = defaultdict(int)
-def completions(*args, **kwargs):
-    ret = openai_client.chat.completions.create(*args, **kwargs)
+def load_completion(data):
+    from openai.types.chat import ChatCompletion
+    return ChatCompletion.model_validate_json(data)
 
-    model = kwargs["model"]
-    tokens[f"{model}_input"] += ret.usage.prompt_tokens
-    tokens[f"{model}_output"] += ret.usage.completion_tokens
-    print("*******************", tokens)
-    return ret
+def completions(cache: Optional[LLMCache] = None, **kwargs):
+    """Chat completion, served from cache when one is given. Cache hits cost no tokens.
+    Tokens and latency are recorded in agents.llm_metrics.metrics."""
+    with metrics.timed("completion", kwargs["model"]) as call:
+        if cache is None:
+            response = create_completion(**kwargs)
+        else:
+            created = []
+            def create(**kwargs):
+                created.append(True)
+                return create_completion(**kwargs)
+            response = cache.cached(
+                kwargs,
+                create,
+                dump=lambda response: response.model_dump_json(),
+                load=load_completion,
+            )
+            call["cached"] = not created
+        call["prompt_tokens"] = response.usage.prompt_tokens
+        call["completion_tokens"] = response.usage.completion_tokens
+    return response
 
 @dataclass
 class OpenAITextAgent(Agent):
@@ -50,11 +68,52 @@ class OpenAITextAgent(Agent):
     max_retries: int = 3
     transparent_reasoning: bool = False
     mode: int = 0  # 0 = normal, 1 = chain of thought, 2 = babble and prune
+    cache_path: Optional[str] = None  # e.g. "llm_cache.sqlite" to cache responses on disk
+    cache_max_entries: int = 100_000
+    cache_replay: bool = False  # only serve cached responses and never call the API
+    turn: int = field(default=0, init=False, repr=False)  # number of take_action calls, used to tag LLM metrics
+    prefixes: dict = field(default_factory=dict, init=False, repr=False)  # game title -> (messages, details_dict)
+
+    @property
+    def cache(self) -> Optional[LLMCache]:
+        if self.cache_path is None:
+            return None
+        return get_cache(self.cache_path, self.cache_max_entries, self.cache_replay)
 
     def print(self, *args, **kwargs):
         if self.transparent_reasoning:
             print(self.agent_type_id, *args, **kwargs)
 
+    def complete(self, messages, **kwargs) -> str:
+        """The reply to messages. kwargs are passed on to the chat completion."""
+        return completions(cache=self.cache, messages=messages, **kwargs).choices[0].message.content
+
+    def rules_prefix(self, rules: Rules):
+        """
+        The messages every request in this game starts with (system message, rules and the headings of
+        additional details), and the headings by key. They are built once per game and never change, and
+        everything that varies comes after them, so provider-side prompt caching and KV-cache reuse in
+        local backends cover the rules on every turn and retry.
+        """
+        if rules.title not in self.prefixes:
+            prompt = f"You are playing a game called {rules.title}. The rules are as follows:\n{rules.summary}\n"
+            details_dict = {}
+            if rules.additional_details != None:
+                prompt += "The following are headings with additional information about the rules that you can expand by taking the action Explain(<heading key>).\n"
+                details_dict = {
+                    f"H{i+1}": topic for i, topic in enumerate(rules.additional_details)
+                }
+                prompt += json.dumps(details_dict, indent=4)
+                #valid_actions.extend(f"Explain({h})" for h in list(details_dict.keys()))
+            self.prefixes[rules.title] = (
+                [
+                    {"role": "system", "content": self.system_message},
+                    {"role": "user", "content": prompt},
+                ],
+                details_dict,
+            )
+        return self.prefixes[rules.title]
+
     def take_action(
         self,
         rules: Rules,
@@ -62,18 +121,20 @@ class OpenAITextAgent(Agent):
         available_actions: AvailableActions,
         show_state: bool,
     ):
-        messages = [{"role": "system", "content": self.system_message}]
+        self.turn += 1
+        with tagged(agent=self.agent_type_id, turn=self.turn), metrics.timed("decision", self.openai_model):
+            return self.decide(rules, observation, available_actions)
+
+    def decide(
+        self,
+        rules: Rules,
+        observation: Observation,
+        available_actions: AvailableActions,
+    ):
+        prefix, details_dict = self.rules_prefix(rules)
+        messages = list(prefix)
         valid_actions = []
-        prompt = f"You are playing a game called {rules.title}. The rules are as follows:\n{rules.summary}\n"
-        if rules.additional_details != None:
-            prompt += "The following are headings with additional information about the rules that you can expand by taking the action Explain(<heading key>).\n"
-            details_dict = {
-                f"H{i+1}": topic for i, topic in enumerate(rules.additional_details)
-            }
-            prompt += json.dumps(details_dict, indent=4)
-            #valid_actions.extend(f"Explain({h})" for h in list(details_dict.keys()))
-
-        prompt += f"\n# Observation\nThe following describes the current state of the game:\n{observation.text}\n"
+        prompt = f"# Observation\nThe following describes the current state of the game:\n{observation.text}\n"
         if observation.image is not None:
             if self.openai_model == "gpt-4-1106-preview":
                 self.print("Image observation recieved.")
@@ -98,12 +159,12 @@ class OpenAITextAgent(Agent):
             else:
                 self.print("Image observation recieved. Using GPT4 to generate text description.")
                 buffered = BytesIO()
-                image.save(buffered, format="JPEG")
+                observation.image.save(buffered, format="JPEG")
                 base64_image = base64.b64encode(buffered.getvalue())
 
-                imagedesc = completions(
-                    model="gpt-4-vision-preview",
-                    messages=[
+                imagedesc = self.complete(
+                    [
+                        *prefix,
                         {
                             "role": "user",
                             "content": [
@@ -118,7 +179,8 @@ class OpenAITextAgent(Agent):
                             ],
                         }
                     ],
-                ).choices[0].message.content
+                    model="gpt-4-vision-preview",
+                )
                 prompt += imagedesc
                 observation.image = None
 
@@ -153,15 +215,11 @@ class OpenAITextAgent(Agent):
             prompt += "First, let's reason out loud about which action you should take to maximize your probability of winning."
             messages.append({"role": "user", "content": prompt})
 
-            response = (
-                completions(
-                    model=self.openai_model
-                    if observation.image is None
-                    else "gpt-4-vision-preview",
-                    messages=messages,
-                )
-                .choices[0]
-                .message.content
+            response = self.complete(
+                messages,
+                model=self.openai_model
+                if observation.image is None
+                else "gpt-4-vision-preview",
             )
             messages.append({"role": "assistant", "content": response})
             prompt = ""
@@ -174,15 +232,11 @@ class OpenAITextAgent(Agent):
             prompt += str(list(valid_actions))
 
             messages.append({"role": "user", "content": prompt})
-            response = (
-                completions(
-                    model=self.openai_model
-                    if observation.image is None
-                    else "gpt-4-vision-preview",
-                    messages=messages,
-                )
-                .choices[0]
-                .message.content
+            response = self.complete(
+                messages,
+                model=self.openai_model
+                if observation.image is None
+                else "gpt-4-vision-preview",
             )
             messages.append({"role": "assistant", "content": response})
             prompt = ""
@@ -196,18 +250,15 @@ class OpenAITextAgent(Agent):
         messages.append({"role": "user", "content": prompt})
 
         result = None
-        for _ in range(self.max_retries):
-            response = (
-                completions(
+        for retry in range(self.max_retries):
+            with tagged(retry=retry):
+                response = self.complete(
+                    messages,
                     model=self.openai_model
                     if observation.image is None
                     else "gpt-4-vision-preview",
                     response_format={"type": "json_object"},
-                    messages=messages,
                 )
-                .choices[0]
-                .message.content
-            )
             messages.append({"role": "assistant", "content": response})
             self.print("GPT responded with", response)
 
@@ -216,6 +267,9 @@ class OpenAITextAgent(Agent):
                 action["action"]
             except:
                 self.print("GPT returned invalid JSON")
+                # Retries only append to the conversation, so every request extends the cached prefix of the last.
+                error_message = "Your response must be a json with an 'action' key."
+                messages.append({"role": "user", "content": error_message})
                 continue
 
             if (
@@ -256,9 +310,7 @@ class OpenAITextAgent(Agent):
                 break
 
             self.print("GPT returned invalid action", action)
-            error_message = f"{action['action']} is not one of the valid actions. "
-            error_message += "As a reminder, the valid actions are as follows:\n"
-            error_message += f"{str(list(valid_actions))}\n"
+            error_message = f"{action['action']} is not one of the valid actions listed above. "
             error_message += "Please return a json with the key 'action' with the action you choose and (optionally) the key 'openended_response' if you select openended response action."
             messages.append({"role": "user", "content": error_message})
         if result == None:
@@ -307,4 +359,36 @@ class GPT4CoT(OpenAITextAgent):
 class GPT4BaP(OpenAITextAgent):
     openai_model: str = "gpt-4-1106-preview"
     agent_type_id: str = "gpt-4-bap"
-    mode: int = 2
\ No newline at end of file
+    mode: int = 2
+
+
+def messages_to_prompt(messages):
+    """Flatten chat messages into a plain prompt for completion models, keeping only text content."""
+    lines = []
+    for message in messages:
+        content = message["content"]
+        if not isinstance(content, str):
+            content = "\n".join(part["text"] for part in content if part["type"] == "text")
+        lines.append(f"{message['role'].capitalize()}: {content}")
+    return "\n\n".join(lines) + "\n\nAssistant:"
+
+@dataclass
+class LocalTextAgent(OpenAITextAgent):
+    """
+    OpenAITextAgent on a local reasoners LanguageModel, e.g. agents.rap.reasoners.lm.hf_model.HFModel.
+    The model is loaded once per process and the prompts of every game played concurrently in it
+    are batched into its generate calls (see agents.llm_batching).
+    """
+    openai_model: str = "local"
+    agent_type_id: str = "local"
+    model_path: str = None
+    model_kwargs: dict = field(default_factory=dict)
+    max_batch_size: Optional[int] = None  # defaults to the model's max_batch_size
+    max_wait: float = 0.05  # seconds a prompt waits for others to join its batch
+    generate_kwargs: dict = field(default_factory=lambda: {"max_new_tokens": 256})
+    # Every process playing with this agent loads its own copy of the model, see api.tournament.
+    loads_local_model: ClassVar[bool] = True
+
+    def complete(self, messages, **kwargs) -> str:
+        broker = get_broker(self.model_path, self.model_kwargs, self.max_batch_size, self.max_wait)
+        return broker.generate(messages_to_prompt(messages), **self.generate_kwargs)
@@ -0,0 +1,102 @@
+import json
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future
+
+import api.util as util
+
+
+class BatchingBroker:
+    """
+    Collects prompts from many concurrent games and sends them to a reasoners LanguageModel as
+    batched generate calls.
+
+    Prompts with the same generation arguments are queued together. A queue is flushed as one
+    generate call once it holds max_batch_size prompts, or max_wait seconds after its oldest prompt
+    arrived. Every call runs on the broker's worker thread, so the model is never used concurrently.
+    """
+
+    def __init__(self, model, max_batch_size=None, max_wait=0.05):
+        self.model = model
+        self.max_batch_size = max_batch_size or getattr(model, "max_batch_size", None) or 8
+        self.max_wait = max_wait
+        self.batches = 0
+        self.prompts = 0
+        self._pending = defaultdict(list)  # generation arguments -> [(prompt, future)]
+        self._deadlines = {}
+        self._condition = threading.Condition()
+        self._worker = None
+
+    def submit(self, prompt, **kwargs) -> Future:
+        """Queue prompt and return a future of the list of texts generated for it."""
+        key = json.dumps(kwargs, sort_keys=True, default=str)
+        future = Future()
+        with self._condition:
+            if not self._pending[key]:
+                self._deadlines[key] = time.monotonic() + self.max_wait
+            self._pending[key].append((prompt, future))
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, daemon=True)
+                self._worker.start()
+            self._condition.notify()
+        return future
+
+    def generate(self, prompt, **kwargs) -> str:
+        """Generate a completion of prompt in whichever batch it lands in."""
+        return self.submit(prompt, **kwargs).result()[0]
+
+    def _next_batch(self):
+        now = time.monotonic()
+        for key, pending in self._pending.items():
+            if len(pending) >= self.max_batch_size or now >= self._deadlines[key]:
+                batch, self._pending[key] = pending[:self.max_batch_size], pending[self.max_batch_size:]
+                if not self._pending[key]:
+                    del self._pending[key], self._deadlines[key]
+                return json.loads(key), batch
+        return None
+
+    def _run(self):
+        while True:
+            with self._condition:
+                batch = self._next_batch()
+                while batch is None:
+                    timeout = min(self._deadlines.values()) - time.monotonic() if self._deadlines else None
+                    self._condition.wait(timeout)
+                    batch = self._next_batch()
+            self._flush(*batch)
+
+    def _flush(self, kwargs, batch):
+        prompts = [prompt for prompt, _ in batch]
+        try:
+            texts = self.model.generate(prompts, **kwargs).text
+            if len(texts) < len(prompts) or len(texts) % len(prompts):
+                raise ValueError(f"{type(self.model).__name__}.generate returned {len(texts)} texts for {len(prompts)} prompts")
+        except BaseException as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        self.batches += 1
+        self.prompts += len(prompts)
+        # Backends return num_return_sequences texts per prompt, grouped by prompt.
+        n = len(texts) // len(prompts)
+        for i, (_, future) in enumerate(batch):
+            future.set_result(texts[i * n:(i + 1) * n])
+
+    def stats(self):
+        return {"batches": self.batches, "prompts": self.prompts, "mean_batch_size": self.prompts / self.batches if self.batches else 0.0}
+
+
+_brokers = {}
+_brokers_lock = threading.Lock()
+def get_broker(model_path, model_kwargs={}, max_batch_size=None, max_wait=0.05):
+    """
+    Return the broker for the model built by util.import_class(model_path)(**model_kwargs), loading
+    the model once per process so that every agent in every game played here shares its batches.
+    """
+    key = (model_path, json.dumps(model_kwargs, sort_keys=True))
+    with _brokers_lock:
+        if key not in _brokers:
+            model = util.import_class(model_path)(**model_kwargs)
+            _brokers[key] = BatchingBroker(model, max_batch_size=max_batch_size, max_wait=max_wait)
+        return _brokers[key]
@@ -0,0 +1,107 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class CacheMiss(KeyError):
+    """Raised in replay mode when a request has no cached response."""
+
+
+class LLMCache:
+    """
+    Content-addressed on-disk cache of LLM responses, stored in SQLite.
+
+    Entries are keyed on a hash of the model, messages and sampling parameters. When more than
+    max_entries responses are stored, the least recently used ones are evicted. In replay mode
+    the cache is read-only and a miss raises CacheMiss instead of calling the API.
+    """
+
+    def __init__(self, path="llm_cache.sqlite", max_entries=100_000, replay=False):
+        self.path = path
+        self.max_entries = max_entries
+        self.replay = replay
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Shared by the threads that run take_action_async; access is serialized by self._lock.
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, response TEXT NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+
+    @staticmethod
+    def make_key(**request):
+        """Hash every argument of a completion request (model, messages, sampling parameters, ...)."""
+        return hashlib.sha256(json.dumps(request, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            row = self._db.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            if not self.replay:
+                self._db.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+            return row[0]
+
+    def put(self, key, response):
+        if self.replay:
+            return
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, response, last_access) VALUES (?, ?, ?)",
+                (key, response, time.time()),
+            )
+            excess = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_entries
+            if excess > 0:
+                self._db.execute(
+                    "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY last_access LIMIT ?)",
+                    (excess,),
+                )
+
+    def cached(self, request, create, dump, load):
+        """
+        Return the cached response for request (a dict of completion kwargs), or call create(**request),
+        store dump(response) and return it. load turns a stored string back into a response.
+        """
+        key = self.make_key(**request)
+        stored = self.get(key)
+        if stored is not None:
+            return load(stored)
+        if self.replay:
+            raise CacheMiss(f"No cached response for request {key} in replay mode")
+        response = create(**request)
+        self.put(key, dump(response))
+        return response
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0}
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+_caches = {}
+def get_cache(path, max_entries=100_000, replay=False):
+    """
+    Return the cache for path, opening it once per process so agents created every match share it.
+    Every agent sharing a cache must ask for the same max_entries, since it bounds the whole file.
+    """
+    key = (path, replay)
+    if key not in _caches:
+        _caches[key] = LLMCache(path, max_entries=max_entries, replay=replay)
+    elif _caches[key].max_entries != max_entries:
+        raise ValueError(f"The cache {path} is already open with max_entries={_caches[key].max_entries}, not {max_entries}")
+    return _caches[key]
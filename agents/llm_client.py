@@ -0,0 +1,212 @@
+import functools
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future
+
+import api.util as util
+from agents.llm_cache import LLMCache
+
+# Default quota of one API key. Override with OPENAI_RPM / OPENAI_TPM or get_scheduler(rpm=..., tpm=...).
+DEFAULT_RPM = 500
+DEFAULT_TPM = 300_000
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at per_minute tokens per minute, holding at most
+    capacity (a minute's worth by default). Callers block in acquire until their amount is available.
+    """
+
+    def __init__(self, per_minute, capacity=None):
+        self.per_minute = per_minute
+        self.capacity = capacity if capacity is not None else per_minute
+        self.available = self.capacity
+        self._updated = time.monotonic()
+        self._condition = threading.Condition()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self._updated) * self.per_minute / 60)
+        self._updated = now
+
+    def acquire(self, amount=1):
+        # A request larger than the bucket waits for a full bucket rather than forever.
+        amount = min(amount, self.capacity)
+        with self._condition:
+            while True:
+                self._refill()
+                if self.available >= amount:
+                    self.available -= amount
+                    return
+                self._condition.wait((amount - self.available) * 60 / self.per_minute)
+
+    def adjust(self, amount):
+        """Give back (amount > 0) or take (amount < 0) tokens, e.g. once a request's real size is known."""
+        with self._condition:
+            self._refill()
+            self.available = min(self.capacity, self.available + amount)
+            self._condition.notify_all()
+
+    def pause(self, seconds):
+        """Empty the bucket so that it takes at least seconds to refill, e.g. on a Retry-After header."""
+        with self._condition:
+            self._refill()
+            self.available = min(self.available, -seconds * self.per_minute / 60)
+
+
+def backoff(attempt, base=1.0, cap=60.0):
+    """Exponential backoff with full jitter: a uniform wait in [0, min(cap, base * 2 ** attempt)]."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def retry_after(error):
+    """The wait the server asked for in a Retry-After header, if any."""
+    response = getattr(error, "response", None)
+    try:
+        return float(response.headers["retry-after"])
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return None
+
+
+def estimate_tokens(request):
+    """Rough token count of a request before it is sent: ~4 characters per prompt token plus the completion budget."""
+    prompt = request.get("messages", request.get("prompt", ""))
+    return len(json.dumps(prompt, default=str)) // 4 + (request.get("max_tokens") or 256) * request.get("n", 1)
+
+
+def is_deterministic(request):
+    """Whether a request asks for a single greedy completion, so that identical requests get the same answer."""
+    return request.get("temperature") == 0 and request.get("n") in (None, 1)
+
+
+class RequestScheduler:
+    """
+    Sends requests through one pooled openai.Client per API key and endpoint.
+
+    Every request first takes one request from a requests-per-minute bucket and its estimated
+    tokens from a tokens-per-minute bucket; once the response reports its usage, the estimate is
+    corrected. Requests that fail with a rate limit, timeout, connection or server error are
+    retried with jittered exponential backoff, honouring Retry-After. Identical deterministic
+    requests (temperature 0, one completion) in flight at the same time are coalesced: only the
+    first is sent and every caller gets its response. Sampling requests are always sent, since
+    their callers expect independent samples.
+    """
+
+    def __init__(self, api_key=None, base_url=None, rpm=DEFAULT_RPM, tpm=DEFAULT_TPM, max_retries=8,
+                 timeout=120, coalesce=True):
+        # openai takes most of a second to import, so it is only loaded once a scheduler is needed.
+        import openai
+        # The client keeps an HTTP connection pool; its own retries are disabled in favour of ours.
+        self.client = openai.Client(api_key=api_key, base_url=base_url, max_retries=0, timeout=timeout)
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.max_retries = max_retries
+        self.coalesce = coalesce
+        self.sent = 0
+        self.retries = 0
+        self.coalesced = 0
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def chat_completion(self, **request):
+        return self.submit(self.client.chat.completions.create, **request)
+
+    def completion(self, **request):
+        return self.submit(self.client.completions.create, **request)
+
+    def submit(self, create, **request):
+        """Call create(**request) within the rate limits, retrying and coalescing as described above."""
+        if not self.coalesce or not is_deterministic(request):
+            return self._send(create, request)
+
+        key = (create.__qualname__, LLMCache.make_key(**request))
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            return future.result()
+
+        try:
+            future.set_result(self._send(create, request))
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+        return future.result()
+
+    def _send(self, create, request):
+        import openai
+        # Errors worth retrying: rate limits, timeouts, dropped connections and server errors.
+        retryable = (openai.RateLimitError, openai.APITimeoutError, openai.APIConnectionError, openai.InternalServerError)
+        estimate = estimate_tokens(request)
+        for attempt in range(self.max_retries + 1):
+            self.requests.acquire()
+            self.tokens.acquire(estimate)
+            try:
+                response = create(**request)
+            except retryable as e:
+                if attempt == self.max_retries:
+                    raise
+                self.retries += 1
+                self.tokens.adjust(estimate)
+                wait = retry_after(e)
+                if wait is None:
+                    wait = backoff(attempt)
+                if isinstance(e, openai.RateLimitError):
+                    # The quota is shared, so every request waits for it to recover, not just this one.
+                    self.requests.pause(wait)
+                else:
+                    time.sleep(wait)
+                continue
+            self.sent += 1
+            usage = getattr(response, "usage", None)
+            if usage is not None:
+                self.tokens.adjust(estimate - usage.total_tokens)
+            return response
+
+    def stats(self):
+        return {"sent": self.sent, "retries": self.retries, "coalesced": self.coalesced}
+
+
+@functools.lru_cache(maxsize=None)
+def default_api_key():
+    """The key in credentials.json, falling back to the OPENAI_API_KEY environment variable. Read once per process."""
+    if os.path.exists("credentials.json"):
+        return util.load_json("credentials.json")["openai_api_key"]
+    return os.environ.get("OPENAI_API_KEY")
+
+
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+def get_scheduler(api_key=None, base_url=None, rpm=None, tpm=None):
+    """
+    Return the scheduler for (api_key, base_url), creating it once per process so every agent and
+    model using the same key shares its connections and quota. base_url defaults to OPENAI_BASE_URL,
+    which can point at a local stub server. rpm and tpm set the limits of a new scheduler, defaulting
+    to OPENAI_RPM / OPENAI_TPM; every caller sharing a scheduler must ask for the same limits.
+    """
+    api_key = api_key or default_api_key()
+    base_url = base_url or os.environ.get("OPENAI_BASE_URL")
+    with _schedulers_lock:
+        key = (api_key, base_url)
+        if key not in _schedulers:
+            _schedulers[key] = RequestScheduler(
+                api_key=api_key,
+                base_url=base_url,
+                rpm=rpm if rpm is not None else int(os.environ.get("OPENAI_RPM", DEFAULT_RPM)),
+                tpm=tpm if tpm is not None else int(os.environ.get("OPENAI_TPM", DEFAULT_TPM)),
+            )
+        scheduler = _schedulers[key]
+    if rpm is not None and scheduler.requests.per_minute != rpm:
+        raise ValueError(f"The scheduler for this key is already limited to rpm={scheduler.requests.per_minute}, not {rpm}")
+    if tpm is not None and scheduler.tokens.per_minute != tpm:
+        raise ValueError(f"The scheduler for this key is already limited to tpm={scheduler.tokens.per_minute}, not {tpm}")
+    return scheduler
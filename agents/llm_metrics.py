@@ -0,0 +1,214 @@
+import contextvars
+import fire
+import http.server
+import json
+import math
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, math.inf)
+
+# USD per 1k (prompt, completion) tokens. Models that are missing cost nothing, e.g. local ones.
+PRICES = {
+    "gpt-4-1106-preview": (0.01, 0.03),
+    "gpt-4-vision-preview": (0.01, 0.03),
+    "gpt-3.5-turbo-1106": (0.001, 0.002),
+}
+
+_tags = contextvars.ContextVar("llm_metrics_tags", default={})
+
+@contextmanager
+def tagged(**tags):
+    """Tag every call recorded in this block (and in threads started by asyncio.to_thread) with tags, e.g. agent, game, match and turn."""
+    token = _tags.set({**_tags.get(), **tags})
+    try:
+        yield
+    finally:
+        _tags.reset(token)
+
+
+class LLMMetrics:
+    """
+    Token, latency, retry and cache-hit accounting for every LLM call in the process.
+
+    Calls are aggregated in memory per (kind, model, agent) for the Prometheus text export. When a
+    path is set (or the LLM_METRICS_PATH environment variable), every call is also appended to it as
+    one JSON line with its tags, so tournaments' worker processes all write to the same file and
+    cost per match and latency percentiles can be computed afterwards with summarize.
+    """
+
+    def __init__(self, path=None):
+        self.path = path if path is not None else os.environ.get("LLM_METRICS_PATH")
+        self._lock = threading.Lock()
+        self._series = defaultdict(lambda: {
+            "calls": 0, "errors": 0, "cached": 0, "retries": 0,
+            "prompt_tokens": 0, "completion_tokens": 0,
+            "latency_sum": 0.0, "buckets": [0] * len(LATENCY_BUCKETS),
+        })
+
+    def record(self, kind, model, latency, prompt_tokens=None, completion_tokens=None, cached=False, error=False, **tags):
+        event = {
+            "time": time.time(), "kind": kind, "model": model, "latency": latency,
+            "prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+            "cached": cached, "error": error, **_tags.get(), **tags,
+        }
+        self._aggregate(event)
+        if self.path:
+            self._append(event)
+
+    def _aggregate(self, event):
+        with self._lock:
+            series = self._series[event["kind"], event["model"], event.get("agent")]
+            series["calls"] += 1
+            series["errors"] += bool(event["error"])
+            series["cached"] += bool(event["cached"])
+            series["retries"] += event.get("retry", 0) > 0
+            if not event["cached"]:
+                series["prompt_tokens"] += event["prompt_tokens"] or 0
+                series["completion_tokens"] += event["completion_tokens"] or 0
+            series["latency_sum"] += event["latency"]
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if event["latency"] <= bound:
+                    series["buckets"][i] += 1
+
+    def _append(self, event):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            os.write(fd, (json.dumps(event, default=str) + "\n").encode("utf-8"))
+        finally:
+            os.close(fd)
+
+    @contextmanager
+    def timed(self, kind, model, **tags):
+        """
+        Time the block as one call. The block fills in the yielded dict with prompt_tokens,
+        completion_tokens and cached when it knows them. A call that raises is recorded as an error.
+        """
+        call = {}
+        start = time.perf_counter()
+        try:
+            yield call
+        except Exception:
+            call["error"] = True
+            raise
+        finally:
+            self.record(kind, model, time.perf_counter() - start, **call, **tags)
+
+    @classmethod
+    def load(cls, path="llm_metrics.jsonl"):
+        """Aggregate the calls logged in path."""
+        metrics = cls(path="")
+        for event in read_events(path):
+            metrics._aggregate(event)
+        return metrics
+
+    def prometheus_text(self):
+        lines = [
+            "# TYPE gamebench_llm_calls_total counter",
+            "# TYPE gamebench_llm_errors_total counter",
+            "# TYPE gamebench_llm_cache_hits_total counter",
+            "# TYPE gamebench_llm_retries_total counter",
+            "# TYPE gamebench_llm_tokens_total counter",
+            "# TYPE gamebench_llm_latency_seconds histogram",
+        ]
+        with self._lock:
+            for (kind, model, agent), series in sorted(self._series.items(), key=str):
+                labels = f'kind="{kind}",model="{model}",agent="{agent or ""}"'
+                lines.append(f"gamebench_llm_calls_total{{{labels}}} {series['calls']}")
+                lines.append(f"gamebench_llm_errors_total{{{labels}}} {series['errors']}")
+                lines.append(f"gamebench_llm_cache_hits_total{{{labels}}} {series['cached']}")
+                lines.append(f"gamebench_llm_retries_total{{{labels}}} {series['retries']}")
+                lines.append(f'gamebench_llm_tokens_total{{{labels},type="prompt"}} {series["prompt_tokens"]}')
+                lines.append(f'gamebench_llm_tokens_total{{{labels},type="completion"}} {series["completion_tokens"]}')
+                for bound, count in zip(LATENCY_BUCKETS, series["buckets"]):
+                    le = "+Inf" if bound == math.inf else bound
+                    lines.append(f'gamebench_llm_latency_seconds_bucket{{{labels},le="{le}"}} {count}')
+                lines.append(f"gamebench_llm_latency_seconds_sum{{{labels}}} {series['latency_sum']}")
+                lines.append(f"gamebench_llm_latency_seconds_count{{{labels}}} {series['calls']}")
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide metrics that every LLM backend records to.
+metrics = LLMMetrics()
+
+
+def read_events(path="llm_metrics.jsonl"):
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def percentile(values, q):
+    values = sorted(values)
+    if not values:
+        return None
+    return values[min(len(values) - 1, math.ceil(q / 100 * len(values)) - 1)]
+
+def cost(event):
+    if event["cached"]:
+        return 0.0
+    prompt_price, completion_price = PRICES.get(event["model"], (0.0, 0.0))
+    return ((event["prompt_tokens"] or 0) * prompt_price + (event["completion_tokens"] or 0) * completion_price) / 1000
+
+def summarize(path="llm_metrics.jsonl"):
+    """Per agent: decisions, p50/p95 decision latency, tokens, cost per match, cache hit rate and retries."""
+    by_agent = defaultdict(list)
+    for event in read_events(path):
+        by_agent[event.get("agent")].append(event)
+
+    summary = {}
+    for agent, events in by_agent.items():
+        calls = [e for e in events if e["kind"] != "decision"]
+        decisions = [e["latency"] for e in events if e["kind"] == "decision"]
+        matches = {e["match"] for e in events if e.get("match") is not None}
+        total_cost = sum(cost(e) for e in calls)
+        summary[str(agent)] = {
+            "matches": len(matches),
+            "decisions": len(decisions),
+            "decision_latency_p50": percentile(decisions, 50),
+            "decision_latency_p95": percentile(decisions, 95),
+            "calls": len(calls),
+            "prompt_tokens": sum(e["prompt_tokens"] or 0 for e in calls if not e["cached"]),
+            "completion_tokens": sum(e["completion_tokens"] or 0 for e in calls if not e["cached"]),
+            "cost_usd": total_cost,
+            "cost_per_match_usd": total_cost / len(matches) if matches else None,
+            "cache_hit_rate": sum(e["cached"] for e in calls) / len(calls) if calls else 0.0,
+            "retries": sum(e.get("retry", 0) > 0 for e in calls),
+            "errors": sum(e["error"] for e in calls),
+        }
+    return summary
+
+def write_prometheus(path="llm_metrics.jsonl", output_path="llm_metrics.prom"):
+    """Write the calls logged in path in the Prometheus text format, e.g. for node_exporter's textfile collector."""
+    with open(output_path, "w") as f:
+        f.write(LLMMetrics.load(path).prometheus_text())
+
+def serve(path="llm_metrics.jsonl", port=9464):
+    """Serve the calls logged in path as a Prometheus scrape endpoint at http://localhost:<port>/metrics."""
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = LLMMetrics.load(path).prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    http.server.ThreadingHTTPServer(("", port), Handler).serve_forever()
+
+if __name__ == "__main__":
+    fire.Fire({"summarize": summarize, "write_prometheus": write_prometheus, "serve": serve})
@@ -8,4 +8,8 @@ class RandomAgent(Agent):
 
     def take_action(self, rules : Rules, observation: Observation, available_actions: AvailableActions, show_state : bool):
         actions = list(available_actions.predefined.keys()) + list(available_actions.openended.keys())
-        return Action(action_id=random.choice(actions), openended_response="")
\ No newline at end of file
+        return Action(action_id=random.choice(actions), openended_response="")
+
+    async def take_action_async(self, rules : Rules, observation: Observation, available_actions: AvailableActions, show_state : bool):
+        # Choosing is instant, so there is no need for a worker thread.
+        return self.take_action(rules, observation, available_actions, show_state)
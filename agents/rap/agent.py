@@ -1,8 +1,10 @@
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from api.classes import Action, Agent, AvailableActions, Observation, Rules
 import re
 from .reasoners.base import Reasoner, SearchConfig, WorldModel
 from .reasoners.algorithm import MCTS
+from agents.llm_metrics import metrics, tagged
+from .transposition import normalize
 from .chat import *
 from .monads import *
 from .func import *
@@ -17,15 +19,21 @@ class ReasoningViaPlanning(Agent, WorldModel, SearchConfig):
     agent_type_id: str = "gpt4-rap"
     transparent_reasoning: bool = False
     agent_type: int = 2  # 0 = random replies, 1 = human interaction, 2 = openai
+    n_workers: int = 1  # number of leaves MCTS expands concurrently, i.e. LLM requests in flight
+    reuse_tree: bool = False  # start each turn's search from the subtree of the previous turn's move
+    turn: int = field(default=0, init=False, repr=False)  # used to tag LLM metrics
 
     context_builder: Callable[[str, str], ContextType] = None
     completions: CompletionsFunction = None
     probabilities: ProbabilitiesFunction = None
     _init_state: GameState = None
+    _instructions: str = field(default="", init=False, repr=False)  # appended to this turn's observation
 
     def __post_init__(self):
         """MCTS only needs to be instantiated once."""
-        mcts = MCTS(depth_limit=DEPTH_LIMIT)
+        mcts = MCTS(
+            depth_limit=DEPTH_LIMIT, n_workers=self.n_workers, reuse_tree=self.reuse_tree
+        )
         self.reasoner = Reasoner(world_model=self, search_config=self, search_algo=mcts)
 
     def log(self, s):
@@ -40,7 +48,21 @@ class ReasoningViaPlanning(Agent, WorldModel, SearchConfig):
         available_actions: AvailableActions,
         show_state: bool,
     ) -> Action:
-        self.context_builder = context_builder_factory(rules)
+        self.turn += 1
+        with tagged(agent=self.agent_type_id, turn=self.turn), metrics.timed(
+            "decision", ["random", "human", "openai"][self.agent_type]
+        ):
+            return self.decide(rules, observation, available_actions)
+
+    def decide(
+        self,
+        rules: Rules,
+        observation: Observation,
+        available_actions: AvailableActions,
+    ) -> Action:
+        self.context_builder = context_builder_factory(
+            rules, api=["random", "human", "openai"][self.agent_type]
+        )
         self._completions, self._probabilities = [
             random_api(),
             human_api(),
@@ -64,6 +86,7 @@ class ReasoningViaPlanning(Agent, WorldModel, SearchConfig):
             self.log("Recieved image observation. Requesting text description.")
             obs += "\n" + image_description(observation.image, rules)
         obs += "\n" + available_actions.instructions
+        self._instructions = available_actions.instructions
 
         # Add description as openended_response of predefined action. This has
         # the effect of listing the description when showing to GPT, but will
@@ -94,6 +117,7 @@ class ReasoningViaPlanning(Agent, WorldModel, SearchConfig):
             self.log(
                 f"Recieved the following observation:\n{observation.text}\nAvailable actions: {available_actions}.\nChoosing the action: {action}"
             )
+            self.log(f"Transposition table: {table.stats()}")
 
             return action
         except Exception as e:
@@ -142,6 +166,22 @@ class ReasoningViaPlanning(Agent, WorldModel, SearchConfig):
 
         return term
 
+    def rebase_state(self, state: GameState, depth_offset: int) -> GameState:
+        """From WorldModel; called by MCTS when the previous turn's subtree is
+        reused, so states deeper in it aren't mistaken for terminal ones."""
+        return replace(state, depth=state.depth - depth_offset)
+
+    def same_state(self, predicted: GameState, state: GameState) -> bool:
+        """From WorldModel; called by MCTS before reusing the previous turn's
+        subtree, which is only valid if the world model predicted this turn's
+        observation. Predicted observations don't include the game's action
+        instructions, and MCTS reconciles the available actions itself."""
+        observation = state.observation
+        suffix = "\n" + self._instructions
+        if observation.endswith(suffix):
+            observation = observation[: -len(suffix)]
+        return normalize(predicted.observation) == normalize(observation)
+
     def get_actions(self, state: GameState) -> tuple[Action]:
         """From WorldModel; called by MCTS."""
         try:
@@ -173,6 +213,30 @@ class ReasoningViaPlanning(Agent, WorldModel, SearchConfig):
 
         return rew, info
 
+    def fast_rewards(
+        self, state: GameState, actions: tuple[Action]
+    ) -> list[tuple[float, dict[str, float]]]:
+        """From SearchConfig; called by MCTS once per expanded node. Gets the
+        intuitions and self-evaluations of every action in one request each."""
+        actions = tuple(actions)  # memoized queries hash their arguments
+        ints = intuitions(state, actions, *self.probabilities)
+        try:
+            sevs = self_evals(state, actions, *self.completions)
+        except Exception as e:
+            self.log(f"Failed to parse self-evaluations: {e=}")
+            sevs = [0.5] * len(actions)
+
+        rewards = []
+        for i, action in enumerate(actions):
+            rew = calculate_reward(ints[i], sevs[i])
+            rewards.append((rew, {"intuition": ints[i], "self_eval": sevs[i]}))
+
+        self.log(
+            f"Calculating fast rewards for the following state:\n{state.observation}\nActions: {actions}\nIntuitions: {ints}, Self-evals: {sevs}"
+        )
+
+        return rewards
+
     def reward(
         self,
         state: GameState,
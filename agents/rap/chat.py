@@ -1,6 +1,7 @@
 from api.classes import Rules
 import api.util as util
-import openai
+from agents.llm_metrics import metrics
+from agents.llm_client import get_scheduler
 import random
 from .definitions import *
 import math
@@ -10,13 +11,10 @@ from PIL import Image
 import base64
 from io import BytesIO
 
-openai_client = openai.Client(
-    api_key=util.load_json("credentials.json")["openai_api_key"]
-)
 
-
-def context_builder_factory(rules: Rules) -> ContextBuilder:
-    """Makes a context builder with substitutions for game rules."""
+def context_builder_factory(rules: Rules, api: str = None) -> ContextBuilder:
+    """Makes a context builder with substitutions for game rules. Its namespace
+    separates cached LLM queries of different games and APIs."""
     context_templates = util.load_json("agents/rap/context_templates.json")
 
     def context_builder(template: str, observation: str, **kwargs: str) -> ContextType:
@@ -48,6 +46,7 @@ def context_builder_factory(rules: Rules) -> ContextBuilder:
             for i, message in enumerate(messages)
         ]
 
+    context_builder.namespace = (rules.title, api)
     return context_builder
 
 
@@ -56,31 +55,30 @@ def openai_api(model="gpt-4-1106-preview") -> tuple[CompletionsFunction, Probabi
     interacts with GPT4."""
 
     def completions(context: ContextType) -> str:
-        return (
-            openai_client.chat.completions.create(
+        with metrics.timed("completion", model) as call:
+            response = get_scheduler().chat_completion(
                 model=model, messages=context
             )
-            .choices[0]
-            .message.content
-        )
+            call["prompt_tokens"] = response.usage.prompt_tokens
+            call["completion_tokens"] = response.usage.completion_tokens
+        return response.choices[0].message.content
 
     def probabilities(
         context: ContextType, tokens: list[str] = ["yes", "no"]
     ) -> dict[str, float]:
         n = min(len(tokens), 5)  # OpenAI doesn't allow more than 5
 
-        top_logprobs = (
-            openai_client.chat.completions.create(
+        with metrics.timed("logprobs", model) as call:
+            response = get_scheduler().chat_completion(
                 model=model,
                 messages=context,
                 logprobs=True,
                 top_logprobs=n,
                 max_tokens=1,
             )
-            .choices[0]
-            .logprobs.content[0]
-            .top_logprobs
-        )
+            call["prompt_tokens"] = response.usage.prompt_tokens
+            call["completion_tokens"] = response.usage.completion_tokens
+        top_logprobs = response.choices[0].logprobs.content[0].top_logprobs
 
         def unnorm_prob(token: str):
             """Return the unnormalized probability of a token."""
@@ -148,7 +146,7 @@ def image_description(image: Image, rules: Rules) -> str:
     image.save(buffered, format="JPEG")
     base64_image = base64.b64encode(buffered.getvalue())
 
-    c = openai_client.chat.completions.create(
+    c = get_scheduler().chat_completion(
         model="gpt-4-vision-preview",
         messages=[
             {
@@ -1,12 +1,15 @@
-from functools import cache
 from .definitions import *
+from .transposition import TranspositionTable
 import math
 from api.classes import Action
 import re
 
 import sys
 
-@cache
+# LLM query results shared by every RAP agent in the process, across turns and games.
+table = TranspositionTable()
+
+
 def step(
     state: GameState,
     action: Action,
@@ -15,16 +18,28 @@ def step(
     completions: CompletionsFunction,
 ) -> GameState:
     """Determines the next state after an action + other players' actions."""
+    new_state = next_observation(state, action, others, context_builder, completions)
+    return GameState(new_state, depth=state.depth + 1)
+
+
+@table.memoize
+def next_observation(
+    state: GameState,
+    action: Action,
+    others: str,
+    context_builder: ContextBuilder,
+    completions: CompletionsFunction,
+) -> str:
+    """The next state's observation, which doesn't depend on the search depth."""
     context = context_builder(
         "state", observation=state.observation, action=action, others=others
     )
     c = completions(context)
 
-    new_state = re.findall(r"<state>(.*)</state>", c, re.S)[0]
-    return GameState(new_state, depth=state.depth + 1)
+    return re.findall(r"<state>(.*)</state>", c, re.S)[0]
 
 
-@cache
+@table.memoize
 def win_probability(
     state: GameState,
     context_builder: ContextBuilder,
@@ -36,13 +51,11 @@ def win_probability(
     return ps["yes"]
 
 
-@cache
 def is_terminal(state: GameState) -> bool:
     """A terminal state must be reached or MCTS will throw out its results."""
     return state.depth >= DEPTH_LIMIT
 
 
-@cache
 def get_actions(
     state: GameState, context_builder: ContextBuilder, completions: CompletionsFunction
 ) -> tuple[Action]:
@@ -51,6 +64,14 @@ def get_actions(
     if state.actions:
         return state.actions
 
+    return proposed_actions(state, context_builder, completions)
+
+
+@table.memoize
+def proposed_actions(
+    state: GameState, context_builder: ContextBuilder, completions: CompletionsFunction
+) -> tuple[Action]:
+    """Ask for the actions available in a state without preset actions."""
     print("\n\n\n\n")
 
     context = context_builder("actions", observation=state.observation)
@@ -63,7 +84,7 @@ def get_actions(
     return tuple(actions)
 
 
-@cache
+@table.memoize
 def others_actions(
     state: GameState, context_builder: ContextBuilder, completions: CompletionsFunction
 ) -> str:
@@ -78,7 +99,6 @@ def others_actions(
     return c
 
 
-@cache
 def calculate_reward(
     intuition: float, self_eval: float, win_probability: float = 0.5
 ) -> float:
@@ -87,7 +107,7 @@ def calculate_reward(
     return intuition + self_eval + win_probability
 
 
-@cache
+@table.memoize
 def intuitions(
     state: GameState,
     actions: tuple[Action],
@@ -104,7 +124,34 @@ def intuitions(
     return ps
 
 
-@cache
+@table.memoize
+def self_evals(
+    state: GameState,
+    actions: tuple[Action],
+    context_builder: ContextBuilder,
+    completions: CompletionsFunction,
+) -> tuple[float]:
+    """Determines how good each action is in one request. Actions without a
+    parsable rating get 0.5."""
+    context = context_builder(
+        "self_eval_batch",
+        observation=state.observation,
+        actions="\n".join(f"{i}. {a}" for i, a in enumerate(actions)),
+    )
+    c = completions(context)
+    c = re.findall(r"<ratings>(.*)</ratings>", c, re.S)[0]
+    ratings = [0.5] * len(actions)
+    for i, p in re.findall(r"(\d+)\.\s*([0-9.]+)", c):
+        i = int(i)
+        if i < len(actions):
+            try:
+                ratings[i] = min(max(float(p), 0.0), 1.0)
+            except ValueError:
+                pass
+    return tuple(ratings)
+
+
+@table.memoize
 def self_eval(
     state: GameState,
     action: str,
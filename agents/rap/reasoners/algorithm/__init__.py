@@ -1,2 +1,3 @@
 from .beam_search import BeamSearch, BeamSearchNode, BeamSearchResult
-from .mcts import MCTS, MCTSNode, MCTSResult, MCTSAggregation
\ No newline at end of file
+from .mcts import MCTS, MCTSNode, MCTSResult, MCTSAggregation
+from .array_mcts import ArrayMCTS, ArrayMCTSNode, MCTSTree
@@ -0,0 +1,254 @@
+from typing import Generic, Optional
+import threading
+
+import numpy as np
+
+from .. import State, Action, Example
+from .mcts import MCTS
+
+
+class MCTSTree:
+    """
+    Struct-of-arrays store for an MCTS tree
+
+    Numeric statistics live in numpy arrays indexed by node, and the children of a node are
+    allocated contiguously, so a node only records the index of its first child and their count.
+    Running reward sums replace the per-node lists of cumulative rewards.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.size = 0
+        self.visits = np.zeros(capacity, dtype=np.int64)
+        self.virtual_visits = np.zeros(capacity, dtype=np.int64)
+        self.reward_sum = np.zeros(capacity, dtype=np.float64)
+        self.fast_reward = np.zeros(capacity, dtype=np.float64)
+        self.parent = np.full(capacity, -1, dtype=np.int64)
+        self.first_child = np.full(capacity, -1, dtype=np.int64)
+        self.n_children = np.zeros(capacity, dtype=np.int64)
+        self.depth = np.zeros(capacity, dtype=np.int64)
+        self.has_state = np.zeros(capacity, dtype=bool)
+        # Arbitrary Python objects are kept in lists indexed the same way.
+        self.state: list[Optional[State]] = []
+        self.action: list[Optional[Action]] = []
+        self.reward: list[float] = []
+        self.reward_details: list[Optional[dict]] = []
+        self.fast_reward_details: list[dict] = []
+        self.is_terminal: list[bool] = []
+        self.nodes: list[ArrayMCTSNode] = []
+        # Parallel waves expand leaves from several threads; growing the arrays must not lose their writes.
+        self.lock = threading.Lock()
+
+    def __getstate__(self):
+        # Locks can't be copied or pickled, e.g. when MCTS deep-copies the trace of each iteration.
+        state = self.__dict__.copy()
+        del state['lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def _grow(self, n: int):
+        capacity = len(self.visits)
+        if self.size + n <= capacity:
+            return
+        capacity = max(2 * capacity, self.size + n)
+        for name in ['visits', 'virtual_visits', 'reward_sum', 'fast_reward', 'parent', 'first_child',
+                     'n_children', 'depth', 'has_state']:
+            old = getattr(self, name)
+            new = np.full(capacity, -1 if name in ['parent', 'first_child'] else 0, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    def add(self, parent: int, state: Optional[State], actions: list[Optional[Action]],
+            fast_rewards: list[tuple[float, dict]]) -> range:
+        """Append the children of parent (-1 for the root) and return their indices."""
+        with self.lock:
+            n = len(actions)
+            self._grow(n)
+            indices = range(self.size, self.size + n)
+            self.parent[indices.start:indices.stop] = parent
+            self.depth[indices.start:indices.stop] = 0 if parent < 0 else self.depth[parent] + 1
+            self.has_state[indices.start:indices.stop] = state is not None
+            for action, (fast_reward, fast_reward_details) in zip(actions, fast_rewards):
+                self.fast_reward[self.size] = fast_reward
+                self.state.append(state)
+                self.action.append(action)
+                self.reward.append(fast_reward)
+                self.reward_details.append(None)
+                self.fast_reward_details.append(fast_reward_details or {})
+                self.is_terminal.append(False)
+                self.nodes.append(ArrayMCTSNode(self, self.size))
+                self.size += 1
+            if parent >= 0:
+                self.first_child[parent] = indices.start
+                self.n_children[parent] = n
+            return indices
+
+    def q(self, indices: slice) -> np.ndarray:
+        """Mean cumulative reward of visited nodes, fast reward of nodes without a state."""
+        visits = self.visits[indices]
+        mean = np.divide(self.reward_sum[indices], visits, out=np.zeros(len(visits)), where=visits > 0)
+        return np.where(self.has_state[indices], mean, self.fast_reward[indices])
+
+
+class ArrayMCTSNode:
+    """Handle to a node of an MCTSTree, exposing the attributes of MCTSNode"""
+    __slots__ = ('tree', 'id')
+
+    def __init__(self, tree: MCTSTree, index: int):
+        self.tree = tree
+        self.id = index
+
+    @property
+    def state(self):
+        return self.tree.state[self.id]
+
+    @state.setter
+    def state(self, state):
+        with self.tree.lock:
+            self.tree.state[self.id] = state
+            self.tree.has_state[self.id] = state is not None
+
+    @property
+    def action(self):
+        return self.tree.action[self.id]
+
+    @property
+    def parent(self) -> 'Optional[ArrayMCTSNode]':
+        parent = self.tree.parent[self.id]
+        return self.tree.nodes[parent] if parent >= 0 else None
+
+    @property
+    def children(self) -> 'Optional[list[ArrayMCTSNode]]':
+        if self.tree.first_child[self.id] < 0:
+            return None
+        return self.tree.nodes[self.tree.first_child[self.id]:self.tree.first_child[self.id] + self.tree.n_children[self.id]]
+
+    @children.setter
+    def children(self, children: 'list[ArrayMCTSNode]'):
+        # Children are created by MCTSTree.add, which already links them; an empty expansion is recorded here.
+        if not children:
+            with self.tree.lock:
+                self.tree.first_child[self.id] = self.tree.size
+                self.tree.n_children[self.id] = 0
+
+    @property
+    def depth(self) -> int:
+        return int(self.tree.depth[self.id])
+
+    @property
+    def fast_reward(self) -> float:
+        return float(self.tree.fast_reward[self.id])
+
+    @property
+    def fast_reward_details(self) -> dict:
+        return self.tree.fast_reward_details[self.id]
+
+    @property
+    def reward(self) -> float:
+        return self.tree.reward[self.id]
+
+    @reward.setter
+    def reward(self, reward: float):
+        self.tree.reward[self.id] = reward
+
+    @property
+    def reward_details(self) -> Optional[dict]:
+        return self.tree.reward_details[self.id]
+
+    @reward_details.setter
+    def reward_details(self, reward_details: dict):
+        self.tree.reward_details[self.id] = reward_details
+
+    @property
+    def is_terminal(self) -> bool:
+        return self.tree.is_terminal[self.id]
+
+    @is_terminal.setter
+    def is_terminal(self, is_terminal: bool):
+        self.tree.is_terminal[self.id] = is_terminal
+
+    @property
+    def virtual_visits(self) -> int:
+        return int(self.tree.virtual_visits[self.id])
+
+    @virtual_visits.setter
+    def virtual_visits(self, virtual_visits: int):
+        self.tree.virtual_visits[self.id] = virtual_visits
+
+    @property
+    def visits(self) -> int:
+        return int(self.tree.visits[self.id])
+
+    # noinspection PyPep8Naming
+    @property
+    def Q(self) -> float:
+        return float(self.tree.q(slice(self.id, self.id + 1))[0])
+
+
+def node_attributes(node: ArrayMCTSNode) -> dict:
+    """The default node_visualizer of ArrayMCTS, since nodes have no __dict__"""
+    return {'id': node.id, 'state': node.state, 'action': node.action, 'depth': node.depth,
+            'fast_reward': node.fast_reward, 'reward': node.reward, 'is_terminal': node.is_terminal,
+            'visits': node.visits, 'Q': node.Q}
+
+
+class ArrayMCTS(MCTS, Generic[State, Action, Example]):
+    def __init__(self, initial_capacity: int = 1024, **kwargs):
+        """
+        MCTS on an array-backed tree, for searches with many cheap iterations
+
+        Takes the same arguments as MCTS. Q values are running means, so calc_q must be np.mean.
+        UCT is evaluated for all children of a node at once.
+
+        :param initial_capacity: the number of nodes preallocated for the tree; it grows by doubling
+        """
+        kwargs.setdefault('node_visualizer', node_attributes)
+        super().__init__(**kwargs)
+        assert self.calc_q is np.mean, 'ArrayMCTS keeps running reward sums, so Q is always the mean'
+        self.initial_capacity = initial_capacity
+        self.tree: Optional[MCTSTree] = None
+
+    def _make_root(self, state: State) -> ArrayMCTSNode:
+        self.tree = MCTSTree(self.initial_capacity)
+        index = self.tree.add(-1, state, [None], [(0., {})])[0]
+        return self.tree.nodes[index]
+
+    def _reuse_root(self, state: State) -> ArrayMCTSNode:
+        # Children are stored contiguously, so a promoted subtree can't be re-keyed in place; start afresh.
+        self._reused_root = self._reused_state = None
+        return self._make_root(state)
+
+    def _make_children(self, node: ArrayMCTSNode, actions: list[Action],
+                       fast_rewards: list[tuple[float, dict]]) -> list[ArrayMCTSNode]:
+        indices = self.tree.add(node.id, None, actions, fast_rewards)
+        return self.tree.nodes[indices.start:indices.stop]
+
+    def _uct_select(self, node: ArrayMCTSNode) -> ArrayMCTSNode:
+        tree = self.tree
+        first = tree.first_child[node.id]
+        children = slice(first, first + tree.n_children[node.id])
+        virtual = tree.virtual_visits[children]
+        if self.uct_with_fast_reward or tree.has_state[children].all():
+            visits = tree.visits[children]
+            q = tree.q(children)
+            if virtual.any():
+                # Count each pending selection as a visit that returned -virtual_loss.
+                q = np.where(virtual > 0, (q * visits - self.virtual_loss * virtual) / np.maximum(visits + virtual, 1), q)
+            n_parent_visits = tree.visits[node.id] + tree.virtual_visits[node.id]
+            scores = q + self.w_exp * np.sqrt(np.log(n_parent_visits) / np.maximum(visits + virtual, 1))
+        else:
+            scores = np.where(tree.has_state[children], -np.inf,
+                              tree.fast_reward[children] - self.virtual_loss * virtual)
+        return tree.nodes[first + int(np.argmax(scores))]
+
+    def _back_propagate(self, path: list[ArrayMCTSNode]):
+        rewards = []
+        cum_reward = -np.inf
+        for node in reversed(path):
+            rewards.append(node.reward)
+            cum_reward = self.cum_reward(rewards[::-1])
+            self.tree.reward_sum[node.id] += cum_reward
+            self.tree.visits[node.id] += 1
+        return cum_reward
@@ -1,4 +1,5 @@
 import pickle
+import contextvars
 from os import PathLike
 import math
 from copy import deepcopy
@@ -6,9 +7,10 @@ from typing import Generic, Optional, NamedTuple, Callable, Hashable
 import itertools
 from abc import ABC
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
-from tqdm import trange
+from tqdm import tqdm, trange
 
 from .. import SearchAlgorithm, WorldModel, SearchConfig, State, Action, Example, Trace
 
@@ -45,6 +47,7 @@ class MCTSNode(Generic[State, Action]):
         self.parent = parent
         self.children: 'Optional[list[MCTSNode]]' = None
         self.calc_q = calc_q
+        self.virtual_visits = 0
         if parent is None:
             self.depth = 0
         else:
@@ -123,7 +126,10 @@ class MCTS(SearchAlgorithm, Generic[State, Action, Example]):
                  uct_with_fast_reward: bool = True,
                  aggregator: Optional[MCTSAggregation] = None,
                  disable_tqdm: bool = True,
-                 node_visualizer: Callable[[MCTSNode], dict] = lambda x: x.__dict__):
+                 node_visualizer: Callable[[MCTSNode], dict] = lambda x: x.__dict__,
+                 n_workers: int = 1,
+                 virtual_loss: float = 1.,
+                 reuse_tree: bool = False):
         """
         MCTS algorithm
 
@@ -143,6 +149,13 @@ class MCTS(SearchAlgorithm, Generic[State, Action, Example]):
                                 Outputs *None* if no trajectory with terminal node but required
         :param uct_with_fast_reward: if True, use fast_reward instead of reward for unvisited children in UCT
                                      Otherwise, visit the *unvisited* children with maximum fast_reward first
+        :param n_workers: the number of leaves selected per wave and expanded concurrently in a thread pool.
+                          With 1, iterations run strictly in series
+        :param virtual_loss: the loss temporarily assigned to each node on a path selected in the current wave,
+                             so that the other selections of the wave are steered to different leaves
+        :param reuse_tree: if True, the subtree under the first node of the output trajectory is kept and promoted
+                           to the root of the next search, keeping its visit counts and rewards, provided the next
+                           initial state matches the state predicted for that node (see WorldModel.same_state)
         """
         super().__init__()
         self.world_model = None
@@ -171,12 +184,52 @@ class MCTS(SearchAlgorithm, Generic[State, Action, Example]):
         self.disable_tqdm = disable_tqdm
         self.node_visualizer = node_visualizer
         self.aggregator = aggregator
+        self.n_workers = n_workers
+        self.virtual_loss = virtual_loss
+        self.reuse_tree = reuse_tree
+        self._reused_root: Optional[MCTSNode] = None
+        self._reused_state: Optional[State] = None  # the state the search predicted for _reused_root
 
     def iterate(self, node: MCTSNode) -> list[MCTSNode]:
         path = self._select(node)
+        self._expand_and_simulate(path)
+        self._record(path)
+        return path
+
+    def iterate_wave(self, node: MCTSNode, n_paths: int, executor: ThreadPoolExecutor) -> list[list[MCTSNode]]:
+        """
+        Select up to n_paths paths under virtual loss, then expand and simulate their leaves concurrently.
+        The wave ends early if a selection reaches a leaf that is already being expanded.
+        """
+        paths = []
+        leaves = set()
+        for _ in range(n_paths):
+            path = self._select(node)
+            if id(path[-1]) in leaves:
+                break
+            leaves.add(id(path[-1]))
+            for n in path:
+                n.virtual_visits += 1
+            paths.append(path)
+        for path in paths:
+            for n in path:
+                n.virtual_visits -= 1
+
+        # The leaves are distinct and unexpanded, so their subtrees are disjoint and can be built concurrently.
+        # Each runs in a copy of the caller's context, so context variables such as LLM metrics tags carry over.
+        futures = [executor.submit(contextvars.copy_context().run, self._expand_and_simulate, path) for path in paths]
+        for future in futures:
+            future.result()
+        for path in paths:
+            self._record(path)
+        return paths
+
+    def _expand_and_simulate(self, path: list[MCTSNode]):
         if not self._is_terminal_with_depth_limit(path[-1]):
             self._expand(path[-1])
             self._simulate(path)
+
+    def _record(self, path: list[MCTSNode]):
         cum_reward = self._back_propagate(path)
         if self.output_strategy == 'max_iter' and path[-1].is_terminal and cum_reward > self._output_cum_reward:
             self._output_cum_reward = cum_reward
@@ -187,7 +240,6 @@ class MCTS(SearchAlgorithm, Generic[State, Action, Example]):
         if self.output_strategy == 'last_terminal_iter' and path[-1].is_terminal:
             self._output_cum_reward = cum_reward
             self._output_iter = path
-        return path
 
     def _is_terminal_with_depth_limit(self, node: MCTSNode):
         return node.is_terminal or node.depth >= self.depth_limit
@@ -201,14 +253,21 @@ class MCTS(SearchAlgorithm, Generic[State, Action, Example]):
             node = self._uct_select(node)
 
     def _uct(self, node: MCTSNode) -> float:
-        return node.Q + self.w_exp * np.sqrt(np.log(len(node.parent.cum_rewards)) / max(1, len(node.cum_rewards)))
+        q = node.Q
+        n_visits = len(node.cum_rewards)
+        if node.virtual_visits:
+            # Count each pending selection as a visit that returned -virtual_loss.
+            q = (q * n_visits - self.virtual_loss * node.virtual_visits) / (n_visits + node.virtual_visits)
+            n_visits += node.virtual_visits
+        n_parent_visits = len(node.parent.cum_rewards) + node.parent.virtual_visits
+        return q + self.w_exp * np.sqrt(np.log(n_parent_visits) / max(1, n_visits))
 
     def _uct_select(self, node: MCTSNode) -> MCTSNode:
         if self.uct_with_fast_reward or all(x.state is not None for x in node.children):
             return max(node.children, key=self._uct)
         else:
             unvisited_children = filter(lambda x: x.state is None, node.children)
-            return max(unvisited_children, key=lambda x: x.fast_reward)
+            return max(unvisited_children, key=lambda x: x.fast_reward - self.virtual_loss * x.virtual_visits)
 
     def _expand(self, node: MCTSNode):
         if node.state is None:
@@ -223,15 +282,53 @@ class MCTS(SearchAlgorithm, Generic[State, Action, Example]):
         if node.is_terminal:
             return
 
-        children = []
         actions = self.search_config.get_actions(node.state)
-        for action in actions:
-            fast_reward, fast_reward_details = self.search_config.fast_reward(node.state, action)
-            child = MCTSNode(state=None, action=action, parent=node,
-                             fast_reward=fast_reward, fast_reward_details=fast_reward_details, calc_q=self.calc_q)
-            children.append(child)
+        fast_rewards = self.search_config.fast_rewards(node.state, actions)
+        node.children = self._make_children(node, actions, fast_rewards)
 
-        node.children = children
+    def _make_root(self, state: State) -> MCTSNode:
+        return MCTSNode(state=state, action=None, parent=None, calc_q=self.calc_q)
+
+    def _reuse_root(self, state: State) -> MCTSNode:
+        """
+        Promote the subtree kept from the previous search to the root for state. Children whose action is still
+        available keep their statistics and subtrees, and new actions get fresh children. If state isn't the state
+        predicted for the kept node, its statistics were gathered for another position, so a fresh root is made.
+        """
+        root, self._reused_root = self._reused_root, None
+        predicted, self._reused_state = self._reused_state, None
+        offset = root.depth
+        if not self.world_model.same_state(self.world_model.rebase_state(predicted, offset), state):
+            return self._make_root(state)
+        root.parent = root.action = None
+        root.state = state
+        root.is_terminal = False
+        stack = list(root.children or [])
+        root.depth = 0
+        while stack:
+            node = stack.pop()
+            node.depth -= offset
+            if node.state is not None:
+                node.state = self.world_model.rebase_state(node.state, offset)
+                node.is_terminal = self.world_model.is_terminal(node.state)
+            stack.extend(node.children or [])
+
+        if root.children is not None:
+            actions = self.search_config.get_actions(state)
+            kept = [next((child for child in root.children if child.action == action), None) for action in actions]
+            new_actions = [action for action, child in zip(actions, kept) if child is None]
+            if new_actions:
+                new_children = iter(self._make_children(root, new_actions,
+                                                        self.search_config.fast_rewards(state, new_actions)))
+                kept = [child if child is not None else next(new_children) for child in kept]
+            root.children = kept
+        return root
+
+    def _make_children(self, node: MCTSNode, actions: list[Action],
+                       fast_rewards: list[tuple[float, dict]]) -> list[MCTSNode]:
+        return [MCTSNode(state=None, action=action, parent=node,
+                         fast_reward=fast_reward, fast_reward_details=fast_reward_details, calc_q=self.calc_q)
+                for action, (fast_reward, fast_reward_details) in zip(actions, fast_rewards)]
 
     def _simulate(self, path: list[MCTSNode]):
         node = path[-1]
@@ -267,14 +364,28 @@ class MCTS(SearchAlgorithm, Generic[State, Action, Example]):
     def search(self):
         self._output_cum_reward = -math.inf
         self._output_iter = None
-        self.root = MCTSNode(state=self.world_model.init_state(), action=None, parent=None, calc_q=self.calc_q)
+        if self._reused_root is not None:
+            self.root = self._reuse_root(self.world_model.init_state())
+        else:
+            self.root = self._make_root(self.world_model.init_state())
         if self.output_trace_in_each_iter:
             self.trace_in_each_iter = []
 
-        for _ in trange(self.n_iters, disable=self.disable_tqdm, desc='MCTS iteration', leave=False):
-            path = self.iterate(self.root)
-            if self.output_trace_in_each_iter:
-                self.trace_in_each_iter.append(deepcopy(path))
+        if self.n_workers > 1:
+            with ThreadPoolExecutor(max_workers=self.n_workers) as executor, \
+                    tqdm(total=self.n_iters, disable=self.disable_tqdm, desc='MCTS iteration', leave=False) as pbar:
+                n_done = 0
+                while n_done < self.n_iters:
+                    paths = self.iterate_wave(self.root, min(self.n_workers, self.n_iters - n_done), executor)
+                    n_done += len(paths)
+                    pbar.update(len(paths))
+                    if self.output_trace_in_each_iter:
+                        self.trace_in_each_iter.extend(deepcopy(path) for path in paths)
+        else:
+            for _ in trange(self.n_iters, disable=self.disable_tqdm, desc='MCTS iteration', leave=False):
+                path = self.iterate(self.root)
+                if self.output_trace_in_each_iter:
+                    self.trace_in_each_iter.append(deepcopy(path))
 
         if self.output_strategy == 'follow_max':
             self._output_iter = []
@@ -297,11 +408,15 @@ class MCTS(SearchAlgorithm, Generic[State, Action, Example]):
                  world_model: WorldModel[State, Action, Example],
                  search_config: SearchConfig[State, Action, Example],
                  **kwargs) -> MCTSResult:
-        MCTSNode.reset_id()
+        if self._reused_root is None:
+            MCTSNode.reset_id()
         self.world_model = world_model
         self.search_config = search_config
 
         self.search()
+        if self.reuse_tree and self._output_iter is not None and len(self._output_iter) > 1:
+            self._reused_root = self._output_iter[1]
+            self._reused_state = self._reused_root.state
 
         if self._output_iter is None:
             terminal_state = trace = None
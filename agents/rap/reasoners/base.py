@@ -1,12 +1,18 @@
-from typing import Generic, TypeVar, Union, NamedTuple, Protocol, Optional, runtime_checkable, Tuple
+from typing import Generic, TypeVar, Union, NamedTuple, Protocol, Optional, runtime_checkable, Tuple, TYPE_CHECKING
 from abc import ABC, abstractmethod
 
 import numpy as np
-from transformers import StoppingCriteriaList
 from datetime import datetime
 import os, sys, pickle
+from functools import wraps
 from tqdm import tqdm
-import torch
+
+from agents.llm_metrics import metrics
+
+# torch and transformers are only needed by the local model backends and Evaluator, which import them
+# themselves, so searching with an API model doesn't load them.
+if TYPE_CHECKING:
+    from transformers import StoppingCriteriaList
 
 State = TypeVar("State")
 Action = TypeVar("Action")
@@ -19,7 +25,27 @@ class GenerateOutput(NamedTuple):
     log_prob: list[np.ndarray] = None
 
 
+def _timed(kind: str, fn):
+    @wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        # API backends name their model in self.model; local ones hold the model object there.
+        model = getattr(self, "model", None)
+        with metrics.timed(kind, model if isinstance(model, str) else type(self).__name__):
+            return fn(self, *args, **kwargs)
+    wrapper.__timed__ = True
+    return wrapper
+
+
 class LanguageModel(ABC):
+    def __init_subclass__(cls, **kwargs):
+        """Record the latency of every backend's calls in agents.llm_metrics.metrics."""
+        super().__init_subclass__(**kwargs)
+        for name, kind in [("generate", "completion"), ("get_next_token_logits", "logprobs"),
+                           ("get_loglikelihood", "loglikelihood")]:
+            fn = cls.__dict__.get(name)
+            if fn is not None and not getattr(fn, "__timed__", False):
+                setattr(cls, name, _timed(kind, fn))
+
     @abstractmethod
     def generate(self,
                  inputs: list[str],
@@ -33,7 +59,7 @@ class LanguageModel(ABC):
                  eos_token_id: Union[None, str, int, list[str, int]] = None,
                  hide_input: bool = True,
                  output_log_probs: bool = False,
-                 stopping_criteria: Optional[StoppingCriteriaList] = None,
+                 stopping_criteria: Optional["StoppingCriteriaList"] = None,
                  **kwargs) -> GenerateOutput:
         """Generate text from a list of prompts.
 
@@ -102,6 +128,23 @@ class WorldModel(ABC, Generic[State, Action, Example]):
     @abstractmethod
     def is_terminal(self, state: State) -> bool: ...
 
+    def rebase_state(self, state: State, depth_offset: int) -> State:
+        """ Returns the state as seen from a root depth_offset steps deeper, when a search tree is reused
+
+        :param state: A state of the reused subtree
+        :param depth_offset: The depth of the new root in the previous tree
+        """
+        return state
+
+    def same_state(self, predicted: State, state: State) -> bool:
+        """ Returns whether the state a search predicted matches the state actually reached, so that the
+        subtree searched from the prediction can be reused
+
+        :param predicted: The predicted state, rebased to the new root
+        :param state: The new initial state
+        """
+        return predicted == state
+
     def update_example(self, example: Example, prompt = None) -> None:        
         if prompt is not None:
             self.prompt = prompt
@@ -120,6 +163,13 @@ class SearchConfig(ABC, Generic[State, Action, Example]):
     def fast_reward(self, state: State, action: Action) -> tuple[float, dict]:
         return 0, {}
 
+    def fast_rewards(self, state: State, actions: list[Action]) -> list[tuple[float, dict]]:
+        """ Returns the fast reward of every action in a state
+
+        Override to evaluate all children of a node in one batched call
+        """
+        return [self.fast_reward(state, action) for action in actions]
+
     @abstractmethod
     def reward(self, state, action, **kwargs) -> tuple[float, dict]: ...
 
@@ -174,6 +224,7 @@ class Evaluator():
                  num_shot=4,
                  resume=0,
                  log_dir=None):
+        import torch
 
         self.dataset = list(self.full_dataset)[resume:]
         try:
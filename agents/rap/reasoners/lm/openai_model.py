@@ -1,9 +1,8 @@
 import os
-import openai
 import numpy as np
 from typing import Optional, Union
-import time
 
+from agents.llm_client import get_scheduler
 from .. import LanguageModel, GenerateOutput
 
 class GPTCompletionModel(LanguageModel):
@@ -15,8 +14,7 @@ class GPTCompletionModel(LanguageModel):
         API_KEY = os.getenv("OPENAI_API_KEY", None)
         if API_KEY is None:
             raise ValueError("OPENAI_API_KEY not set, please run `export OPENAI_API_KEY=<your key>` to ser it")
-        else:
-            openai.api_key = API_KEY
+        self.api_key = API_KEY
 
     
     def generate(self,
@@ -25,7 +23,7 @@ class GPTCompletionModel(LanguageModel):
                 
                 top_p: float = 1.0,
                 num_return_sequences: int = 1,
-                rate_limit_per_min: Optional[int] = 20,
+                rate_limit_per_min: Optional[int] = None,
                 stop: Optional[str] = None,
                 logprobs: Optional[int] = None,
                 temperature = None,
@@ -39,64 +37,46 @@ class GPTCompletionModel(LanguageModel):
         if logprobs is None:
             logprobs = 0
 
-        i = 1
+        # Shares connections and the rate limits of this key with every other model and agent in the process.
+        # Instead of sleeping before every call, the scheduler waits only when the key's quota is used up;
+        # rate_limit_per_min sets its limit if this is the first use of the key, and must agree with it otherwise.
+        scheduler = get_scheduler(api_key=self.api_key, rpm=rate_limit_per_min)
 
-        for i in range(1, 65):  # try 64 times
-            try:
-                # sleep several seconds to avoid rate limit
-                if rate_limit_per_min is not None:
-                    time.sleep(60 / rate_limit_per_min)
-                ### GPT 3.5 and higher use a different API
-                if ('gpt-3.5' in self.model) or ('gpt-4' in self.model):
-                    messages = [{"role": "user", "content": prompt}]
-                    response = openai.ChatCompletion.create(
-                        model=self.model,
-                        messages=messages,
-                        max_tokens=max_tokens,
-                        temperature=gpt_temperature,
-                        top_p=top_p,
-                        n=num_return_sequences,
-                        stop=stop,
-                        **kwargs
-                    )
-                    '''print('-----------------------------------------')
-                    print(f'Prompt:\n{prompt}')
-                    print('-------------prompt end------------------')
-                    print('-----------------------------------------')
-                    print('Response:')
-                    for i, choice in enumerate(response["choices"]):
-                        print(f'---------response {i}------------')
-                        print(choice["message"]["content"])
-                    print('-------------response end----------------') '''
+        ### GPT 3.5 and higher use a different API
+        if ('gpt-3.5' in self.model) or ('gpt-4' in self.model):
+            messages = [{"role": "user", "content": prompt}]
+            response = scheduler.chat_completion(
+                model=self.model,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=gpt_temperature,
+                top_p=top_p,
+                n=num_return_sequences,
+                stop=stop,
+                **kwargs
+            )
 
-                    return GenerateOutput(
-                        text=[choice["message"]["content"] for choice in response["choices"]],
-                        log_prob=None
-                    )
-                else:
-                    response = openai.Completion.create(
-                        model=self.model,
-                        prompt=prompt,
-                        max_tokens=max_tokens,
-                        temperature=gpt_temperature,
-                        top_p=top_p,
-                        n=num_return_sequences,
-                        stop=stop,
-                        logprobs=logprobs,
-                        **kwargs
-                    )
+            return GenerateOutput(
+                text=[choice.message.content for choice in response.choices],
+                log_prob=None
+            )
+        else:
+            response = scheduler.completion(
+                model=self.model,
+                prompt=prompt,
+                max_tokens=max_tokens,
+                temperature=gpt_temperature,
+                top_p=top_p,
+                n=num_return_sequences,
+                stop=stop,
+                logprobs=logprobs,
+                **kwargs
+            )
 
-                    return GenerateOutput(
-                        text=[choice["text"] for choice in response["choices"]],
-                        log_prob=[choice["logprobs"] for choice in response["choices"]]
-                    )
-            
-            except Exception as e:
-                print(f"An Error Occured: {e}, sleeping for {i*10} seconds")
-                time.sleep(i*10)
-        
-        # after 64 tries, still no luck
-        raise RuntimeError("GPTCompletionModel failed to generate output, even after 64 tries")
+            return GenerateOutput(
+                text=[choice.text for choice in response.choices],
+                log_prob=[choice.logprobs for choice in response.choices]
+            )
     
     def get_next_token_logits(self,
                               prompt: Union[str, list[str]],
@@ -0,0 +1,82 @@
+from collections import OrderedDict
+from functools import wraps
+import threading
+
+
+def normalize(observation: str) -> str:
+    """Collapse whitespace so trivially different renderings of a position share an entry."""
+    return " ".join(observation.split())
+
+
+class TranspositionTable:
+    """Bounded LRU table of LLM query results, shared across turns and games.
+
+    Entries are keyed on the query name, the context builder's namespace (game and
+    API), the normalized observation, and the query's remaining hashable arguments
+    (action, others' actions, action list). Closures such as the context builder
+    and the completions function are rebuilt every turn, so they are never part of
+    a key.
+    """
+
+    def __init__(self, max_entries: int = 10_000):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()  # MCTS may expand leaves from several threads
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                raise KeyError(key)
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def memoize(self, fn):
+        """Cache fn(state, *args, context_builder, query) in this table."""
+
+        @wraps(fn)
+        def wrapper(state, *args):
+            context_builder = args[-2]
+            key = (
+                fn.__name__,
+                getattr(context_builder, "namespace", None),
+                normalize(state.observation),
+                state.actions,
+                *args[:-2],
+            )
+            try:
+                return self.get(key)
+            except KeyError:
+                pass
+            value = fn(state, *args)
+            self.put(key, value)
+            return value
+
+        return wrapper
+
+    def stats(self) -> dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,226 @@
+import fire
+import api.util as util
+from agents.random_agent import RandomAgent
+from dataclasses import dataclass
+from collections import defaultdict
+import multiprocessing
+import platform
+import os
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+# Game path -> kwargs for the game. Hive uses the compact move generator; its piece-by-piece
+# valid_moves takes minutes per random game.
+GAMES = {
+    "games.tic_tac_toe.TicTacToe": {},
+    "games.sea_battle.SeaBattle": {},
+    "games.hive.game.HiveGame": {"fast_engine": True},
+    "games.santorini.santorini.Santorini": {},
+    "games.pit.pit.PitGame": {},
+    "games.air_land_sea.game.AirLandSea": {},
+    "games.codenames.game.CodenamesGame": {},
+    "games.arctic_scavengers.arctic_scavengers.ArcticScavengers": {},
+    "games.are_you_the_traitor.aytt.AreYouTheTraitor": {},
+    "games.two_rooms_and_a_boom.two_rooms.TwoRoomsAndaBoom": {},
+}
+
+# Game path -> phase -> methods timed as that phase. Games that don't name their methods
+# get_observation and update build observations and apply actions in methods of their own.
+# None marks a phase the game does inline in play(), which can't be timed and is reported as null.
+PHASE_METHODS = defaultdict(lambda: {"get_observation": ["get_observation"], "update": ["update"]}, {
+    "games.santorini.santorini.Santorini": {
+        "get_observation": ["get_pawn_placement_observation", "get_move_build_observation"],
+        "update": ["place_pawn", "play_turn"],
+    },
+    "games.arctic_scavengers.arctic_scavengers.ArcticScavengers": {
+        "get_observation": ["observation_resource_gather", "observation_skirmish", "observation_respond_to_action", "observation_dig_cards"],
+        "update": ["update_resource_gather", "update_skirmish"],
+    },
+    "games.codenames.game.CodenamesGame": {
+        "get_observation": ["get_spymaster_observation", "get_operative_observation"],
+        "update": ["update_spymaster", "update_operative"],
+    },
+    "games.are_you_the_traitor.aytt.AreYouTheTraitor": {
+        "get_observation": ["observation_get_target", "observation_get_question", "observation_give_answer", "observation_shout_stop", "observation_get_accused"],
+        "update": None,
+    },
+    "games.two_rooms_and_a_boom.two_rooms.TwoRoomsAndaBoom": {
+        "get_observation": ["observation_get_target", "observation_get_question", "observation_give_answer"],
+        "update": ["trade_card"],
+    },
+})
+
+# Modules a match, a tournament worker or an agent imports before playing.
+IMPORT_MODULES = [
+    "api.play_game",
+    "api.tournament",
+    "agents.random_agent",
+    "agents.gpt",
+    "agents.rap.agent",
+    *[game_path.rsplit(".", 1)[0] for game_path in GAMES],
+]
+
+
+class PhaseTimer:
+    """Accumulates wall time and call counts per phase. Nested calls of the same phase are timed once."""
+
+    def __init__(self):
+        self.seconds = defaultdict(float)
+        self.calls = defaultdict(int)
+        self._depth = defaultdict(int)
+
+    def wrap(self, phase, function):
+        def timed(*args, **kwargs):
+            self._depth[phase] += 1
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self._depth[phase] -= 1
+                if self._depth[phase] == 0:
+                    self.seconds[phase] += time.perf_counter() - start
+                    self.calls[phase] += 1
+        return timed
+
+timer = PhaseTimer()
+
+@dataclass
+class TimedRandomAgent(RandomAgent):
+    def take_action(self, *args, **kwargs):
+        return timer.wrap("take_action", super().take_action)(*args, **kwargs)
+
+def timed_game_class(game_path):
+    game_class = util.import_class(game_path)
+    methods = {
+        name: timer.wrap(phase, getattr(game_class, name))
+        for phase, names in PHASE_METHODS[game_path].items()
+        for name in names or []
+    }
+    return type(game_class.__name__, (game_class,), methods)
+
+def run_game(game_path, n, fast_mode, seed, queue, game_kwargs=None):
+    """Play n RandomAgent vs RandomAgent games in this (fresh) process and put the measurements on queue."""
+    random.seed(seed)
+    try:
+        game_class = timed_game_class(game_path)
+        start = time.perf_counter()
+        for _ in range(n):
+            game = game_class(fast_mode=fast_mode, **{**GAMES.get(game_path, {}), **(game_kwargs or {})})
+            game.init_game(TimedRandomAgent, TimedRandomAgent)
+            game.play()
+        seconds = time.perf_counter() - start
+    except Exception as e:
+        queue.put({"game": game_path, "error": f"{type(e).__name__}: {e}"})
+        return
+
+    measured = [phase for phase, names in PHASE_METHODS[game_path].items() if names is not None] + ["take_action"]
+    queue.put({
+        "game": game_path,
+        "games": n,
+        "seconds": seconds,
+        "games_per_second": n / seconds,
+        "turns_per_game": timer.calls["take_action"] / n,
+        "phase_seconds": {phase: timer.seconds[phase] if phase in measured else None for phase in ["get_observation", "update", "take_action"]},
+        "phase_calls": {phase: timer.calls[phase] if phase in measured else None for phase in ["get_observation", "update", "take_action"]},
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 ** 2 if sys.platform == "darwin" else 1024),
+    })
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def benchmark(games = None, n = 10, fast_mode = True, seed = 0, timeout = 600, output_path = "benchmark_results.json", game_kwargs = None):
+    """
+    Play n RandomAgent vs RandomAgent games of every game (or of the given game paths) and report
+    games per second, turns per game, time spent in get_observation, update and take_action, and
+    peak RSS. Each game is benchmarked in a fresh process, so peak RSS is per game. Results are
+    written to output_path as json, tagged with the current git commit. game_kwargs override the
+    games' settings, e.g. --game_kwargs '{"board_size": 64, "players_per_team": 20}' for Sea Battle.
+    """
+    games = games or list(GAMES)
+    if isinstance(games, str):
+        games = [games]
+    context = multiprocessing.get_context("spawn")
+
+    results = []
+    for game_path in games:
+        queue = context.Queue()
+        process = context.Process(target=run_game, args=(game_path, n, fast_mode, seed, queue, game_kwargs))
+        process.start()
+        try:
+            result = queue.get(timeout=timeout)
+        except Exception:
+            process.terminate()
+            result = {"game": game_path, "error": f"Timed out after {timeout}s"}
+        process.join()
+        results.append(result)
+
+        if "error" in result:
+            print(f"{game_path}: {result['error']}")
+            continue
+        phases = ", ".join(
+            f"{phase} {seconds:.3f}s" if seconds is not None else f"{phase} not measured"
+            for phase, seconds in result["phase_seconds"].items()
+        )
+        print(f"{game_path}: {result['games_per_second']:.1f} games/s, {result['turns_per_game']:.1f} turns/game, {phases}, peak RSS {result['peak_rss_mb']:.0f} MB")
+
+    util.save_json({
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "fast_mode": fast_mode,
+        "games_per_title": n,
+        "seed": seed,
+        "game_kwargs": game_kwargs,
+        "results": results,
+    }, output_path)
+    return results
+
+def import_time(module, repeat=5):
+    """Median seconds to import module in a fresh interpreter, i.e. what every worker process pays."""
+    code = f"import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+    environment = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [os.getcwd(), os.environ.get("PYTHONPATH")]))}
+    seconds = []
+    for _ in range(repeat):
+        process = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=environment)
+        if process.returncode != 0:
+            raise ImportError(process.stderr.strip().splitlines()[-1])
+        seconds.append(float(process.stdout.strip().splitlines()[-1]))
+    return statistics.median(seconds)
+
+def import_times(modules = None, repeat = 5, output_path = "import_times.json"):
+    """
+    Report the median import time of each module (by default the entry points, agents and games)
+    in a fresh interpreter. Results are written to output_path as json, tagged with the current git commit.
+    """
+    modules = modules or IMPORT_MODULES
+    if isinstance(modules, str):
+        modules = [modules]
+
+    results = []
+    for module in modules:
+        try:
+            seconds = import_time(module, repeat)
+        except ImportError as e:
+            results.append({"module": module, "error": str(e)})
+            print(f"{module}: {e}")
+            continue
+        results.append({"module": module, "seconds": seconds})
+        print(f"{module}: {seconds * 1000:.0f} ms")
+
+    util.save_json({
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "repeat": repeat,
+        "results": results,
+    }, output_path)
+    return results
+
+if __name__ == "__main__":
+    fire.Fire({"games": benchmark, "imports": import_times})
@@ -2,6 +2,7 @@ from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass, field
 from abc import abstractmethod
 from PIL import Image
+import asyncio
 
 
 @dataclass
@@ -15,6 +16,15 @@ class AvailableActions:
     predefined : Dict[str, str]
     openended : Dict[str, str]
 
+    def action_ids(self) -> List[str]:
+        # Integer action i refers to the i-th entry of this list: predefined actions first, then openended ones.
+        return list(self.predefined) + list(self.openended)
+
+    def action_from_index(self, index : int, openended_response : str = "") -> "Action":
+        action_ids = self.action_ids()
+        action_id = action_ids[index]
+        return Action(action_id, openended_response if action_id in self.openended else None)
+
 @dataclass(frozen=True)
 class Action:
     action_id: str
@@ -33,6 +43,10 @@ class Agent:
     def take_action(self, rules : dict, observation: Observation, available_actions : AvailableActions, show_state : bool) -> Action:
         pass
 
+    async def take_action_async(self, rules : dict, observation: Observation, available_actions : AvailableActions, show_state : bool) -> Action:
+        # By default, run the blocking take_action in a worker thread so that several agents can wait on their LLM calls at once.
+        return await asyncio.to_thread(self.take_action, rules, observation, available_actions, show_state)
+
 @dataclass
 class Rules:
     title: str
@@ -46,6 +60,7 @@ class Game:
     rules : Rules # document that agents can reference at any point.
     agents : List[Agent] = None # agents in the game. Should be initialized in init_game. Can be more than 2 agents because there can be copies playing on a team.
     show_state : bool = False # whether to e.g. print the board
+    fast_mode : bool = False # headless simulation: skip observation text, rendering and printing. Agents only see available actions.
     game_is_over : bool = False # indicates that no more actions should be taken and the scores should be computed.
     agent_1_kwargs : dict = field(default_factory=dict) # kwargs to pass to the agent 1 class when initializing.
     agent_2_kwargs : dict = field(default_factory=dict) # kwargs to pass to the agent 2 class when initializing.
@@ -65,4 +80,8 @@ class Game:
     @abstractmethod
     def play(self) -> Tuple[float, float]:
         # Returns the scores for agent_1 and agent_2 after the game is finished.
-        pass
\ No newline at end of file
+        pass
+
+    async def play_async(self) -> Tuple[float, float]:
+        # Games where agents move simultaneously override this to gather their take_action_async calls.
+        return await asyncio.to_thread(self.play)
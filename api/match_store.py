@@ -0,0 +1,106 @@
+import fire
+import api.util as util
+from collections import defaultdict
+import json
+import os
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+class MatchStore:
+    """
+    Append-only JSON Lines log of finished matches.
+
+    Each match is one line of the form {"game": ..., <agent_1_id>: score, <agent_2_id>: score},
+    the same dicts stored in the legacy matches.json. Appends are a single O_APPEND write of a
+    whole line (under an exclusive lock where available), so concurrent runners never overwrite
+    each other. Reads are incremental: only bytes appended since the last read are parsed.
+    """
+
+    def __init__(self, path="matches.jsonl"):
+        self.path = path
+        self.matches = []
+        self.by_game = defaultdict(list)  # game -> indices into self.matches
+        self.by_pair = defaultdict(list)  # (game, frozenset of agent ids) -> indices into self.matches
+        self._offset = 0
+
+    def append(self, match):
+        line = (json.dumps(match) + "\n").encode("utf-8")
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            os.write(fd, line)
+        finally:
+            os.close(fd)  # also releases the lock
+
+    def add_match(self, game_id, agent_1_id, agent_2_id, player_1_score, player_2_score):
+        self.append({"game": game_id, agent_1_id: player_1_score, agent_2_id: player_2_score})
+
+    def refresh(self):
+        """Read and index any matches appended since the last refresh."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            data = f.read()
+        # A line without its trailing newline is an append still in flight; leave it for next time.
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            if line.strip():
+                self._index(json.loads(line))
+        self._offset += end
+
+    def _index(self, match):
+        i = len(self.matches)
+        self.matches.append(match)
+        game = match["game"]
+        agents = frozenset(k for k in match if k != "game")
+        self.by_game[game].append(i)
+        self.by_pair[game, agents].append(i)
+
+    def query(self, game=None, agents=None):
+        """Return matches, optionally restricted to a game and/or a pair of agent ids."""
+        self.refresh()
+        if agents is not None:
+            agents = frozenset(agents)
+            if game is not None:
+                return [self.matches[i] for i in self.by_pair[game, agents]]
+            return [self.matches[i] for (_, a), ids in self.by_pair.items() if a == agents for i in ids]
+        if game is not None:
+            return [self.matches[i] for i in self.by_game[game]]
+        return list(self.matches)
+
+    def export_json(self, path="matches.json"):
+        """Write every match to the legacy matches.json format read by rating.py."""
+        util.save_json(self.query(), path)
+
+    def import_json(self, path="matches.json"):
+        """Append every match of a legacy matches.json that is not already in the log."""
+        self.refresh()
+        # Matches carry no ids, so a match counts as present as many times as it is already logged.
+        seen = defaultdict(int)
+        for match in self.matches:
+            seen[json.dumps(match, sort_keys=True)] += 1
+        for match in util.load_json(path):
+            key = json.dumps(match, sort_keys=True)
+            if seen[key] > 0:
+                seen[key] -= 1
+            else:
+                self.append(match)
+
+
+def export_json(store_path="matches.jsonl", path="matches.json"):
+    MatchStore(store_path).export_json(path)
+
+def import_json(store_path="matches.jsonl", path="matches.json"):
+    MatchStore(store_path).import_json(path)
+
+if __name__ == "__main__":
+    fire.Fire({"export_json": export_json, "import_json": import_json})
@@ -1,9 +1,41 @@
 import fire
 import api.util as util
+from api.match_store import MatchStore
+from agents.llm_metrics import tagged
+import os
 import random
+import uuid
 
 K = 32
 
+def play_match(agent_1_class, agent_2_class, game_class, show_state=False, agent_1_kwargs = {}, agent_2_kwargs = {}):
+    """Play a single match, randomly choosing which agent goes first. Returns (agent_1 score, agent_2 score)."""
+    # LLM calls made during the match are tagged with it, so their cost can be summed per match.
+    with tagged(game=game_class.id, match=uuid.uuid4().hex):
+        return _play_match(agent_1_class, agent_2_class, game_class, show_state, agent_1_kwargs, agent_2_kwargs)
+
+def _play_match(agent_1_class, agent_2_class, game_class, show_state, agent_1_kwargs, agent_2_kwargs):
+    if random.choice([0,1]):
+        game = game_class(show_state=show_state, agent_1_kwargs=agent_1_kwargs, agent_2_kwargs=agent_2_kwargs)
+        game.init_game(agent_1_class, agent_2_class)
+        player_1_score, player_2_score = game.play()
+    else:
+        game = game_class(show_state=show_state, agent_1_kwargs=agent_2_kwargs, agent_2_kwargs=agent_1_kwargs)
+        game.init_game(agent_2_class, agent_1_class)
+        player_2_score, player_1_score = game.play()
+    return player_1_score, player_2_score
+
+def open_match_store(path = "matches.jsonl", legacy_path = "matches.json"):
+    """The match log at path. A new log starts with the matches of the legacy matches.json, so that
+    historical averages count the same matches as rating.py."""
+    store = MatchStore(path)
+    if not os.path.exists(path) and os.path.exists(legacy_path):
+        store.import_json(legacy_path)
+    return store
+
+def save_match(game_id, agent_1_id, agent_2_id, player_1_score, player_2_score, path = "matches.jsonl"):
+    open_match_store(path).add_match(game_id, agent_1_id, agent_2_id, player_1_score, player_2_score)
+
 def play_game(agent_1_path, agent_2_path, game_path, num_matches = 1, save_results = True, show_state=False, agent_1_kwargs = {}, agent_2_kwargs = {}):
     agent_1_class = util.import_class(agent_1_path)
     agent_2_class = util.import_class(agent_2_path)
@@ -34,13 +66,12 @@ def play_game(agent_1_path, agent_2_path, game_path, num_matches = 1, save_resul
     #print(f"{agent_2_id} elo: ", agent_2_rating)
 
     # Get historical win percentage
-    matches = util.load_json("matches.json")
+    matches = open_match_store().query(game=game_class.id, agents=(agent_1_id, agent_2_id))
     agent_1_total = 0
     total_matches = 0
     for m in matches:
-        if m["game"] == game_class.id and agent_1_id in m and agent_2_id in m:
-            agent_1_total += m[agent_1_id]
-            total_matches += 1
+        agent_1_total += m[agent_1_id]
+        total_matches += 1
 
     if total_matches > 0:
         print(f"Historical average scores for these two agents across {num_matches} matches:")
@@ -54,14 +85,7 @@ def play_game(agent_1_path, agent_2_path, game_path, num_matches = 1, save_resul
     #agent_2_expected_score = Q2 / (Q1 + Q2)
 
     for _ in range(num_matches):
-        if random.choice([0,1]):
-            game = game_class(show_state=show_state, agent_1_kwargs=agent_1_kwargs, agent_2_kwargs=agent_2_kwargs)
-            game.init_game(agent_1_class, agent_2_class)
-            player_1_score, player_2_score = game.play()
-        else:
-            game = game_class(show_state=show_state, agent_1_kwargs=agent_2_kwargs, agent_2_kwargs=agent_1_kwargs)
-            game.init_game(agent_2_class, agent_1_class)
-            player_2_score, player_1_score = game.play()
+        player_1_score, player_2_score = play_match(agent_1_class, agent_2_class, game_class, show_state, agent_1_kwargs, agent_2_kwargs)
 
         print(f"{agent_1_id} score: ", player_1_score)
         print(f"{agent_2_id} score: ", player_2_score)
@@ -70,15 +94,7 @@ def play_game(agent_1_path, agent_2_path, game_path, num_matches = 1, save_resul
         player_2_total += player_2_score
 
         if save_results:
-            matches = util.load_json(f"matches.json")
-            matches.append(
-                {
-                    "game": game_class.id,
-                    agent_1_id: player_1_score,
-                    agent_2_id: player_2_score,
-                }
-            )
-            util.save_json(matches, "matches.json")
+            save_match(game_class.id, agent_1_id, agent_2_id, player_1_score, player_2_score)
             print("Saved match information")
 
             #agent_1_rating = agent_1_rating + K * (player_1_score - agent_1_expected_score)
@@ -0,0 +1,58 @@
+import fire
+import api.util as util
+from api.classes import Agent, AvailableActions, Action, Observation, Rules
+from dataclasses import dataclass
+from typing import Callable
+import random
+import time
+
+def random_policy(available_actions : AvailableActions) -> int:
+    return random.randrange(len(available_actions.action_ids()))
+
+@dataclass
+class PolicyAgent(Agent):
+    """Agent that picks actions with a plain function, for cheap simulations (e.g. MCTS rollouts)."""
+    agent_type_id : str = "policy"
+    # Maps the available actions to an index into available_actions.action_ids().
+    policy : Callable[[AvailableActions], int] = random_policy
+
+    def take_action(self, rules : Rules, observation: Observation, available_actions: AvailableActions, show_state : bool) -> Action:
+        return available_actions.action_from_index(self.policy(available_actions))
+
+    async def take_action_async(self, rules : Rules, observation: Observation, available_actions: AvailableActions, show_state : bool) -> Action:
+        return self.take_action(rules, observation, available_actions, show_state)
+
+def rollout(game, n = 1, policy = random_policy, policy_2 = None, seed = None, **game_kwargs):
+    """
+    Play n headless games of game (a Game class or its import path) between two PolicyAgents and
+    return the list of (player 1 score, player 2 score). Games run with fast_mode, so no observation
+    text is built and nothing is rendered or printed. policy_2 defaults to policy.
+    """
+    game_class = util.import_class(game) if isinstance(game, str) else game
+    if seed is not None:
+        random.seed(seed)
+    policy_2 = policy_2 or policy
+
+    scores = []
+    for _ in range(n):
+        instance = game_class(
+            fast_mode=True,
+            agent_1_kwargs={"policy": policy},
+            agent_2_kwargs={"policy": policy_2},
+            **game_kwargs,
+        )
+        instance.init_game(PolicyAgent, PolicyAgent)
+        scores.append(instance.play())
+    return scores
+
+def main(game_path, n = 100, seed = None):
+    start = time.perf_counter()
+    scores = rollout(game_path, n, seed=seed)
+    seconds = time.perf_counter() - start
+    n = len(scores)
+    print(f"Played {n} games in {seconds:.2f}s ({n / seconds:.1f} games/s)")
+    print("Player 1 average score: ", sum(s[0] for s in scores) / n)
+    print("Player 2 average score: ", sum(s[1] for s in scores) / n)
+
+if __name__ == "__main__":
+    fire.Fire(main)
@@ -0,0 +1,134 @@
+import fire
+import api.util as util
+from api.play_game import play_match, save_match
+from rating import OnlineRatings
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+import os
+import random
+
+def play_shard(agent_1_path, agent_2_path, game_path, num_matches, seed, show_state=False, agent_1_kwargs = {}, agent_2_kwargs = {}, concurrent_matches = 1):
+    """
+    Play num_matches matches in a worker process and return the list of (agent_1 score, agent_2 score).
+    With concurrent_matches > 1 the matches are played in that many threads, so agents on a local
+    model (LocalTextAgent) can batch their prompts across matches. The threads then share the global
+    random state in an unpredictable order, so a seeded shard is only reproducible with concurrent_matches=1.
+    """
+    # Forked workers inherit the parent's random state, so every shard gets its own seed.
+    random.seed(seed)
+    agent_1_class = util.import_class(agent_1_path)
+    agent_2_class = util.import_class(agent_2_path)
+    game_class = util.import_class(game_path)
+    def play(_):
+        return play_match(agent_1_class, agent_2_class, game_class, show_state, agent_1_kwargs, agent_2_kwargs)
+    if concurrent_matches <= 1:
+        return [play(i) for i in range(num_matches)]
+    with ThreadPoolExecutor(max_workers=concurrent_matches) as executor:
+        return list(executor.map(play, range(num_matches)))
+
+def make_shards(grid, matches_per_shard):
+    """Split every grid entry into shards of at most matches_per_shard matches."""
+    shards = []
+    for entry_index, entry in enumerate(grid):
+        remaining = entry.get("num_matches", 1)
+        while remaining > 0:
+            n = min(matches_per_shard, remaining)
+            shards.append((entry_index, n))
+            remaining -= n
+    return shards
+
+def print_leaderboard(ratings, game):
+    print(f"Leaderboard for {game}:")
+    for agent, rating, (low, high), n in ratings.leaderboard(game):
+        print(f"\t{agent}: {rating:.2f} ({low:.2f} to {high:.2f}) over {n} matches")
+
+def play_tournament(grid, num_workers = None, matches_per_shard = None, save_results = True, show_state = False, seed = None, show_leaderboard = False, concurrent_matches = 1):
+    """
+    Play every (agent pair, game, match count) entry of grid across a process pool.
+
+    grid is a list of dicts (or the path to a json file containing one) with the keys
+    agent_1_path, agent_2_path, game_path, num_matches and, optionally, agent_1_kwargs
+    and agent_2_kwargs. Matches are sharded into tasks of matches_per_shard matches and
+    results are merged (and saved) in this process as each shard completes. With
+    show_leaderboard, the game's live ratings are printed every time a shard completes. Each shard
+    plays up to concurrent_matches of its matches at a time, so shards hold at least
+    concurrent_matches matches (matches_per_shard defaults to concurrent_matches). A seed makes
+    the run reproducible only with concurrent_matches=1, since concurrent matches draw from the
+    same random state.
+
+    num_workers defaults to the number of CPUs, or to 1 if an agent runs a local model: every
+    worker process loads its own copy of the model, so only raise it if they all fit in memory.
+    """
+    if isinstance(grid, str):
+        grid = util.load_json(grid)
+    matches_per_shard = max(matches_per_shard or 1, concurrent_matches)
+    rng = random.Random(seed)
+
+    entries = []
+    local_model = False
+    for entry in grid:
+        agent_1_class = util.import_class(entry["agent_1_path"])
+        agent_2_class = util.import_class(entry["agent_2_path"])
+        local_model |= getattr(agent_1_class, "loads_local_model", False) or getattr(agent_2_class, "loads_local_model", False)
+        agent_1_id = agent_1_class.agent_type_id
+        agent_2_id = agent_2_class.agent_type_id
+        game_id = util.import_class(entry["game_path"]).id
+        if agent_1_id == agent_2_id:
+            print(f"You have passed the same class for both agents in {game_id}. No results will be saved for this entry.")
+        entries.append({"game": game_id, "agent_1_id": agent_1_id, "agent_2_id": agent_2_id, "scores": []})
+
+    num_workers = num_workers or (1 if local_model else os.cpu_count())
+    ratings = OnlineRatings(agents=[])
+    shards = make_shards(grid, matches_per_shard)
+    print(f"Playing {sum(n for _, n in shards)} matches in {len(shards)} shards across {num_workers} workers")
+
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        futures = {}
+        for entry_index, n in shards:
+            entry = grid[entry_index]
+            future = executor.submit(
+                play_shard,
+                entry["agent_1_path"],
+                entry["agent_2_path"],
+                entry["game_path"],
+                n,
+                rng.getrandbits(64),
+                show_state,
+                entry.get("agent_1_kwargs", {}),
+                entry.get("agent_2_kwargs", {}),
+                concurrent_matches,
+            )
+            futures[future] = entry_index
+
+        for future in as_completed(futures):
+            result = entries[futures[future]]
+            try:
+                scores = future.result()
+            except Exception as e:
+                print(f"A shard of {result['agent_1_id']} vs {result['agent_2_id']} in {result['game']} failed: {e}")
+                continue
+
+            result["scores"].extend(scores)
+            if save_results and result["agent_1_id"] != result["agent_2_id"]:
+                # Only the parent process writes, so concurrent shards never race on the match file.
+                for player_1_score, player_2_score in scores:
+                    save_match(result["game"], result["agent_1_id"], result["agent_2_id"], player_1_score, player_2_score)
+            print(f"{result['game']}: {result['agent_1_id']} vs {result['agent_2_id']} finished {len(result['scores'])} matches")
+
+            if result["agent_1_id"] != result["agent_2_id"]:
+                for player_1_score, player_2_score in scores:
+                    ratings.add_match({"game": result["game"], result["agent_1_id"]: player_1_score, result["agent_2_id"]: player_2_score})
+                if show_leaderboard:
+                    print_leaderboard(ratings, result["game"])
+
+    print("")
+    for result in entries:
+        n = len(result["scores"])
+        if n == 0:
+            continue
+        print(f"{result['game']}: {result['agent_1_id']} average score: ", sum(s[0] for s in result["scores"]) / n)
+        print(f"{result['game']}: {result['agent_2_id']} average score: ", sum(s[1] for s in result["scores"]) / n)
+
+    return entries
+
+if __name__ == "__main__":
+    fire.Fire(play_tournament)
@@ -3,7 +3,7 @@ import os
 import json
 
 def save_json(data, file_path):
-    if not os.path.exists(file_path):
+    if not os.path.exists(file_path) and os.path.dirname(file_path):
         os.makedirs(os.path.dirname(file_path), exist_ok=True)
     with open(file_path, "w") as f:
         json.dump(data, f, indent=4)
@@ -0,0 +1,42 @@
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+from api.classes import AvailableActions
+from games.air_land_sea.cards import Card
+
+@dataclass
+class ActionPayload:
+    # what an action does, so that the game never has to parse its description
+    # kind is one of "play", "withdraw", "flip", "move", "return" and "pass" (decline a tactical ability)
+    kind: str
+    card: Optional[Card] = None
+    # name of the theater the card is played or moved to, or for flip and return of the theater it is in
+    theater: Optional[str] = None
+    # whether the card is played faceup, or for flip whether it ends up faceup
+    faceup: bool = True
+
+@dataclass
+class AirLandSeaActions(AvailableActions):
+    # action id -> payload of every predefined action
+    payloads: Dict[str, ActionPayload] = field(default_factory=dict)
+    # descriptions are only rendered for agents that read them, not in fast_mode
+    render: bool = True
+
+    def add(self, payload: ActionPayload, describe: Callable[[ActionPayload], str]) -> str:
+        # add an action with the next action id, described by describe(payload) if descriptions are rendered
+        action_id = str(len(self.predefined))
+        self.predefined[action_id] = describe(payload) if self.render else ""
+        self.payloads[action_id] = payload
+        return action_id
+
+    def extend(self, payloads: List[ActionPayload], describe: Callable[[ActionPayload], str]):
+        # add several actions at once, numbered in order
+        action_ids = [str(action_id) for action_id in range(len(self.predefined), len(self.predefined) + len(payloads))]
+        self.payloads.update(zip(action_ids, payloads))
+        if self.render:
+            self.predefined.update(zip(action_ids, map(describe, payloads)))
+        else:
+            self.predefined.update(dict.fromkeys(action_ids, ""))
+
+    def remove(self, action_id: str):
+        del self.predefined[action_id]
+        del self.payloads[action_id]
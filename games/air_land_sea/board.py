@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from typing import List, Tuple, Optional
+from typing import List, Tuple, Optional, Dict
 import random
 from games.air_land_sea.cards import Card
 from games.air_land_sea.effect_manager import EffectManager
@@ -13,6 +13,8 @@ class Theater:
 
     def __post_init__(self):
         self.player_cards = [self.player_1_cards, self.player_2_cards]
+        # total current strength of each player's cards here, kept up to date by the board
+        self.strengths = [0, 0]
 
     def is_uncovered(self, card: Card, player_id: int) -> bool:
         # the last one in the list is the uncovered card
@@ -76,11 +78,14 @@ class Board:
         Theater('Land')
     ])
     # ongoing_effects: List[Card] = field(default_factory=list) # ongoing effects that affect the board
+    effect_manager: Optional[EffectManager] = None # effects in play, which Escalation and Cover Fire strengths depend on
 
     def __post_init__(self):
         # shuffle theaters into random order
         random.shuffle(self.theaters)
-        pass
+        # (card name, card theater) -> (owner id, theater, position in the owner's cards there)
+        # name and theater identify a card in the deck; cards must be placed, removed and moved through the board to keep this up to date
+        self.card_locations: Dict[Tuple[str, str], Tuple[int, Theater, int]] = {}
 
     def clear_cards(self):
         for theater in self.theaters:
@@ -88,6 +93,60 @@ class Board:
             theater.player_2_cards.clear()
             for player_id in range(2):
                 theater.player_cards[player_id].clear()
+            theater.strengths = [0, 0]
+        self.card_locations.clear()
+
+    def locate(self, card: Card) -> Optional[Tuple[int, Theater, int]]:
+        # return (owner id, theater, position) of a card on the board, or None if it isn't on the board
+        if card is None:
+            return None
+        return self.card_locations.get((card.name, card.theater))
+
+    def place(self, card: Card, player_id: int, theater: Theater):
+        # put the card on top of (covering) player_id's cards in the theater
+        cards = theater.player_cards[player_id]
+        self.card_locations[(card.name, card.theater)] = (player_id, theater, len(cards))
+        cards.append(card)
+        self.refresh(player_id)
+
+    def remove(self, card: Card):
+        # take the card off the board, e.g. to return it to its owner's hand
+        player_id, theater, position = self.card_locations.pop((card.name, card.theater))
+        cards = theater.player_cards[player_id]
+        del cards[position]
+        # the cards that were above it move down one position
+        for position, above in enumerate(cards[position:], start=position):
+            self.card_locations[(above.name, above.theater)] = (player_id, theater, position)
+        self.refresh(player_id)
+
+    def refresh(self, player_id: int):
+        # recompute the current strength of player_id's cards and their total in each theater
+        # called whenever one of their cards is placed, removed, moved or flipped, or one of their ongoing effects starts or stops
+        escalation = self.ongoing_effect_location("Escalation", "Sea", player_id)
+        cover_fire = self.ongoing_effect_location("Cover Fire", "Land", player_id)
+        for theater in self.theaters:
+            # all cards covered by Cover Fire are strength 4
+            covered = cover_fire[2] if cover_fire is not None and cover_fire[1] is theater else 0
+            total = 0
+            for position, card in enumerate(theater.player_cards[player_id]):
+                if position < covered:
+                    card.current_strength = 4
+                elif card.facedown:
+                    # Escalation makes all of its owner's facedown cards strength 4
+                    card.current_strength = 4 if escalation is not None else 2
+                else:
+                    card.current_strength = card.strength
+                total += card.current_strength
+            theater.strengths[player_id] = total
+
+    def ongoing_effect_location(self, card_name: str, theater_name: str, player_id: int) -> Optional[Tuple[int, Theater, int]]:
+        # return the location of player_id's card if it is on their side of the board and its effect is in play for them
+        if self.effect_manager is None or not self.effect_manager.has_effect(card_name, player_id):
+            return None
+        location = self.card_locations.get((card_name, theater_name))
+        if location is None or location[0] != player_id:
+            return None
+        return location
 
     def rotate_theaters(self):
         # rotate the theaters clockwise
@@ -109,33 +168,24 @@ class Board:
 
     def search_ongoing_effect_location(self, card: Card, effect_manager: EffectManager) -> List[Optional[int]]:
         # this function checks if a card is in play and in effect manager as well as which theater it is in
-        target_theater = [None, None]
-        # returns a list of size 2
-        for player_id in range(2):
-            if card in effect_manager.effect_cards[player_id]:
-                # if the player has Support, find adjacent theaters
-                for index, theater in enumerate(self.theaters):
-                    if card in theater.player_cards[player_id]:
-                        # if the theater has Support, place its index in the tuple associated with the player
-                        target_theater[player_id] = index
-        if target_theater == [None, None]:
+        # returns a list of size 2 with the theater index for the player who has it in effect, or None if no one does
+        location = self.locate(card)
+        if location is None:
             return None
+        player_id, theater, _ = location
+        if not effect_manager.has_effect(card.name, player_id):
+            return None
+        target_theater = [None, None]
+        target_theater[player_id] = self.get_theater_index(theater.name)
         return target_theater
 
     def search_card(self, card_name: str, theater_name: str) -> Card:
         # return the card with the given name and theater
-        # theater = self.get_theater_by_name(theater_name)
-
-        # print("inside board.search_card - card_name:{}, theater_name:{}".format(card_name, theater_name))
-        # print("found theater:{}".format(theater))
-
-        for player_id in range(2):
-            for theater in self.theaters:
-                for card in theater.player_cards[player_id]:
-                    if card.name == card_name and card.theater == theater_name:
-                        return card
-        # print("inside board.search_card: could not find card in any theater")
-        return None
+        location = self.card_locations.get((card_name, theater_name))
+        if location is None:
+            return None
+        player_id, theater, position = location
+        return theater.player_cards[player_id][position]
     
     def get_adjacent_theaters(self, theater_index) -> List[int]:
         """
@@ -160,40 +210,21 @@ class Board:
 
     def get_theater_strengths(self, effect_manager: EffectManager) -> List[Tuple[int, int]]:
         # return the strength of each theater
-                # return the strength of the player in the theater
-        # check for Support card
-        # then apply to computed adjacent theaters if so
-        theater_strengths = [[], [], []]
-        support = Card('Support', 'Air', 1, 'Ongoing', 'You gain +3 strength in each adjacent theater')
-        support_search = self.search_ongoing_effect_location(support, effect_manager)
-        # find adjacent theaters if Support is in play to apply its effect
-        # say we get [None, 0] (player 2 has Support in the third theater)
+        # the strength of the cards is kept up to date as they are played, so only Support's +3 in adjacent theaters is added here
+        theater_strengths = [list(theater.strengths) for theater in self.theaters]
         for player_id in range(2):
-            if support_search is not None:
-                if support_search[player_id] is not None:
-                    adj_theaters = self.get_adjacent_theaters(support_search[player_id])
-            # calculate the strength of each theater based on the cards in it normally
-            for index, theater in enumerate(self.theaters):
-                strength = 0
-                for card in theater.player_cards[player_id]:
-                    strength += card.current_strength
-                    # print(f'theater: {index}, card: {card.name}, current_strength: {card.current_strength}, strength: {card.strength}, facedown: {card.facedown}')
-                # apply Support effect if necessary
-                if support_search is not None:
-                    if support_search[player_id] is not None:
-                        if index in adj_theaters:
-                            strength += 3
-                theater_strengths[index].append(strength)
+            if effect_manager.has_effect('Support', player_id):
+                support = self.card_locations.get(('Support', 'Air'))
+                if support is not None and support[0] == player_id:
+                    for index in self.get_adjacent_theaters(self.get_theater_index(support[1].name)):
+                        theater_strengths[index][player_id] += 3
         return theater_strengths
 
     def move_card(self, card : Card, to_theater : Theater):
-        # move card to the theater on the same side it is already on
-        for player_id in range(2):
-            for theater in self.theaters:
-                if card in theater.player_cards[player_id]:
-                    theater.player_cards[player_id].remove(card)
-                    # apparently to_theater is the same as the theater it is already in
-                    to_theater.player_cards[player_id].append(card)
-                    # print("inside move_card: moved card")
-                    return
-        # print("could not find card in any theater")
+        # move card to the theater on the same side it is already on, covering the cards there
+        location = self.locate(card)
+        if location is None:
+            # print("could not find card in any theater")
+            return
+        self.remove(card)
+        self.place(card, location[0], to_theater)
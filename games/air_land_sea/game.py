@@ -9,6 +9,7 @@ from .player import Player
 from .cards import Card, Deck
 import random
 from .effect_manager import EffectManager
+from .actions import ActionPayload, AirLandSeaActions
 import re
 import pprint
 
@@ -94,7 +95,7 @@ class AirLandSea(Game):
 
     def init_game(self, agent1 : Agent, agent2 : Agent):
         self.effect_manager = EffectManager()
-        self.board : Board = Board() # theater_order is randomized on init
+        self.board : Board = Board(effect_manager=self.effect_manager) # theater_order is randomized on init
         self.deck = Deck() # shuffled on init
         p1_hand = self.deck.deal()
         p2_hand = self.deck.deal()
@@ -111,59 +112,8 @@ class AirLandSea(Game):
                 return player
         return None
 
-    def apply_strength_effects(self):
-        # called in get_observation
-        # applies increase in current strength from Escalation and Cover Fire to applicable cards
-        # check effect manager for existence and index of escalation and(or) cover fire
-
-        # Use ongoing effect location to determine if in play and in effect manager and for who and where
-        escalation = self.board.search_card("Escalation", "Sea")
-        escalation_search = self.board.search_ongoing_effect_location(escalation, self.effect_manager)
-        cover_fire = self.board.search_card("Cover Fire", "Land")
-        cover_fire_search = self.board.search_ongoing_effect_location(cover_fire, self.effect_manager)
-
-        # find all facedown cards in one player's side of the board and set current strength to 4
-        # but if escalation is not, then set all facedown cards to 2?
-        if escalation_search:
-            escalation_player_ids = [player_id for player_id, theater_ind in enumerate(escalation_search) if theater_ind]
-            if self.show_state:
-                print("escalation_player_ids:", escalation_player_ids)
-            for player_id in escalation_player_ids:
-                for theater in self.board.theaters:
-                    for card in theater.player_cards[player_id]:
-                        if card.facedown:
-                            card.current_strength = 4
-        else:
-            for player in self.players:
-                for theater in self.board.theaters:
-                    for card in theater.player_cards[player.id]:
-                        if card.facedown:
-                            card.current_strength = 2
-        
-        # find covered cards by cover_fire then make their current strength 4
-        if cover_fire_search:
-            cover_fire_player_ids = [player_id for player_id, theater_ind in enumerate(cover_fire_search) if theater_ind]
-            if self.show_state:
-                print("cover fire search:", cover_fire_search)
-                print("cover fire player ids:", cover_fire_player_ids)
-            for player_id in cover_fire_player_ids:
-                theater_cards = self.board.theaters[cover_fire_search[player_id]].player_cards[player_id]
-                cover_fire_ind = theater_cards.index(cover_fire)
-                cards_to_affect = theater_cards[:cover_fire_ind]
-                if self.show_state:
-                    print("cards to affect:", cards_to_affect)
-                for card in cards_to_affect:
-                    card.current_strength = 4
-        else:
-            for player in self.players:
-                for theater in self.board.theaters:
-                    for card in theater.player_cards[player.id]:
-                        if not card.facedown:
-                            card.current_strength = card.strength
-            pass
-
     # generate observation and available actions for the agent
-    def get_observation(self, agent : Agent) -> Tuple[Observation, AvailableActions]:
+    def get_observation(self, agent : Agent) -> Tuple[Observation, AirLandSeaActions]:
         player = self.get_player_by_agent_id(agent.agent_id)
         # print("player_id", player.id)
         # Observation includes
@@ -178,163 +128,63 @@ class AirLandSea(Game):
         # print("victory points:",victory_points)
         # the opponent sees the name as facedown
         # but the player sees the normal card but with "Facedown-" in front of the name and strength set to 2
-        self.apply_strength_effects()
-        board_string = self.board.get_board_string(player.id)
-        hand_string = ""
-        for card in hand:
-            hand_string += "  "+ str(card) + "\n"
+        # (current strengths, including Escalation and Cover Fire, are kept up to date by the board)
+        observation_text = ""
+        if not self.fast_mode:
+            board_string = self.board.get_board_string(player.id)
+            hand_string = ""
+            for card in hand:
+                hand_string += "  "+ str(card) + "\n"
+
+            observation_text = (
+                "\n"
+                "----- Player " + str(player.id + 1) + "'s action -----\n"
+                "Current Hand: \n" + hand_string + ""
+                "Current Supreme Commander: " + supreme_commander + "\n"
+                "Current Victory Points: " + victory_points + "\n"
+                "Current Hand Size: " + hand_size + "\n"
+                "Current Opponent Hand Size: " + opponent_hand_size + "\n"
+                "Current Board: \n" + board_string
+            )
 
-        observation_text = (
-            "\n"
-            "----- Player " + str(player.id + 1) + "'s action -----\n"
-            "Current Hand: \n" + hand_string + ""
-            "Current Supreme Commander: " + supreme_commander + "\n"
-            "Current Victory Points: " + victory_points + "\n"
-            "Current Hand Size: " + hand_size + "\n"
-            "Current Opponent Hand Size: " + opponent_hand_size + "\n"
-            "Current Board: \n" + board_string
+        # action ids count up from 0 in the order the actions are added, each with a payload saying what it does
+        # descriptions like 'Play {card} faceup to {card.theater}. Deploy.' are only rendered outside of fast_mode
+        available_actions = AirLandSeaActions(
+            instructions = "Select a card from your hand to play to a theater",
+            predefined = {},
+            openended = {},
+            render = not self.fast_mode
         )
-
-        # a dictionary formatted like so:
-        # { 'Play {card.name}' : 'Play {card} faceup to {card.theater}'}}
-        cards_to_play = {}
-        for action_id, card in enumerate(hand):
-            cards_to_play[str(action_id)] = f"Play {card} faceup to {card.theater}. Deploy."
+        available_actions.extend([ActionPayload("play", card, card.theater) for card in hand], lambda payload: f"Play {payload.card} faceup to {payload.theater}. Deploy.")
         # Facedown cards can be played to any theater, make 3 actions for each card for each of the 3 theaters.
         # facedown action_id must increase counting up from len(hand)
-        for action_id, card in enumerate(hand, start=len(hand)):
-            cards_to_play[str(action_id)] = f"Play {card} facedown to Air. Improvise."
-        for action_id, card in enumerate(hand, start=len(hand)*2):
-            cards_to_play[str(action_id)] = f"Play {card} facedown to Land. Improvise."
-        for action_id, card in enumerate(hand, start=len(hand)*3):
-            cards_to_play[str(action_id)] = f"Play {card} facedown to Sea. Improvise."
-
-        cards_to_play[str(len(hand)*4)] = "Withdraw from the battle. Opponent scores VPs based on the number of cards left in your hand."
+        for theater_name in ("Air", "Land", "Sea"):
+            available_actions.extend([ActionPayload("play", card, theater_name, faceup=False) for card in hand], lambda payload: f"Play {payload.card} facedown to {payload.theater}. Improvise.")
 
-        available_actions = AvailableActions(
-            instructions = "Select a card from your hand to play to a theater",
-            predefined = cards_to_play,
-            openended = {}
-        )
+        available_actions.add(ActionPayload("withdraw"), lambda payload: "Withdraw from the battle. Opponent scores VPs based on the number of cards left in your hand.")
         return Observation(text=observation_text), available_actions
     
-    def find_card_from_action(self, action : Action, available_actions: AvailableActions, agent : Agent=None) -> Card:
-        # the agent is the one is playing or flipping the card
-        action_id = action.action_id
-        action_desc = available_actions.predefined[action_id]
-        # find which card was just played
-        # can use name and theater to find the card
-        # name will suffice except for maneuver
-        # find name in string (comes after "Play" and before the '(')
-
-        # card_name_pattern = r'Play\s+([^(]+)\s+\(' # old
-        card_name_pattern = r"(?:Play|Flip|Move|Return)\s+([^(]+)\s+\(" # checks between Play or Flip and the '('
-        theater_pattern = r'\d,\s+(\w+)\s*[),]?' # checks after number and comma and before the the next comma (excluding whitespace)
-        card_name_match = re.search(card_name_pattern, action_desc)
-        if card_name_match:
-            card_name = card_name_match.group(1).strip()  # .strip() to remove trailing spaces
-        else:
-            card_name = None
-        theater_match = re.search(theater_pattern, action_desc)
-        if theater_match:
-            theater_name = theater_match.group(1)
-        else:
-            theater_name = None
-        
-
-        # print("inside find_card_from_action")
-        # print("card name:", card_name + ".end")
-        # print("theater:", theater + ".end")
-        found_card = None
-        if action_desc.startswith("Flip") or action_desc.startswith("Move") or action_desc.startswith("Return"):
-            # locate from board
-            if card_name == "Facedown":
-                # print("inside card_name == Facedown in find card")
-                # when card_name is Facedown it's the opponent's facedown card
-                # the case where the agent is flipping an unknown (ie. the oppponent's) uncovered facedown card
-                theater = self.find_theater_played_from_action(action, available_actions)
-                # print("theater found:", theater)
-                # choose the opponent's uncovered facedown card
-                opponent_id = 1 - agent.agent_id
-                found_card = theater.player_cards[opponent_id][-1]
-            else:
-                if action_desc.startswith("Move") and card_name.startswith("Facedown-<"):
-                    # the case where we're moving a facedown card we own looks like "Facedown-<card_name>"
-                    card_name = re.search(r"<([^>]+)>", card_name).group(1)
-                    theater_name = re.search(r'>,\s*(\w+)', action_desc).group(1)
-                    # print("inside find_card_from_action Move Facedown-< format:")
-                    # print("card_name:", card_name)
-                    # print("theater_name:", theater_name)
-
-                # locate from theater
-                # print("using flip to search board for card")
-                # print("running board.search_card in find_card")
-                found_card = self.board.search_card(card_name, theater_name)
-        else:
-            # locate from hand if play
-            # you need to locate it from their hand not the board
-            found_card = self.player1.search_hand(card_name, theater_name)
-            if found_card == None:
-                found_card = self.player2.search_hand(card_name, theater_name)
-            if found_card == None:
-                print("error: could not find card from action")
-        # print("found card in find_card:", found_card)
-        return found_card
-
-    def find_theater_played_from_action(self, action : Action, available_actions: AvailableActions) -> Theater:
-        # returns string of theater name
-        action_id = action.action_id
-        action_desc = available_actions.predefined[action_id]
-        theater_pattern = r'to (\w+)\.' # after the word "to" and before the period
-        if action_desc.startswith("Flip") or action_desc.startswith("Return"):
-            theater_pattern = r'\)\s+in\s+(\w+)' # the word after the ')' and 'in'
-        theater_match = re.search(theater_pattern, action_desc)
-        if theater_match:
-            theater = theater_match.group(1)
-        else:
-            theater = None
-        # print("theater found in find_theater:", theater)
-        # print("inside find_theater_played_from_action")
-        # print("theater:", theater)
-        theater = self.board.get_theater_by_name(theater)
-        return theater
-
-    def find_faceup_or_facedown_from_action(self, action : Action, available_actions : AvailableActions) -> bool:
-        action_id = action.action_id
-        action_desc = available_actions.predefined[action_id]
-        if 'faceup' not in action_desc:
-            return "facedown"
-        else:
-            return "faceup"
-
-    def check_destroy_triggers(self, action : Action, available_actions : AvailableActions):
+    def check_destroy_triggers(self, action : Action, available_actions : AirLandSeaActions):
         # returns a flag indicating whether to destroy the card or not
         destroy = False
-        action_id = action.action_id
-        action_desc = available_actions.predefined[action_id]
+        payload = available_actions.payloads[action.action_id]
         # checking for Containment, Blockade
         # first check for Containment Effect in any player's effect cards
-        if any(card.name == 'Containment' for player_cards in self.effect_manager.effect_cards for card in player_cards):
-            # if the description does not contain the word faceup then the action was to play a facedown card
-            if 'faceup' not in action_desc:
+        if self.effect_manager.has_effect('Containment'):
+            # the action was to play a facedown card
+            if not payload.faceup:
                 # destroy the card
                 destroy = True
-        if any(card.name == 'Blockade' for player_cards in self.effect_manager.effect_cards for card in player_cards):
+        if self.effect_manager.has_effect('Blockade'):
             # find just_played card its location
-            just_played_card = self.find_card_from_action(action, available_actions)
-            just_played_card_location = self.find_theater_played_from_action(action, available_actions)
+            just_played_card_location = self.board.get_theater_by_name(payload.theater)
 
             # print("inside blockade - just_played_card_location = ", just_played_card_location)
             # print("inside blockade - just_played_card = ", just_played_card)
 
-            # find theater of Blockade card by searching for it in every theater            
-            for player in self.players:
-                for theater in self.board.theaters:
-                    for card in theater.player_cards[player.id]:
-                        if card.name == 'Blockade':
-                            blockade_location = theater
-                            break
-                            
+            # find theater of Blockade card
+            _, blockade_location, _ = self.board.card_locations[('Blockade', 'Sea')]
+            
             # print("inside blockade - blockade_location = ", blockade_location)
             
             # find adjacent theaters to the Blockade card's current theater
@@ -376,10 +226,10 @@ class AirLandSea(Game):
         return destroy
     
     # I pass in observation + available actions to agent, then it will choose one
-    def update(self, action : Action, available_actions : AvailableActions, agent : Agent) -> Optional[Agent]:
+    def update(self, action : Action, available_actions : AirLandSeaActions, agent : Agent) -> Optional[Agent]:
 
         # check for withdraw
-        if available_actions.predefined[action.action_id].startswith("Withdraw"):
+        if available_actions.payloads[action.action_id].kind == "withdraw":
             # how do i signal to the outer function that the battle is over?
             # how do i signal to the outer funciton that a player withdrew?
             return agent
@@ -390,7 +240,7 @@ class AirLandSea(Game):
         if self.check_destroy_triggers(action, available_actions):
             # remove card from hand and end turn
             player = self.get_player_by_agent_id(agent.agent_id)
-            played_card = self.find_card_from_action(action, available_actions, agent)
+            played_card = available_actions.payloads[action.action_id].card
             player.hand.remove(played_card)
             if self.show_state:
                 print("Destroyed card:", played_card)
@@ -403,48 +253,30 @@ class AirLandSea(Game):
             self.resolve_effect(played_card, agent, played_to_theater)
         return None
     
-    def play_card_from_action(self, action : Action, available_actions : AvailableActions, agent : Agent):
+    def play_card_from_action(self, action : Action, available_actions : AirLandSeaActions, agent : Agent):
         player = self.get_player_by_agent_id(agent.agent_id)
-        # take in action and available action string and turn it into playing a card
-        card = self.find_card_from_action(action, available_actions) # Card Object
-        theater = self.find_theater_played_from_action(action, available_actions)
-        faceup_or_facedown = self.find_faceup_or_facedown_from_action(action, available_actions) # string
-        is_faceup = True if faceup_or_facedown == 'faceup' else False
+        # take in action and its payload and turn it into playing a card
+        payload = available_actions.payloads[action.action_id]
+        theater = self.board.get_theater_by_name(payload.theater)
 
-        player.play(card, is_faceup, theater, self.show_state)
-        return card, theater
+        player.play(payload.card, payload.faceup, theater, self.board, self.show_state)
+        return payload.card, theater
     
-    def flip_card_from_action(self, action : Action, available_actions : AvailableActions, agent : Agent) -> Tuple[Card, Theater]:
-        # find card name
-        card = self.find_card_from_action(action, available_actions, agent)
-        # print("found card")
-        # print(card)
-        # find theater
-        theater = self.find_theater_played_from_action(action, available_actions)
-        # print(theater)
+    def flip_card_from_action(self, action : Action, available_actions : AirLandSeaActions, agent : Agent) -> Tuple[Card, Theater]:
+        # find the card and the theater it is in
+        payload = available_actions.payloads[action.action_id]
+        card = payload.card
+        theater = self.board.get_theater_by_name(payload.theater)
         # apply flip
-        for player in self.players:
-            for current_card in theater.player_cards[player.id]:
-                # print(id(card))
-                # print(card)
-                # print(id(current_card))
-                # print(current_card)
-                if current_card == card:
-                    # print("found card")
-                    current_card.flip()
-                    if (current_card in self.effect_manager.effect_cards[player.id]) and current_card.facedown and current_card.name != "Air Drop":
-                        # if self.show_state:
-                        #     print("effect cards before removing effect:")
-                        #     print(self.effect_manager.effect_cards[player.id])
-                        #     pass
-                        self.effect_manager.remove_effect(current_card, player.id)
-                        # if self.show_state:
-                        #     print("removing effect:", current_card)
-                        #     print("effect cards after removing effect:")
-                        #     print(self.effect_manager.effect_cards[player.id])
-                        #     pass
-                    return current_card, theater
-        return None, None
+        location = self.board.locate(card)
+        if location is None or location[1] is not theater:
+            return None, None
+        owner_id = location[0]
+        card.flip()
+        if (card in self.effect_manager.effect_cards[owner_id]) and card.facedown and card.name != "Air Drop":
+            self.effect_manager.remove_effect(card, owner_id)
+        self.board.refresh(owner_id)
+        return card, theater
 
     def resolve_effect(self, input_card : Card, agent : Agent, theater : Theater):
         # takes in the card that was just played, the agent that played it, and the theater it was played to
@@ -452,6 +284,9 @@ class AirLandSea(Game):
         opponent = self.get_player_by_agent_id(1 - agent.agent_id)
 
         self.effect_manager.add_effect(input_card, agent.agent_id)
+        if input_card.name in ('Escalation', 'Cover Fire'):
+            # these change the strength of the owner's cards as long as they are in effect
+            self.board.refresh(agent.agent_id)
         if self.show_state:
             print("inside resolve_effect - effect cards after adding effect:")
             print(self.effect_manager.effect_cards)
@@ -494,7 +329,6 @@ class AirLandSea(Game):
             # modify available actions to only allow flipping an uncovered card in an adjacent theater
             # generate actions to flip an uncovered card in an adjacent theater
             uncovered_cards = []
-            cards_to_flip = {}
             theater_index = self.board.get_theater_index(theater.name)
             adjacent_theaters_indices = self.board.get_adjacent_theaters(theater_index)
             adjacent_theaters = []
@@ -508,27 +342,25 @@ class AirLandSea(Game):
                         uncovered_card = theater.player_cards[player_id][-1]
                         uncovered_cards.append((uncovered_card, theater, player_id))
 
-            for action_id, (card, theater, player_id) in enumerate(uncovered_cards):
+            maneuver_available_actions = AirLandSeaActions(
+                instructions = "Select an uncovered card from an adjacent theater to flip.",
+                predefined = {},
+                openended = {},
+                render = not self.fast_mode
+            )
+            for card, theater, player_id in uncovered_cards:
+                payload = ActionPayload("flip", card, theater.name, faceup=card.facedown)
                 if card.facedown:
                     # check if it is player's card or opponent's card
                     if player_id == player.id:
                         # player owns the facedown card and can see its contents
-                        cards_to_flip[str(action_id)] = f"Flip {card} in {theater.name} faceup."
+                        maneuver_available_actions.add(payload, lambda payload: f"Flip {payload.card} in {payload.theater} faceup.")
                     else:
                         # opponent owns the facedown card and cannot see its contents
-                        cards_to_flip[str(action_id)] = f"Flip Facedown (2) in {theater.name} faceup."
-                elif not card.facedown:
-                    # faceup
-                    cards_to_flip[str(action_id)] = f"Flip {card} in {theater.name} facedown."
+                        maneuver_available_actions.add(payload, lambda payload: f"Flip Facedown (2) in {payload.theater} faceup.")
                 else:
-                    if self.show_state:
-                        print("error: card is neither faceup nor facedown")
-
-            maneuver_available_actions = AvailableActions(
-                instructions = "Select an uncovered card from an adjacent theater to flip.",
-                predefined = cards_to_flip,
-                openended = {}
-            )
+                    # faceup
+                    maneuver_available_actions.add(payload, lambda payload: f"Flip {payload.card} in {payload.theater} facedown.")
             if self.show_state:
                 print(observation.text)
                 print("maneuver_available_actions")
@@ -547,12 +379,9 @@ class AirLandSea(Game):
             # print(id(input_card))
             self.effect_manager.remove_effect(input_card, player.id)
             if flipped_card and not flipped_card.facedown and not (flipped_card.name == "Heavy Bombers" or flipped_card.name == "Super Battleship" or flipped_card.name == "Heavy Tanks"):
-                # search target_theater for the card and identify who owns it
-                for flipped_owner in self.players:
-                    if flipped_card in target_theater.player_cards[flipped_owner.id]:
-                        # resolve effect (if flipped faceup) for the player who owns the flipped card
-                        self.resolve_effect(flipped_card, flipped_owner.agent, target_theater)
-                        break
+                # resolve effect (if flipped faceup) for the player who owns the flipped card
+                flipped_owner = self.players[self.board.locate(flipped_card)[0]]
+                self.resolve_effect(flipped_card, flipped_owner.agent, target_theater)
             return
         elif input_card.name == 'Ambush':
             # flip any uncovered card
@@ -565,7 +394,6 @@ class AirLandSea(Game):
             # modify available actions to only allow flipping an uncovered card in an adjacent theater
             # generate actions to flip an uncovered card in an adjacent theater
             uncovered_cards = []
-            cards_to_flip = {}
             # go through cards in each theater and find uncovered cards
             # uncovered just means it is the last in the list (index is -1)
             for theater in self.board.theaters:
@@ -574,27 +402,25 @@ class AirLandSea(Game):
                         uncovered_card = theater.player_cards[player_id][-1]
                         uncovered_cards.append((uncovered_card, theater, player_id))
 
-            for action_id, (card, theater, player_id) in enumerate(uncovered_cards):
+            ambush_available_actions = AirLandSeaActions(
+                instructions = "Select any uncovered card to flip.",
+                predefined = {},
+                openended = {},
+                render = not self.fast_mode
+            )
+            for card, theater, player_id in uncovered_cards:
+                payload = ActionPayload("flip", card, theater.name, faceup=card.facedown)
                 if card.facedown:
                     # check if it is player's card or opponent's card
                     if player_id == player.id:
                         # player owns the facedown card and can see its contents
-                        cards_to_flip[str(action_id)] = f"Flip {card} in {theater.name} faceup."
+                        ambush_available_actions.add(payload, lambda payload: f"Flip {payload.card} in {payload.theater} faceup.")
                     else:
                         # opponent owns the facedown card and cannot see its contents
-                        cards_to_flip[str(action_id)] = f"Flip Facedown (2) in {theater.name} faceup."
-                elif not card.facedown:
-                    # faceup
-                    cards_to_flip[str(action_id)] = f"Flip {card} in {theater.name} facedown."
+                        ambush_available_actions.add(payload, lambda payload: f"Flip Facedown (2) in {payload.theater} faceup.")
                 else:
-                    if self.show_state:
-                        print("error: card is neither faceup nor facedown")
-
-            ambush_available_actions = AvailableActions(
-                instructions = "Select any uncovered card to flip.",
-                predefined = cards_to_flip,
-                openended = {}
-            )
+                    # faceup
+                    ambush_available_actions.add(payload, lambda payload: f"Flip {payload.card} in {payload.theater} facedown.")
             if self.show_state:
                 print(observation.text)
                 print("ambush_available_actions")
@@ -614,12 +440,9 @@ class AirLandSea(Game):
             if input_card in self.effect_manager.effect_cards[player.id]:
                 self.effect_manager.remove_effect(input_card, player.id)
             if flipped_card and not flipped_card.facedown and not (flipped_card.name == "Heavy Bombers" or flipped_card.name == "Super Battleship" or flipped_card.name == "Heavy Tanks"):
-                # search target_theater for the card and identify who owns it
-                for flipped_owner in self.players:
-                    if flipped_card in target_theater.player_cards[flipped_owner.id]:
-                        # resolve effect (if flipped faceup) for the player who owns the flipped card
-                        self.resolve_effect(flipped_card, flipped_owner.agent, target_theater)
-                        break
+                # resolve effect (if flipped faceup) for the player who owns the flipped card
+                flipped_owner = self.players[self.board.locate(flipped_card)[0]]
+                self.resolve_effect(flipped_card, flipped_owner.agent, target_theater)
             return
         elif input_card.name == 'Transport':
             # move 1 of your cards to a different theater
@@ -627,30 +450,30 @@ class AirLandSea(Game):
             observation, _ = self.get_observation(agent)
             # generate available actions to move 1 of player's card to a different theater
             player_cards = []
-            cards_to_move = {}
             for theater in self.board.theaters:
                 for card in theater.player_cards[player.id]:
                     player_cards.append((card, theater))
 
-            action_id = 0
+            transport_available_actions = AirLandSeaActions(
+                instructions = "Select one of your cards to move to a different theater. You may also choose to not move anything.",
+                predefined = {},
+                openended = {},
+                render = not self.fast_mode
+            )
             for target_theater in self.board.theaters:
                 for card, theater in player_cards:
                     if target_theater != theater:
+                        payload = ActionPayload("move", card, target_theater.name)
                         if card.facedown:
-                            card_string = str(card)
-                            card_string = re.sub(r' \(\d', f"> (2-<{card.strength}>", card_string)
-                            card_string = "Facedown-<" + card_string
-                            cards_to_move[str(action_id)] = f"Move {card_string} in {theater.name} to {target_theater.name}."
+                            def describe(payload, theater=theater):
+                                card_string = str(payload.card)
+                                card_string = re.sub(r' \(\d', f"> (2-<{payload.card.strength}>", card_string)
+                                card_string = "Facedown-<" + card_string
+                                return f"Move {card_string} in {theater.name} to {payload.theater}."
+                            transport_available_actions.add(payload, describe)
                         else:
-                            cards_to_move[str(action_id)] = f"Move {card} in {theater.name} to {target_theater.name}."
-                        action_id += 1
-            cards_to_move[str(action_id)] = "Do not move any cards."
-
-            transport_available_actions = AvailableActions(
-                instructions = "Select one of your cards to move to a different theater. You may also choose to not move anything.",
-                predefined = cards_to_move,
-                openended = {}
-            )
+                            transport_available_actions.add(payload, lambda payload, theater=theater: f"Move {payload.card} in {theater.name} to {payload.theater}.")
+            transport_available_actions.add(ActionPayload("pass"), lambda payload: "Do not move any cards.")
             if self.show_state:
                 print(observation.text)
                 print("transport_available_actions")
@@ -660,14 +483,14 @@ class AirLandSea(Game):
             # action = agent.take_action(self.rules, observation, transport_available_actions, show_state=self.show_state)
             action = self.take_action_wrapper(agent, observation, transport_available_actions)
             # apply move
-            found_card = self.find_card_from_action(action, transport_available_actions, agent)
-            if not found_card:
-                # then we didn't want to move a card or didn't find one
+            payload = transport_available_actions.payloads[action.action_id]
+            if payload.kind == "pass":
+                # then we didn't want to move a card
                 self.effect_manager.remove_effect(input_card, player.id)
                 return
             # move the card to the target theater
-            # find the target theater
-            target_theater = self.find_theater_played_from_action(action, transport_available_actions)
+            found_card = payload.card
+            target_theater = self.board.get_theater_by_name(payload.theater)
             # print("moving card")
             # print("target_theater:", target_theater)
             self.board.move_card(found_card, target_theater)
@@ -683,23 +506,20 @@ class AirLandSea(Game):
             
             # generate available actions to return 1 of player's facedown cards to their hand
             facedown_cards = []
-            cards_to_return = {}
             for theater in self.board.theaters:
                 for card in theater.player_cards[player.id]:
                     if card.facedown:
                         facedown_cards.append((card, theater))
 
-            action_id = 0
-            for card, theater in facedown_cards:
-                cards_to_return[str(action_id)] = f"Return {card} in {theater.name} to your hand in order to play a card."
-                action_id += 1
-            cards_to_return[str(action_id)] = "Do not return any cards."
-        
-            redeploy_available_actions = AvailableActions(
+            redeploy_available_actions = AirLandSeaActions(
                 instructions = "Select one of your facedown cards to return to your hand. You may also choose to not return anything (not use this tactical ability).",
-                predefined = cards_to_return,
-                openended = {}
+                predefined = {},
+                openended = {},
+                render = not self.fast_mode
             )
+            for card, theater in facedown_cards:
+                redeploy_available_actions.add(ActionPayload("return", card, theater.name), lambda payload: f"Return {payload.card} in {payload.theater} to your hand in order to play a card.")
+            redeploy_available_actions.add(ActionPayload("pass"), lambda payload: "Do not return any cards.")
             if self.show_state:
                 print(observation.text)
                 print("redeploy_available_actions")
@@ -709,14 +529,14 @@ class AirLandSea(Game):
             action = self.take_action_wrapper(agent, observation, redeploy_available_actions)
 
             # apply return
-            if action.action_id == str(action_id):
+            payload = redeploy_available_actions.payloads[action.action_id]
+            if payload.kind == "pass":
                 # then we didn't want to return a card
                 self.effect_manager.remove_effect(input_card, player.id)
                 return
-            found_card = self.find_card_from_action(action, redeploy_available_actions, agent)
-            current_theater = self.find_theater_played_from_action(action, redeploy_available_actions)
+            found_card = payload.card
 
-            current_theater.player_cards[player.id].remove(found_card)
+            self.board.remove(found_card)
             player.hand.append(found_card)
             # make it not facedown, when it goes back to hand
             found_card.flip()
@@ -737,7 +557,7 @@ class AirLandSea(Game):
             # remove withdraw from available actions here
             # print("available actions before removing withdraw")
             # pprint.pprint(available_actions.predefined)
-            available_actions.predefined.pop(str(len(player.hand)*4))
+            available_actions.remove(str(len(player.hand)*4))
             # print("available actions after removing withdraw")
             # pprint.pprint(available_actions.predefined)
             modified_actions = self.effect_manager.modify_available_actions(available_actions, player.hand, player.id)
@@ -777,15 +597,14 @@ class AirLandSea(Game):
             for theater_ind in adjacent_theaters_indices:
                 adjacent_theaters.append(self.board.theaters[theater_ind])
 
-            places_to_play = {}
-            for action_id, target_theater in enumerate(adjacent_theaters):
-                places_to_play[str(action_id)] = f"Play {drawn_card} facedown to {target_theater.name}."
-
-            reinforce_available_actions = AvailableActions(
+            reinforce_available_actions = AirLandSeaActions(
                 instructions = "Select an adjacent theater to play the drawn card facedown.",
-                predefined = places_to_play,
-                openended = {}
+                predefined = {},
+                openended = {},
+                render = not self.fast_mode
             )
+            for target_theater in adjacent_theaters:
+                reinforce_available_actions.add(ActionPayload("play", drawn_card, target_theater.name, faceup=False), lambda payload: f"Play {payload.card} facedown to {payload.theater}.")
             if self.show_state:
                 print(observation.text)
                 print("reinforce_available_actions")
@@ -795,8 +614,8 @@ class AirLandSea(Game):
             # action = agent.take_action(self.rules, observation, reinforce_available_actions, show_state=self.show_state)
             action = self.take_action_wrapper(agent, observation, reinforce_available_actions)
             # play the drawn card facedown to the target theater
-            target_theater = self.find_theater_played_from_action(action, reinforce_available_actions)
-            player.play(drawn_card, False, target_theater, self.show_state)
+            target_theater = self.board.get_theater_by_name(reinforce_available_actions.payloads[action.action_id].theater)
+            player.play(drawn_card, False, target_theater, self.board, self.show_state)
             self.effect_manager.remove_effect(input_card, player.id)
             pass
         elif input_card.name == 'Disrupt':
@@ -816,24 +635,23 @@ class AirLandSea(Game):
                 observation, _ = self.get_observation(current_agent)
                 # generate available actions for player to flip one of their uncovered cards
                 player_uncovered_cards = []
-                cards_to_flip = {}
                 for theater in self.board.theaters:
                     for card in theater.player_cards[current_player.id]:
                         if theater.is_uncovered(card, current_player.id):
                             player_uncovered_cards.append((card, theater))
             
-                action_id = 0
+                disrupt_available_actions = AirLandSeaActions(
+                    instructions = "Select one of your uncovered cards to flip.",
+                    predefined = {},
+                    openended = {},
+                    render = not self.fast_mode
+                )
                 for card, theater in player_uncovered_cards:
+                    payload = ActionPayload("flip", card, theater.name, faceup=card.facedown)
                     if card.facedown:
-                        cards_to_flip[str(action_id)] = f"Flip {card} in {theater.name} faceup."
+                        disrupt_available_actions.add(payload, lambda payload: f"Flip {payload.card} in {payload.theater} faceup.")
                     else:
-                        cards_to_flip[str(action_id)] = f"Flip {card} in {theater.name} facedown."
-                    action_id += 1
-                disrupt_available_actions = AvailableActions(
-                    instructions = "Select one of your uncovered cards to flip.",
-                    predefined = cards_to_flip,
-                    openended = {}
-                )
+                        disrupt_available_actions.add(payload, lambda payload: f"Flip {payload.card} in {payload.theater} facedown.")
 
                 if self.show_state:
                     print(observation.text)
@@ -925,6 +743,7 @@ class AirLandSea(Game):
         self.players[0].supreme_commander, self.players[1].supreme_commander = self.players[1].supreme_commander, self.players[0].supreme_commander
         # new effect manager
         self.effect_manager = EffectManager()
+        self.board.effect_manager = self.effect_manager
         # rotate theaters
         self.board.rotate_theaters()
 
@@ -2,7 +2,7 @@ from dataclasses import dataclass, field
 from typing import List
 from api.classes import Observation, Action, Agent, AvailableActions, Game, Rules
 from games.air_land_sea.cards import Card
-from games.air_land_sea.board import Theater
+from games.air_land_sea.board import Board, Theater
 
 @dataclass
 class Player:
@@ -12,11 +12,11 @@ class Player:
     hand: List[Card] = field(default_factory=list)
     victory_points: int = 0
 
-    def play(self, card: Card, faceup: bool, theater: Theater, show_state: bool):
+    def play(self, card: Card, faceup: bool, theater: Theater, board: Board, show_state: bool):
         self.hand.remove(card)
         if not faceup:
             card.flip()
-        theater.player_cards[self.id].append(card)
+        board.place(card, self.id, theater)
         if show_state:
             if faceup:
                 print("Player", self.id + 1, "played", card, "to", theater.name, "faceup.")
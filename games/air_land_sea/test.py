@@ -37,12 +37,12 @@ def test():
                             Card('Reinforce', 'Land', 1, 'Instant', 'Draw 1 card and play it facedown to an adjacent theater'),
                             Card('Support', 'Air', 1, 'Ongoing', 'You gain +3 strength in each adjacent theater'),]
 
-    game.player1.play(game.player1.hand[0], False, game.board.theaters[1], self.show_state)
-    game.player1.play(game.player1.hand[3], True, game.board.theaters[2], self.show_state)
-    game.player1.play(game.player1.hand[3], True, game.board.theaters[2], self.show_state)
-    game.player2.play(game.player2.hand[2], False, game.board.theaters[1], self.show_state)
-    game.player2.play(game.player2.hand[0], False, game.board.theaters[0], self.show_state)
-    game.player2.play(game.player2.hand[0], False, game.board.theaters[2], self.show_state)
+    game.player1.play(game.player1.hand[0], False, game.board.theaters[1], game.board, self.show_state)
+    game.player1.play(game.player1.hand[3], True, game.board.theaters[2], game.board, self.show_state)
+    game.player1.play(game.player1.hand[3], True, game.board.theaters[2], game.board, self.show_state)
+    game.player2.play(game.player2.hand[2], False, game.board.theaters[1], game.board, self.show_state)
+    game.player2.play(game.player2.hand[0], False, game.board.theaters[0], game.board, self.show_state)
+    game.player2.play(game.player2.hand[0], False, game.board.theaters[2], game.board, self.show_state)
     # after a card is played faceup or flipped faceup its tactical ability takes effect immediately
     # aka the effect manager is called
     # the effect manager is also called when a card is flipped facedown too (to get rid of it)
@@ -58,13 +58,13 @@ def test():
     # print(game.player1.hand)
     # play to second theater
     # print("playing to second theater for p1")
-    # game.player1.play(target1, False, game.board.theaters[1], self.show_state)
+    # game.player1.play(target1, False, game.board.theaters[1], game.board, self.show_state)
     # print("Player 1 hand after play")
     # print(game.player1.hand)
     # game.effect_manager.add_effect(target1, game.player1.id)
     # play to third theater for p2
     # print("playing to third theater for p2")
-    # game.player2.play(target2, False, game.board.theaters[2], self.show_state)
+    # game.player2.play(target2, False, game.board.theaters[2], game.board, self.show_state)
     # game.effect_manager.add_effect(target2, game.player2.id)
     # print(game.board.get_board_string(game.player1.id))
     # print("Effect cards")
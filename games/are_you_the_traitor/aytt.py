@@ -163,7 +163,7 @@ class AreYouTheTraitor(Game):
                     self.round_winner = "good"
                 else:
                     self.round_winner = "evil"
-            print(f"the {self.round_winner} team won!")
+            if not self.fast_mode: print(f"the {self.round_winner} team won!")
 
             ## give them treasure cards
             winning_team = [player for player in self.list_all_players if player.team == self.round_winner]
@@ -375,5 +375,5 @@ class AreYouTheTraitor(Game):
                 continue
 
 
-        print(f"The {self.game_winner} team is the winner")
+        if not self.fast_mode: print(f"The {self.game_winner} team is the winner")
         return (1, 0) if self.game_winner == "evil" else (0,1)
@@ -83,6 +83,8 @@ class CodenamesGame(Game):
             raise ValueError("Agent is not on a team.")
 
     def _get_observation_text(self, agent: Agent) -> str:
+        if self.fast_mode:
+            return ""
         team_name = self.game_board.current_team_name()
         agent_role = "Spymaster" if agent in self.spymaster_list else "Operative"
         text = f"{team_name} {agent_role}\n\nCurrent board:\n"
@@ -94,8 +96,9 @@ class CodenamesGame(Game):
         self._validate_role(agent, self.spymaster_list, "Spymaster")
 
         text = self._get_observation_text(agent)
-        last_hint_info = self._get_last_hint_info(agent)
-        text += "\n\n" + last_hint_info
+        if not self.fast_mode:
+            last_hint_info = self._get_last_hint_info(agent)
+            text += "\n\n" + last_hint_info
 
         if self.show_state:
             print(text)
@@ -108,12 +111,13 @@ class CodenamesGame(Game):
 
         text = self._get_observation_text(agent)
         current_clue, current_num_guesses = self.game_board.last_hint
-        if current_clue:
-            text += f"\n\nYour clue is: '{current_clue}' for {current_num_guesses} cards. You have made {self.game_board.guesses_made_during_turn} guesses so far."
+        if not self.fast_mode:
+            if current_clue:
+                text += f"\n\nYour clue is: '{current_clue}' for {current_num_guesses} cards. You have made {self.game_board.guesses_made_during_turn} guesses so far."
 
 
-        last_hint_info = self._get_last_hint_info(agent)
-        text += "\n\n" + last_hint_info
+            last_hint_info = self._get_last_hint_info(agent)
+            text += "\n\n" + last_hint_info
 
         if self.show_state:
             print(text)
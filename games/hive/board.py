@@ -1,23 +1,31 @@
 from .pieces import HivePiece, Grasshopper, Spider
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
+from .engine import HiveEngine, hex_to_cell
 import numpy as np
-from matplotlib.animation import FuncAnimation
 from multiprocessing import Process
-from PIL import Image
+from collections import OrderedDict
+from PIL import Image, ImageDraw
 import io
 import os
 
 class HiveBoardVisualizer:
-    def __init__(self, board, piece_images=None):
+    IMAGE_SIZE = 512
+    CACHE_SIZE = 64
+
+    def __init__(self, board, piece_images=None, save_dir=None):
         self.board = board
         self.counter = 0
         self.piece_images = piece_images if piece_images else {}
-        if not os.path.exists('images'):
-            os.makedirs('images')
+        self.save_dir = save_dir # if set, every rendered board is also written there as board_<n>.png
+        self.cache = OrderedDict() # board key -> rendered image, least recently used first
+        if self.save_dir and not os.path.exists(self.save_dir):
+            os.makedirs(self.save_dir)
+
+    def board_key(self, renderer):
+        return renderer, frozenset((hex.x, hex.y, piece.type, piece.owner) for hex, piece in self.board.items())
 
     def draw_hexagon(self, ax, center, size=1, fill_color='white', edge_color='black'):
         """Draw a hexagon given a center, size."""
+        import matplotlib.patches as patches
         hexagon = patches.RegularPolygon(center, numVertices=6, radius=size, orientation=0,
                                         facecolor=fill_color, edgecolor=edge_color, linewidth=1.5)
         ax.add_patch(hexagon)
@@ -33,8 +41,31 @@ class HiveBoardVisualizer:
         ax.text(center[0], center[1], "(" + str(coords[0]) + ", " + str(coords[1]) + ")", 
                         ha='center', va='center', fontsize=6.5, color=label_color)
         
-    def draw_board(self, interactive=False):
-        """Draw and display the Hive board."""
+    def draw_board(self, interactive=False, renderer="matplotlib"):
+        """Draw the Hive board and return it as a PIL image, reusing the image if this position was already drawn."""
+        key = self.board_key(renderer)
+        if key in self.cache and not interactive:
+            self.cache.move_to_end(key)
+            return self.cache[key]
+
+        if renderer == "pil":
+            image = self.draw_board_pil()
+        else:
+            image = self.draw_board_matplotlib(interactive)
+
+        self.counter += 1
+        if self.save_dir:
+            image.save(os.path.join(self.save_dir, 'board_' + str(self.counter) + '.png'), format='png')
+
+        self.cache[key] = image
+        if len(self.cache) > self.CACHE_SIZE:
+            self.cache.popitem(last=False)
+        return image
+
+    def draw_board_matplotlib(self, interactive=False):
+        """Draw the board with matplotlib into an in-memory PNG."""
+        # matplotlib takes about half a second to import, so games rendered with PIL (or not at all) never load it.
+        import matplotlib.pyplot as plt
         fig, ax = plt.subplots(figsize=(5.12, 5.12), dpi=100)
         ax.set_aspect('equal')
         ax.axis('off')  # Hide the axes
@@ -63,10 +94,46 @@ class HiveBoardVisualizer:
             plt.show()
         
         # return as PIL image
-        self.counter += 1
-        plt.savefig('images/board_' + str(self.counter) + '.png', format='png')
-        plt.close()
-        return Image.open('images/board_' + str(self.counter) + '.png')
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format='png')
+        plt.close(fig)
+        buffer.seek(0)
+        image = Image.open(buffer)
+        image.load()
+        return image
+
+    def draw_board_pil(self):
+        """Draw the board directly with PIL, which is much cheaper than building a matplotlib figure."""
+        image = Image.new('RGB', (self.IMAGE_SIZE, self.IMAGE_SIZE), 'white')
+        draw = ImageDraw.Draw(image)
+
+        # Fit the same region matplotlib shows into the image, keeping the aspect ratio equal.
+        min_x, max_x, min_y, max_y = self.find_board_limits()
+        min_x, max_x, min_y, max_y = min_x - 1, max_x + 1, min_y - 1, max_y + 1
+        scale = self.IMAGE_SIZE / max(max_x - min_x, max_y - min_y)
+        offset_x = (self.IMAGE_SIZE - (max_x - min_x) * scale) / 2
+        offset_y = (self.IMAGE_SIZE - (max_y - min_y) * scale) / 2
+
+        def to_image(x, y):
+            # Image rows grow downwards, so flip y.
+            return offset_x + (x - min_x) * scale, self.IMAGE_SIZE - (offset_y + (y - min_y) * scale)
+
+        def draw_hex(hex, fill_color, label, label_color):
+            x, y = self.hex_to_pixel(hex)
+            corners = [to_image(x + np.cos(angle), y + np.sin(angle)) for angle in np.pi / 2 + np.arange(6) * np.pi / 3]
+            draw.polygon(corners, fill=fill_color, outline='black')
+            draw.multiline_text(to_image(x, y), label, fill=label_color, anchor='mm', align='center')
+
+        seen_set = set()
+        for hex, piece in self.board.items():
+            fill_color = 'lightgreen' if piece.owner == 1 else 'lightblue'
+            draw_hex(hex, fill_color, piece.type + "\n" + "(" + str(hex.x) + ", " + str(hex.y) + ")", 'black')
+            for direction in range(6):
+                neighbor_hex = hex.neighbor(direction)
+                if neighbor_hex not in self.board and neighbor_hex not in seen_set:
+                    draw_hex(neighbor_hex, 'white', "(" + str(neighbor_hex.x) + ", " + str(neighbor_hex.y) + ")", 'red')
+                    seen_set.add(neighbor_hex)
+        return image
 
     def find_board_limits(self):
         """Calculate the limits of the board to set the display size."""
@@ -118,12 +185,14 @@ class HiveBoard:
         self.board = {}  # Dictionary to store pieces keyed by their Hex coordinates
         self.queen_bee_placed = [False, False]
         self.visualizer = HiveBoardVisualizer(self.board)
+        self.engine = HiveEngine()  # compact mirror of self.board used for fast move generation
 
 
     def add_piece(self, piece, hex):
         if hex in self.board:
             raise ValueError("There is already a piece at this position")
         self.board[hex] = piece
+        self.engine.place(hex_to_cell(hex), piece.type, piece.owner)
 
     def get_queen_bee(self, team_id):
         for hex, piece in self.board.items():
@@ -170,11 +239,11 @@ class HiveBoard:
     def generate_text_board(self):
         return self.visualizer.text_representation()
 
-    def display_board(self, interactive=False):
+    def display_board(self, interactive=False, renderer="matplotlib"):
         """
         Display the board with the pieces and their positions. Produce a visual representation of the board such that an image can be exported.
         """
-        return self.visualizer.draw_board(interactive)
+        return self.visualizer.draw_board(interactive, renderer)
     
     def is_queen_surrounded(self, owner):
         """
@@ -356,6 +425,10 @@ class HiveBoard:
         moving_piece = self.board[from_hex]  
         if not self.board.get(to_hex):
             self.board[to_hex] = moving_piece
+            self.engine.move(hex_to_cell(from_hex), hex_to_cell(to_hex))
+        else:
+            # Pieces don't stack, so a piece moved onto another one leaves the board.
+            self.engine.remove(hex_to_cell(from_hex))
 
         del self.board[from_hex]
 
@@ -0,0 +1,177 @@
+"""
+Compact Hive move generator.
+
+Cells are axial (q, r) coordinates packed into a single int, so the six neighbors of a cell are
+the cell plus one of six constant offsets and no Hex objects are allocated. Pieces are stored as
+a dict from cell to (type, owner). The One-Hive rule is checked once per position by finding the
+articulation points of the hive (Tarjan): exactly those pieces are pinned, and every other piece
+may leave without splitting the hive. Sliding uses the gate check: a piece may slide between two
+adjacent cells only if exactly one of their two common neighbors is occupied, i.e. the gap is not
+blocked and the piece stays in contact with the hive.
+"""
+
+WIDTH = 1 << 12
+ORIGIN = (WIDTH // 2) * WIDTH + WIDTH // 2
+
+# Axial directions, in the same order as Hex.neighbor's directions, so direction d's two
+# neighboring directions (d - 1 and d + 1) point at the cells forming its gate.
+AXIAL_DIRECTIONS = [(1, 0), (1, -1), (0, -1), (-1, 0), (-1, 1), (0, 1)]
+OFFSETS = [dq * WIDTH + dr for dq, dr in AXIAL_DIRECTIONS]
+GATES = [(OFFSETS[(d - 1) % 6], OFFSETS[(d + 1) % 6]) for d in range(6)]
+
+
+def pack(q, r):
+    return ORIGIN + q * WIDTH + r
+
+def unpack(cell):
+    q, r = divmod(cell - ORIGIN + WIDTH // 2, WIDTH)
+    return q, r - WIDTH // 2
+
+def hex_to_cell(hex):
+    """Convert the odd-r offset coordinates used by Hex to a packed axial cell."""
+    return pack(hex.x - (hex.y - (hex.y & 1)) // 2, hex.y)
+
+def cell_to_xy(cell):
+    q, r = unpack(cell)
+    return q + (r - (r & 1)) // 2, r
+
+
+class HiveEngine:
+    def __init__(self):
+        self.pieces = {}  # cell -> (type, owner)
+        self._pinned = None
+
+    @classmethod
+    def from_board(cls, board):
+        engine = cls()
+        for hex, piece in board.board.items():
+            engine.pieces[hex_to_cell(hex)] = (piece.type, piece.owner)
+        return engine
+
+    def place(self, cell, type, owner):
+        self.pieces[cell] = (type, owner)
+        self._pinned = None
+
+    def move(self, from_cell, to_cell):
+        self.pieces[to_cell] = self.pieces.pop(from_cell)
+        self._pinned = None
+
+    def remove(self, cell):
+        del self.pieces[cell]
+        self._pinned = None
+
+    def pinned(self):
+        """Cells whose piece is an articulation point of the hive, computed once per position."""
+        if self._pinned is None:
+            self._pinned = self._articulation_points()
+        return self._pinned
+
+    def _articulation_points(self):
+        pieces = self.pieces
+        if len(pieces) < 3:
+            return set()
+
+        root = next(iter(pieces))
+        depth = {root: 0}
+        low = {root: 0}
+        points = set()
+        root_children = 0
+        # Iterative DFS: each frame is (cell, parent, iterator over occupied neighbors).
+        stack = [(root, None, iter([root + o for o in OFFSETS if root + o in pieces]))]
+        while stack:
+            cell, parent, neighbors = stack[-1]
+            for neighbor in neighbors:
+                if neighbor not in depth:
+                    depth[neighbor] = low[neighbor] = depth[cell] + 1
+                    if cell == root:
+                        root_children += 1
+                    stack.append((neighbor, cell, iter([neighbor + o for o in OFFSETS if neighbor + o in pieces])))
+                    break
+                if neighbor != parent:
+                    low[cell] = min(low[cell], depth[neighbor])
+            else:
+                stack.pop()
+                if parent is not None:
+                    low[parent] = min(low[parent], low[cell])
+                    if parent != root and low[cell] >= depth[parent]:
+                        points.add(parent)
+        if root_children > 1:
+            points.add(root)
+        return points
+
+    def can_slide(self, cell, direction, moving):
+        """Whether a piece can slide from cell in direction, ignoring the moving piece's own cell."""
+        pieces = self.pieces
+        target = cell + OFFSETS[direction]
+        if target in pieces and target != moving:
+            return False
+        left, right = GATES[direction]
+        left_occupied = cell + left in pieces and cell + left != moving
+        right_occupied = cell + right in pieces and cell + right != moving
+        return left_occupied != right_occupied
+
+    def slides(self, cell, moving):
+        return [cell + OFFSETS[d] for d in range(6) if self.can_slide(cell, d, moving)]
+
+    def moves(self, cell):
+        """Destination cells for the piece at cell."""
+        if cell in self.pinned():
+            return []
+        type = self.pieces[cell][0]
+        if type == "Queen":
+            return self.slides(cell, cell)
+        if type == "Spider":
+            return self._spider_moves(cell)
+        if type == "Ant":
+            return self._ant_moves(cell)
+        if type == "Hopper":
+            return self._hopper_moves(cell)
+        return []
+
+    def _spider_moves(self, start):
+        destinations = set()
+        paths = [(start,)]
+        for _ in range(3):
+            paths = [path + (nxt,) for path in paths for nxt in self.slides(path[-1], start) if nxt not in path]
+        for path in paths:
+            destinations.add(path[-1])
+        return list(destinations)
+
+    def _ant_moves(self, start):
+        seen = {start}
+        frontier = [start]
+        while frontier:
+            cell = frontier.pop()
+            for nxt in self.slides(cell, start):
+                if nxt not in seen:
+                    seen.add(nxt)
+                    frontier.append(nxt)
+        seen.discard(start)
+        return list(seen)
+
+    def _hopper_moves(self, start):
+        pieces = self.pieces
+        moves = []
+        for offset in OFFSETS:
+            cell = start + offset
+            if cell not in pieces:
+                continue
+            while cell in pieces:
+                cell += offset
+            moves.append(cell)
+        return moves
+
+    def placements(self, owner):
+        """Empty cells where owner may place a new piece."""
+        pieces = self.pieces
+        if not pieces:
+            return [ORIGIN]
+        if len(pieces) < 2:
+            return [cell + o for cell in pieces for o in OFFSETS if cell + o not in pieces]
+
+        candidates = {cell + o for cell, (_, piece_owner) in pieces.items() if piece_owner == owner for o in OFFSETS}
+        return [
+            cell for cell in candidates
+            if cell not in pieces
+            and all(pieces.get(cell + o, (None, owner))[1] == owner for o in OFFSETS)
+        ]
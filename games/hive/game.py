@@ -4,6 +4,7 @@ from .pieces import HivePiece, QueenBee, Grasshopper, Spider, SoldierAnt
 from .config import GameConfig as Config
 from api.classes import Game
 from .board import HiveBoard, Hex
+from .engine import hex_to_cell, cell_to_xy
 from dataclasses import dataclass, field
 import random
 
@@ -19,6 +20,8 @@ class HiveGame(Game):
     rules : Rules = default_config.rules#None
     image_mode : bool = True
     interactive_mode : bool = False
+    renderer : str = "matplotlib" # "matplotlib" or "pil"
+    fast_engine : bool = False # generate moves with the compact engine in engine.py (true sliding-gate rules) instead of the pieces' own valid_moves
 
     def export_state(self):
         """
@@ -91,9 +94,12 @@ class HiveGame(Game):
         """
         Generate the current game state observation for the agent.
         """
+        if self.fast_mode:
+            return Observation("")
+
         image = None
         if self.image_mode:
-            image = self.board.display_board(interactive=self.interactive_mode)
+            image = self.board.display_board(interactive=self.interactive_mode, renderer=self.renderer)
 
         remaining_turns = self.config.MAX_TURNS - max(self.turn_count)
         text = "{current_team} to move. Surround the enemy Queen. You have {remaining_turns} left.".format(current_team="Green" if agent.team_id == 1 else "Blue", remaining_turns=remaining_turns)
@@ -114,19 +120,24 @@ class HiveGame(Game):
         List all possible moves for a piece that is already placed on the board.
         """
         possible_moves = {}
-        for possible_move in piece.valid_moves(self.board):
+        for possible_move in self.valid_moves(piece, hex):
             possible_moves["move_" + str(hex) + "_" + str(possible_move)] = "Move the piece to " + str(possible_move)
         return possible_moves
 
-    def list_possible_moves_for_unplaced_piece(self, piece, player_index):
+    def valid_moves(self, piece, hex):
         """
-        List all possible moves for a piece that has not been placed on the board yet.
+        List the hexes the piece at hex can move to.
+        """
+        if self.fast_engine:
+            return [Hex(*cell_to_xy(cell)) for cell in self.board.engine.moves(hex_to_cell(hex))]
+        return piece.valid_moves(self.board)
 
-        If 3 moves have passed without the Queen Bee being placed, then it can be the only possible move.
+    def valid_placements(self, piece):
         """
-        if self.turn_count[player_index] == 3 and not self.board.queen_bee_placed[player_index]:
-            if piece.type != "Queen":
-                return []
+        List the hexes where the piece can be placed.
+        """
+        if self.fast_engine:
+            return [Hex(*cell_to_xy(cell)) for cell in self.board.engine.placements(piece.owner)]
 
         current_hexes = [hex for hex in self.board.board if self.board.board[hex]]
         possible_places = []
@@ -137,11 +148,29 @@ class HiveGame(Game):
                     possible_places.append(neighbor_hex)
         if not self.board.board:
             possible_places.append(Hex(0, 0))
+        return [hex for hex in possible_places if self.board.can_place_piece(piece, hex)]
+
+    def can_place(self, piece, hex):
+        """
+        Check if the piece can be placed at hex.
+        """
+        if self.fast_engine:
+            return hex_to_cell(hex) in self.board.engine.placements(piece.owner)
+        return self.board.can_place_piece(piece, hex)
+
+    def list_possible_moves_for_unplaced_piece(self, piece, player_index):
+        """
+        List all possible moves for a piece that has not been placed on the board yet.
+
+        If 3 moves have passed without the Queen Bee being placed, then it can be the only possible move.
+        """
+        if self.turn_count[player_index] == 3 and not self.board.queen_bee_placed[player_index]:
+            if piece.type != "Queen":
+                return []
 
         actions = {}
-        for hex in possible_places:
-            if self.board.can_place_piece(piece, hex):
-                actions["place_" + str(hex) + "_" + str(piece.type)] = ""
+        for hex in self.valid_placements(piece):
+            actions["place_" + str(hex) + "_" + str(piece.type)] = ""
         return actions
 
 
@@ -191,7 +220,7 @@ class HiveGame(Game):
         else:
             raise ValueError("Invalid action")
 
-        if self.board.can_place_piece(piece, hex):
+        if self.can_place(piece, hex):
             self.board.add_piece(piece, hex)
             self.pieces_remaining.remove(piece)
             if piece.type == "Queen":
@@ -212,7 +241,7 @@ class HiveGame(Game):
         piece = self.board.board[from_hex]
         if piece.owner != agent.team_id:
             raise ValueError("Invalid action")
-        if to_hex in piece.valid_moves(self.board):
+        if to_hex in self.valid_moves(piece, from_hex):
             self.board.move_piece(from_hex, to_hex)
 
     def process_list_placement_action(self, action, agent):
@@ -341,8 +370,8 @@ class HiveGame(Game):
         """
         while not self.is_game_over():
             self.play_turn()
-        if self.image_mode:
-            image = self.board.display_board(interactive=self.interactive_mode)
+        if self.image_mode and not self.fast_mode:
+            image = self.board.display_board(interactive=self.interactive_mode, renderer=self.renderer)
         queen_1_surrounded = self.board.is_queen_surrounded(self.players[0].team_id)
         queen_2_surrounded = self.board.is_queen_surrounded(self.players[1].team_id)
 
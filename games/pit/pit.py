@@ -260,7 +260,7 @@ class PitGame(Game):
         agent_hand = self.virtual_player_hands[
             self.agent_virtual_players[agent.agent_id][0]
         ]
-        hand_description = ", ".join(
+        hand_description = "" if self.fast_mode else ", ".join(
             f"{count} x {commodity}"
             for commodity, count in agent_hand.items()
             if count > 0
@@ -298,7 +298,7 @@ class PitGame(Game):
                                 f"Accept trade {i}, offering {offer_quantity} {commodity}"
                             )
 
-        observation_text = f"Agent {agent.agent_id}, it's your turn. Your hand: {hand_description}. {' '.join(pending_trade_descriptions)}"
+        observation_text = "" if self.fast_mode else f"Agent {agent.agent_id}, it's your turn. Your hand: {hand_description}. {' '.join(pending_trade_descriptions)}"
         return Observation(text=observation_text), available_actions
 
     def update(self, action: Action, available_actions: AvailableActions, agent: Agent):
@@ -359,7 +359,8 @@ class PitGame(Game):
                     break
 
         winning_agent_id = self.agents[self.scores.index(max(self.scores))].agent_id
-        print(f"Agent {winning_agent_id} won with a score of {max(self.scores)}.")
+        if not self.fast_mode:
+            print(f"Agent {winning_agent_id} won with a score of {max(self.scores)}.")
         total_score = sum(self.scores)
         normalized_scores = [score / total_score for score in self.scores]
-        return tuple(normalized_scores)
\ No newline at end of file
+        return tuple(normalized_scores)
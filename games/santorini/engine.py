@@ -0,0 +1,219 @@
+"""
+Compact Santorini engine.
+
+The 5x5 board is packed into 25 cells, cell = 5 * x + y, so that sets of cells are 25-bit masks.
+Each cell's neighbors are a precomputed mask, and the cells of height at most h are kept as one
+mask per height. The squares a pawn can move to are then a single intersection of masks, and so
+are the squares it can build on after moving. Iterating over a mask from its lowest bit visits
+neighbors in the same order as santorinai's (dx, dy) loops, so plays are listed in the same order.
+
+SantoriniEngine can stand in for santorinai.board.Board in the Santorini game: it has the same
+pawns, board, get_playing_pawn, get_possible_*, place_pawn, play_move and is_game_over. Search
+and rollouts can use the cell-based plays, play and copy instead, which allocate no tuples.
+"""
+
+SIZE = 5
+CELLS = SIZE * SIZE
+ALL = (1 << CELLS) - 1
+MAX_LEVEL = 4  # a complete tower, which can't be moved onto or built on
+
+
+def cell(x, y):
+    return x * SIZE + y
+
+def position(cell):
+    return divmod(cell, SIZE)
+
+def cells(mask):
+    """The cells of a mask in increasing order."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+def _neighbors(c):
+    x, y = position(c)
+    mask = 0
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            if (dx or dy) and 0 <= x + dx < SIZE and 0 <= y + dy < SIZE:
+                mask |= 1 << cell(x + dx, y + dy)
+    return mask
+
+NEIGHBORS = [_neighbors(c) for c in range(CELLS)]
+
+
+class Pawn:
+    """A view of one of the engine's pawns, with the attributes of santorinai's Pawn."""
+    __slots__ = ("engine", "number", "player_number")
+
+    def __init__(self, engine, number, player_number):
+        self.engine = engine
+        self.number = number
+        self.player_number = player_number
+
+    @property
+    def pos(self):
+        c = self.engine.pawn_cells[self.number - 1]
+        return (None, None) if c < 0 else position(c)
+
+
+class SantoriniEngine:
+    def __init__(self, number_of_players=2):
+        self.nb_players = number_of_players
+        self.nb_pawns = number_of_players * 2
+        self.board_size = SIZE
+        self.heights = [0] * CELLS
+        # at_most[h]: cells of height at most h, for h = 0..3; everything else is a complete tower.
+        self.at_most = [ALL] * MAX_LEVEL
+        self.pawn_cells = [-1] * self.nb_pawns  # -1 until the pawn is placed
+        self.occupied = 0
+        # Pawns alternate between players: with two players, player 1 has pawns 1 and 3, player 2 has 2 and 4.
+        self.pawns = [Pawn(self, n, (n - 1) % number_of_players + 1) for n in range(1, self.nb_pawns + 1)]
+        self.pawn_turn = 1
+        self.turn_number = 1
+        self.winner_player_number = None
+
+    def copy(self):
+        engine = SantoriniEngine.__new__(SantoriniEngine)
+        engine.nb_players = self.nb_players
+        engine.nb_pawns = self.nb_pawns
+        engine.board_size = SIZE
+        engine.heights = self.heights[:]
+        engine.at_most = self.at_most[:]
+        engine.pawn_cells = self.pawn_cells[:]
+        engine.occupied = self.occupied
+        engine.pawns = [Pawn(engine, pawn.number, pawn.player_number) for pawn in self.pawns]
+        engine.pawn_turn = self.pawn_turn
+        engine.turn_number = self.turn_number
+        engine.winner_player_number = self.winner_player_number
+        return engine
+
+    @property
+    def board(self):
+        """Heights as santorinai's board[x][y] rows."""
+        return [self.heights[x * SIZE:(x + 1) * SIZE] for x in range(SIZE)]
+
+    # Masks and cell-based plays
+
+    def placement_mask(self):
+        return self.at_most[MAX_LEVEL - 1] & ~self.occupied
+
+    def move_mask(self, pawn_index):
+        """Cells the pawn can move to (or, if it isn't placed yet, be placed on)."""
+        c = self.pawn_cells[pawn_index]
+        if c < 0:
+            return self.placement_mask()
+        return NEIGHBORS[c] & self.at_most[min(self.heights[c] + 1, MAX_LEVEL - 1)] & ~self.occupied
+
+    def build_mask(self, from_cell, to_cell):
+        """Cells a pawn that moved from from_cell to to_cell can build on."""
+        return NEIGHBORS[to_cell] & self.at_most[MAX_LEVEL - 1] & ~(self.occupied ^ (1 << from_cell))
+
+    def plays(self):
+        """(move cell, build cell) of every play of the playing pawn."""
+        pawn_index = self.pawn_turn - 1
+        from_cell = self.pawn_cells[pawn_index]
+        return [
+            (to_cell, build_cell)
+            for to_cell in cells(self.move_mask(pawn_index))
+            for build_cell in cells(self.build_mask(from_cell, to_cell))
+        ]
+
+    def place(self, c):
+        self.pawn_cells[self.pawn_turn - 1] = c
+        self.occupied |= 1 << c
+        self.next_turn()
+
+    def play(self, to_cell, build_cell):
+        """Move the playing pawn and build, without checking that the play is legal."""
+        pawn_index = self.pawn_turn - 1
+        from_cell = self.pawn_cells[pawn_index]
+        self.pawn_cells[pawn_index] = to_cell
+        self.occupied ^= (1 << from_cell) | (1 << to_cell)
+        if self.heights[to_cell] == MAX_LEVEL - 1:
+            self.winner_player_number = self.pawns[pawn_index].player_number
+            return
+        height = self.heights[build_cell]
+        self.heights[build_cell] = height + 1
+        self.at_most[height] &= ~(1 << build_cell)  # it is still at most height + 1 and above
+        if self.is_everyone_stuck():
+            self.winner_player_number = self.pawns[pawn_index].player_number
+            return
+        self.next_turn()
+
+    def next_turn(self):
+        self.pawn_turn = self.pawn_turn % self.nb_pawns + 1
+        self.turn_number += 1
+
+    def is_everyone_stuck(self):
+        return not any(self.move_mask(i) for i in range(self.nb_pawns))
+
+    def is_game_over(self):
+        return self.winner_player_number is not None or self.is_everyone_stuck()
+
+    # santorinai.board.Board interface
+
+    def get_playing_pawn(self):
+        return self.pawns[self.pawn_turn - 1]
+
+    def get_possible_movement_positions(self, pawn):
+        return [position(c) for c in cells(self.move_mask(pawn.number - 1))]
+
+    def get_possible_building_positions(self, pawn):
+        c = self.pawn_cells[pawn.number - 1]
+        if c < 0:
+            return []
+        return [position(b) for b in cells(NEIGHBORS[c] & self.at_most[MAX_LEVEL - 1] & ~self.occupied)]
+
+    def get_possible_movement_and_building_positions(self, pawn):
+        pawn_index = pawn.number - 1
+        from_cell = self.pawn_cells[pawn_index]
+        if from_cell < 0:
+            return [(position(c), None) for c in cells(self.placement_mask())]
+        return [
+            (position(to_cell), position(build_cell))
+            for to_cell in cells(self.move_mask(pawn_index))
+            for build_cell in cells(self.build_mask(from_cell, to_cell))
+        ]
+
+    def place_pawn(self, pos):
+        if self.is_game_over():
+            return False, "The game is over."
+        if self.pawn_cells[self.pawn_turn - 1] >= 0:
+            return False, "The pawn has already been placed."
+        if not self.is_position_valid(pos):
+            return False, f"The position is not valid: {pos}."
+        c = cell(*pos)
+        if self.occupied >> c & 1:
+            return False, "The position is already occupied by another pawn."
+        self.place(c)
+        return True, "The pawn was placed."
+
+    def play_move(self, move_position, build_position):
+        if self.is_game_over():
+            return False, "The game is over."
+        pawn_index = self.pawn_turn - 1
+        from_cell = self.pawn_cells[pawn_index]
+        if from_cell < 0:
+            return False, "The pawn has not been placed yet."
+        if not self.move_mask(pawn_index):
+            self.next_turn()
+            return True, "There is no possible move to play, the pawn is stuck."
+        if not self.is_position_valid(move_position) or not self.move_mask(pawn_index) >> cell(*move_position) & 1:
+            return False, f"It is not possible to move to {move_position}."
+        to_cell = cell(*move_position)
+        if self.heights[to_cell] != MAX_LEVEL - 1 and (
+            not self.is_position_valid(build_position)
+            or not self.build_mask(from_cell, to_cell) >> cell(*build_position) & 1
+        ):
+            return False, f"It is not possible to build on {build_position}."
+        self.play(to_cell, cell(*build_position) if self.is_position_valid(build_position) else None)
+        return True, "The move was played."
+
+    def is_position_valid(self, pos):
+        return (
+            isinstance(pos, tuple) and len(pos) == 2
+            and isinstance(pos[0], int) and isinstance(pos[1], int)
+            and 0 <= pos[0] < SIZE and 0 <= pos[1] < SIZE
+        )
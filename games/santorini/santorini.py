@@ -7,6 +7,7 @@ from colorama import Back, Fore, Style
 from santorinai.board import Board, Pawn
 
 from api.classes import Action, Agent, AvailableActions, Game, Observation, Rules
+from .engine import SantoriniEngine
 
 
 @dataclass
@@ -42,6 +43,7 @@ class Santorini(Game):
     game_is_over: bool = False
     board: Board = None
     colored_output: bool = True
+    fast_engine: bool = True  # play on the packed engine in engine.py instead of santorinai's Board; the rules are identical
     DIRECTION_NAME_MATRIX = [
         ["northwest", "north", "northeast"],
         ["west", None, "east"],
@@ -53,7 +55,7 @@ class Santorini(Game):
             agent_1(team_id=1, agent_id=0, **self.agent_1_kwargs),
             agent_2(team_id=2, agent_id=1, **self.agent_2_kwargs),
         ]
-        self.board = Board(2)
+        self.board = SantoriniEngine(2) if self.fast_engine else Board(2)
 
     def pawn_letter(self, pawn: Pawn) -> str:
         letter_mapping = {
@@ -77,16 +79,16 @@ class Santorini(Game):
     def get_board_matrix(self) -> List[List[BoardSquare]]:
         """Return a matrix representation of the board, where each square is represented as a list of two elements: the first element is the level of the square, and the second element is the letter of the pawn that is on the square, or "." if the square is not occupied."""
 
-        original_board = self.board.copy()
+        levels = self.board.board
         board_matrix: List[List[BoardSquare]] = [
             [
-                BoardSquare(level=original_board.board[i][j], pawn_letter=".")
+                BoardSquare(level=levels[i][j], pawn_letter=".")
                 for j in range(5)
             ]
             for i in range(5)
         ]
 
-        for pawn in original_board.pawns:
+        for pawn in self.board.pawns:
             position = pawn.pos
             if position is None or position[0] is None or position[1] is None:
                 continue
@@ -150,6 +152,9 @@ class Santorini(Game):
         return board_string
 
     def get_general_observation(self, agent: Agent) -> Observation:
+        if self.fast_mode:
+            return Observation(text="")
+
         board_string = self.board_string_for_agent()
         pawns = self.get_pawns(agent)
         pawn_letters = [self.pawn_letter(pawn) for pawn in pawns]
@@ -274,7 +279,8 @@ class Santorini(Game):
         self.display_message(
             f"Player {player_number} placed pawn {pawn_letter} at {move}."
         )
-        self.display_message(self.board_string_for_user())
+        if self.show_state:
+            self.display_message(self.board_string_for_user())
 
     def play_turn(
         self,
@@ -297,7 +303,8 @@ class Santorini(Game):
         self.display_message(
             f"Player {player_number} moved pawn {pawn_letter} to {move} and built at {build}."
         )
-        self.display_message(self.board_string_for_user())
+        if self.show_state:
+            self.display_message(self.board_string_for_user())
 
     def play(self) -> Tuple[float, float]:
         """Return the scores for agent_1 and agent_2 after the game is finished."""
@@ -1,14 +1,18 @@
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 import random
 from abc import abstractmethod
 from typing import List, Dict, Optional, Tuple, ClassVar
 from api.classes import Observation, Action, Agent, AvailableActions, Game, Rules
 import ast
+import asyncio
+from collections import Counter
 from itertools import permutations, product, combinations
 from pprint import pprint
 
 PLAYERS_PER_TEAM = 3
 N_PLAYERS = 2 * PLAYERS_PER_TEAM
+BOARD_SIZE = 24
+N_ROCKS = 14  # rocks placed inside the border
 
 @dataclass
 class Location:
@@ -83,35 +87,77 @@ class SeaBattle(Game):
         }
     )
 
+    board_size : int = BOARD_SIZE
+    players_per_team : int = PLAYERS_PER_TEAM
+    n_rocks : int = N_ROCKS
+
     def log(self, message):
         if self.show_state:
             print("Sea battle:", message)
 
     def init_game(self, agent1 : Agent, agent2 : Agent):
-        team1 = [agent1(agent_id=i, team_id=0, **self.agent_1_kwargs) for i in range(PLAYERS_PER_TEAM)]
-        team2 = [agent2(agent_id=i+PLAYERS_PER_TEAM, team_id=1, **self.agent_2_kwargs) for i in range(PLAYERS_PER_TEAM)]
+        n, size = self.players_per_team, self.board_size
+        if (size, n) != (BOARD_SIZE, PLAYERS_PER_TEAM):
+            details = dict(self.rules.additional_details)
+            details["Board"] = f"The board is a {size}x{size} grid. Some squares are occupied by rocks and some are occupied by players' ships."
+            details["Teams"] = f"At the start of the game, there are {n} players on each team."
+            self.rules = replace(self.rules, additional_details=details)
+
+        team1 = [agent1(agent_id=i, team_id=0, **self.agent_1_kwargs) for i in range(n)]
+        team2 = [agent2(agent_id=i+n, team_id=1, **self.agent_2_kwargs) for i in range(n)]
         self.agents = team1 + team2
 
-        all_locations = [Location(x+y*1j) for x in range(1, 23) for y in range(1, 23)]
+        all_locations = [Location(x+y*1j) for x in range(1, size - 1) for y in range(1, size - 1)]
         random.shuffle(all_locations)
 
         self._players = [
             Player(agent, location)
             for _, agent, location
-            in zip(range(N_PLAYERS), self.agents, all_locations)
+            in zip(range(2 * n), self.agents, all_locations)
         ]
 
         self.rocks = \
-            [Location(0 +i*1j) for i in range(24)] + \
-            [Location(i + 23j) for i in range(24)] + \
-            [Location(23+i*1j) for i in range(24)] + \
-            [Location(i +  0j) for i in range(24)] + \
-            all_locations[N_PLAYERS:20]
+            [Location(0 +i*1j) for i in range(size)] + \
+            [Location(i + (size - 1)*1j) for i in range(size)] + \
+            [Location(size - 1 + i*1j) for i in range(size)] + \
+            [Location(i +  0j) for i in range(size)] + \
+            all_locations[2 * n:2 * n + self.n_rocks]
+
+        # Spatial index: rock positions, and the live ships at each position in player order.
+        # Ships can briefly share a square when one is rammed or blocked while another moves in.
+        self.rock_positions = {rock.position for rock in self.rocks}
+        self.ships = {}
+        for player in self._players:
+            self.ships.setdefault(player.location.position, []).append(player)
+        self._live = list(self._players)
 
     @property
     def players(self):
-        """Return only non-sunk players."""
-        return [p for p in self._players if not p.damage.sunk()]
+        """Return only non-sunk players. The list is replaced, not mutated, when a ship sinks."""
+        return self._live
+
+    def apply_damage(self, player : Player, damage):
+        """Apply damage (one of player.damage's methods) and take the player off the board if it sinks."""
+        damage()
+        if player.damage.sunk() and any(p is player for p in self._live):
+            self._live = [p for p in self._live if p is not player]
+            self.remove_ship(player)
+            return True
+        return False
+
+    def remove_ship(self, player : Player):
+        # Player.__eq__ compares locations, so list.remove could take a different ship on the same square.
+        position = player.location.position
+        self.ships[position] = [p for p in self.ships[position] if p is not player]
+        if not self.ships[position]:
+            del self.ships[position]
+
+    def move_player(self, player : Player, location : Location):
+        self.remove_ship(player)
+        player.location = location
+        ships = self.ships.setdefault(location.position, [])
+        ships.append(player)
+        ships.sort(key=lambda p: p.agent.agent_id)
 
     def player_from_agent(self, agent : Agent):
         """Used by functions that are called per-agent."""
@@ -119,17 +165,19 @@ class SeaBattle(Game):
 
     def get_observation(self, agent : Agent) -> Tuple[Observation, AvailableActions]:
         player = self.player_from_agent(agent)
-        s = "Rocks line the border of the 24 by 24 board.\n"
-        for p in self.players:
-            q = 'Your ship' if p.agent == agent else ('A teammate\'s ship' if p.agent.team_id == agent.team_id else 'An opponent\'s ship')
-            s += f"{q} is located at {p.location.xy} facing {p.location.cardinal}.\n"
-        s += "There are more rocks located at " + ", ".join([str(r.xy) for r in self.rocks[-20:]]) + "\n"
-        s += f"You've sustained {player.damage.damage} damage. If you reach {player.damage.threshold}, you will sink."
+        s = ""
+        if not self.fast_mode:
+            s = f"Rocks line the border of the {self.board_size} by {self.board_size} board.\n"
+            for p in self.players:
+                q = 'Your ship' if p.agent == agent else ('A teammate\'s ship' if p.agent.team_id == agent.team_id else 'An opponent\'s ship')
+                s += f"{q} is located at {p.location.xy} facing {p.location.cardinal}.\n"
+            s += "There are more rocks located at " + ", ".join([str(r.xy) for r in self.rocks[4 * self.board_size:]]) + "\n"
+            s += f"You've sustained {player.damage.damage} damage. If you reach {player.damage.threshold}, you will sink."
+
+            tabbed = "\n\t".join(s.split("\n"))
+            self.log(f"Showing observation for agent {agent.agent_id}:\n\t{tabbed}")
         observation = Observation(text=s)
 
-        tabbed = "\n\t".join(s.split("\n"))
-        self.log(f"Showing observation for agent {agent.agent_id}:\n\t{tabbed}")
-
         available_actions = AvailableActions(
             instructions="Decide how you will move and shoot this turn.",
             predefined={
@@ -187,16 +235,7 @@ class SeaBattle(Game):
                 player.claim = player.location
 
         # 2. Resolve collisions
-        for player in self.players:
-            if player.claim in self.rocks:
-                self.log(f"Agent {player.agent.agent_id} is attempting to move into a rock. They will not move and instead sustain damage.")
-
-                player.damage.rock()
-            elif any(player.will_collide(t) for t in self.players if t != player):
-                self.log(f"Agent {player.agent.agent_id} is attempting to move into the same space as another ship. They will not move and instead sustain damage.")
-                player.damage.ram()
-            else:
-                player.location = player.claim
+        self.resolve_claims(ram_damage=True)
 
         # 3. Turn ships that tried to turn, regardless of collision
         for player in self.players:
@@ -219,16 +258,37 @@ class SeaBattle(Game):
                 player.claim = player.location
 
         # 5. Resolve collisions again, with slightly different rules.
-        for player in self.players:
-            if player.claim in self.rocks:
+        self.resolve_claims(ram_damage=False)
+
+    def resolve_claims(self, ram_damage):
+        """
+        Move every live ship to its claim, unless the claim is a rock (the ship takes rock damage) or
+        another live ship claims the same square (with ram_damage, the ship takes ram damage).
+
+        Claims are counted once instead of comparing every pair of ships. As in Player.will_collide
+        and Player.__eq__, ships standing on this ship's square don't count as other ships.
+        """
+        players = self.players
+        claims = Counter(p.claim.position for p in players)
+        claims_from = Counter((p.claim.position, p.location.position) for p in players)
+        for player in players:
+            claim, position = player.claim.position, player.location.position
+            collides = claims[claim] > claims_from[claim, position]
+            if claim in self.rock_positions:
                 self.log(f"Agent {player.agent.agent_id} is attempting to move into a rock. They will not move and instead sustain damage.")
-
-                player.damage.rock()
-
-            elif not any(player.will_collide(t) for t in self.players if t != player):
-                self.log(f"Agent {player.agent.agent_id} is attempting to move into the same space as another ship. They will not move, but sustain no damage.")
-
-                player.location = player.claim
+                sunk = self.apply_damage(player, player.damage.rock)
+            elif collides:
+                self.log(f"Agent {player.agent.agent_id} is attempting to move into the same space as another ship. They will not move{' and instead sustain damage' if ram_damage else ', but sustain no damage'}.")
+                sunk = ram_damage and self.apply_damage(player, player.damage.ram)
+            else:
+                self.move_player(player, player.claim)
+                claims_from[claim, position] -= 1
+                claims_from[claim, claim] += 1
+                continue
+            if sunk:
+                # Sunk ships no longer block anyone.
+                claims[claim] -= 1
+                claims_from[claim, position] -= 1
 
     def fire_cannons(self):
         for player in self.players:
@@ -236,23 +296,37 @@ class SeaBattle(Game):
 
             direction = 1j if player.plan[1] == "shoot left" else -1j
 
-            target = player.location
+            target = player.location.position
+            step = player.location.heading * direction
             for _ in range(3):
-                target = target.adjacent(direction)
+                target += step
                 self.log(f"Checking if {target} is occupied.")
 
-                if target in self.rocks:
+                if target in self.rock_positions:
                     self.log("Is a rock. Cannonball is halted.")
                     break
 
-                hit = next((p for p in self.players if target == p.location), False)
-                if hit:
+                if self.ships.get(target):
+                    hit = self.ships[target][0]
                     self.log(f"Is agent {hit.agent.agent_id}. Issuing damage, cannonball is halted.")
-                    hit.damage.cannon()
+                    self.apply_damage(hit, hit.damage.cannon)
                     break
             else:
                 self.log("Cannonball did not collide with anything is will now halt.")
 
+    def scores(self) -> Optional[Tuple[float, float]]:
+        """Returns the final scores if the game is over, otherwise None."""
+        if len(self.players) == 0:
+            return (0.5, 0.5)
+
+        if all(player.agent.team_id == 0 for player in self.players):
+            return (1., 0.)
+
+        if all(player.agent.team_id == 1 for player in self.players):
+            return (0., 1.)
+
+        return None
+
     def play(self) -> Tuple[float, float]:
         while True:
             for player in self.players:
@@ -260,11 +334,24 @@ class SeaBattle(Game):
                 action = player.agent.take_action(self.rules, observation, available_actions, show_state=self.show_state)
                 self.update(action, available_actions, player.agent)
 
-            if len(self.players) == 0:
-                return (0.5, 0.5)
+            scores = self.scores()
+            if scores is not None:
+                return scores
 
-            if all(player.agent.team_id == 0 for player in self.players):
-                return (1., 0.)
+    async def play_async(self) -> Tuple[float, float]:
+        """Like play, but every live ship chooses its move concurrently since all moves are executed simultaneously."""
+        while True:
+            players = self.players
+            observations = [self.get_observation(player.agent) for player in players]
+            actions = await asyncio.gather(*[
+                player.agent.take_action_async(self.rules, observation, available_actions, show_state=self.show_state)
+                for player, (observation, available_actions) in zip(players, observations)
+            ])
+
+            # Plans only take effect once the last live ship has been updated, so order doesn't matter here.
+            for player, (_, available_actions), action in zip(players, observations, actions):
+                self.update(action, available_actions, player.agent)
 
-            if all(player.agent.team_id == 1 for player in self.players):
-                return (0., 1.)
\ No newline at end of file
+            scores = self.scores()
+            if scores is not None:
+                return scores
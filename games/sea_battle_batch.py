@@ -0,0 +1,244 @@
+"""
+Batch Sea Battle simulator.
+
+Plays B games of SeaBattle at once on NumPy arrays. Squares are numbered cell = x * size + y, so
+ship positions, headings and damage are (B, ships) arrays and rocks are a (B, size * size) mask.
+step takes one action index per ship (into ACTIONS, the moves of SeaBattle.get_observation) and
+plays a full round of every game.
+
+SeaBattle resolves ships one at a time: a ship that sinks part way through a phase stops blocking
+and absorbing cannonballs for the ships after it, and of two ships leaving the same square in the
+same direction, the second is rammed by the first. Each phase is therefore computed for all ships
+at once, and the few games where order could matter (a ship sinks, or two ships share a square)
+are replayed ship by ship. Either way the result is exactly what move_ships and fire_cannons do.
+"""
+import numpy as np
+
+from games.sea_battle import BOARD_SIZE, N_ROCKS, PLAYERS_PER_TEAM
+
+ACTIONS = [
+    "move left then shoot left",
+    "move left then shoot right",
+    "move forward then shoot left",
+    "move forward then shoot right",
+    "move right then shoot left",
+    "move right then shoot right",
+    "don't move then shoot left",
+    "don't move then shoot right",
+]
+MOVE_LEFT, MOVE_FORWARD, MOVE_RIGHT, STAY = range(4)  # action // 2
+SHOOT_LEFT, SHOOT_RIGHT = range(2)  # action % 2
+
+# Headings index East, North, West, South, so turning left (multiplying by 1j) adds one.
+HEADINGS = [1, 1j, -1, -1j]
+TURN = np.array([1, 0, 3, 0])  # by move
+SIDE = np.array([1, 3])  # by shot
+
+THRESHOLD = 10  # DamageCounter.threshold
+CANNON_DAMAGE = 2  # rocks and rams do 1
+CANNON_RANGE = 3
+EMPTY = -1  # in _marks
+
+
+class SeaBattleBatch:
+    def __init__(self, n_games, board_size=BOARD_SIZE, players_per_team=PLAYERS_PER_TEAM, n_rocks=N_ROCKS, seed=None):
+        self.n_games = n_games
+        self.board_size = board_size
+        self.n_ships = 2 * players_per_team
+        self.n_rocks = n_rocks
+        self.team = np.repeat([0, 1], players_per_team)
+        self.steps = np.array([board_size, 1, -board_size, -1], dtype=np.int32)  # one square forward, by heading
+        self.rng = np.random.default_rng(seed)
+
+        shape = (n_games, self.n_ships)
+        self.cell = np.zeros(shape, dtype=np.int32)
+        self.heading = np.zeros(shape, dtype=np.int8)
+        self.damage = np.zeros(shape, dtype=np.int8)
+        self.rocks = np.zeros((n_games, board_size * board_size), dtype=bool)
+        self.done = np.zeros(n_games, dtype=bool)
+        # Where each game's board starts in the flattened boards, and scratch boards for _mark.
+        self._squares = np.arange(n_games)[:, None] * board_size * board_size
+        self._marks = np.full(self.rocks.size, EMPTY, dtype=np.int8)
+        self.reset()
+
+    @classmethod
+    def from_games(cls, games):
+        """A batch holding the current state of SeaBattle games, which must share their settings."""
+        game = games[0]
+        batch = cls(len(games), game.board_size, game.players_per_team, game.n_rocks)
+        batch.rocks[:] = False
+        for b, game in enumerate(games):
+            for p, player in enumerate(game._players):
+                x, y = player.location.xy
+                batch.cell[b, p] = x * game.board_size + y
+                batch.heading[b, p] = HEADINGS.index(player.location.heading)
+                batch.damage[b, p] = player.damage.damage
+            for position in game.rock_positions:
+                batch.rocks[b, int(position.real) * game.board_size + int(position.imag)] = True
+        return batch
+
+    def reset(self, mask=None):
+        """Start new games in place of the games in mask (all games by default)."""
+        games = np.arange(self.n_games) if mask is None else np.flatnonzero(mask)
+        size, interior = self.board_size, self.board_size - 2
+        # Like SeaBattle.init_game: shuffle the interior squares, put the ships then the rocks on the first ones.
+        order = np.argsort(self.rng.random((len(games), interior * interior)), axis=1)[:, :self.n_ships + self.n_rocks]
+        cells = (order // interior + 1) * size + order % interior + 1
+
+        self.cell[games] = cells[:, :self.n_ships]
+        self.heading[games] = self.rng.integers(0, 4, (len(games), self.n_ships))
+        self.damage[games] = 0
+        rocks = np.zeros((len(games), size, size), dtype=bool)
+        rocks[:, [0, -1], :] = True
+        rocks[:, :, [0, -1]] = True
+        rocks = rocks.reshape(len(games), size * size)
+        np.put_along_axis(rocks, cells[:, self.n_ships:], True, axis=1)
+        self.rocks[games] = rocks
+        self.done[games] = False
+
+    def positions(self):
+        """(x, y) arrays of the ships' squares."""
+        return np.divmod(self.cell, self.board_size)
+
+    def alive(self):
+        return (self.damage < THRESHOLD) & ~self.done[:, None]
+
+    def step(self, actions):
+        """
+        Play one round of every game that isn't over, given (n_games, n_ships) action indices into
+        ACTIONS; the actions of sunk ships are ignored. Returns the scores of the games that ended
+        this round as an (n_games, 2) array (zero for the others) and the mask of games that are over.
+        """
+        actions = np.asarray(actions)
+        move, shoot = actions // 2, actions % 2
+
+        # 1. Moving ships claim the square in front of them, the others their own. 2. Resolve.
+        live = self.alive()
+        self._resolve(live, self.cell + (move != STAY) * self.steps.take(self.heading), ram_damage=True)
+
+        # 3. Turn, whether or not the ship moved.
+        live = self.alive()
+        self.heading = np.where(live, (self.heading + TURN.take(move)) % 4, self.heading).astype(np.int8)
+
+        # 4. Turning ships claim the square in front of them again. 5. Resolve without ram damage.
+        turning = (move == MOVE_LEFT) | (move == MOVE_RIGHT)
+        self._resolve(live, self.cell + turning * self.steps.take(self.heading), ram_damage=False)
+
+        self._fire(self.alive(), self.steps.take((self.heading + SIDE.take(shoot)) % 4))
+        return self._scores()
+
+    def _mark(self, squares, ships, order):
+        """
+        Write each ship's index at its square (a flat index into every game's board) in self._marks,
+        for the ships in the ships mask, in order; read back which ship holds each ship's square.
+        """
+        marks = self._marks
+        for p in order:
+            marks[squares[:, p]] = np.where(ships[:, p], p, marks[squares[:, p]])
+        return marks[squares]
+
+    def _resolve(self, active, claims, ram_damage):
+        """SeaBattle.resolve_claims for every game: active ships move to their claims."""
+        cell, damage = self.cell, self.damage
+        ships = np.arange(self.n_ships)
+
+        # When no two ships share a square, a ship collides exactly when another ship claims its
+        # claim, i.e. when the first and last ship to claim the square differ.
+        squares = self._squares + cell
+        shared = (active & (self._mark(squares, active, ships) != ships)).any(axis=1)
+        self._marks[squares] = EMPTY
+        claimed = self._squares + claims
+        last = self._mark(claimed, active, ships)
+        first = self._mark(claimed, active, reversed(ships))
+        self._marks[claimed] = EMPTY
+        collides = first != last
+        rock = self.rocks.reshape(-1)[claimed]
+        hurt = active & (rock | (collides & ram_damage))
+
+        # A ship rammed to the bottom stops blocking the ships after it, and of two ships leaving
+        # a square together only the first moves, so those games are replayed ship by ship.
+        replay = np.flatnonzero(shared | (hurt & ~rock & (damage >= THRESHOLD - 1)).any(axis=1))
+        old_cell, old_damage = cell[replay], damage[replay]
+
+        damage += hurt
+        np.copyto(cell, claims, where=active & ~rock & ~collides)
+
+        if len(replay):
+            _resolve_in_order(old_cell, old_damage, self.rocks[replay], active[replay], claims[replay], ram_damage)
+            cell[replay], damage[replay] = old_cell, old_damage
+
+    def _fire(self, shooters, steps):
+        """SeaBattle.fire_cannons for every game: each shot travels until it hits a rock or a ship, at most CANNON_RANGE squares."""
+        rocks = self.rocks.reshape(-1)
+        last = rocks.size - 1
+        # The first live ship on a square, in player order, is the one that gets hit.
+        squares = self._squares + self.cell
+        self._mark(squares, self.damage < THRESHOLD, reversed(range(self.n_ships)))
+
+        flying = shooters.copy()
+        target = squares.copy()
+        victim = np.full_like(self.cell, EMPTY)
+        for _ in range(CANNON_RANGE):
+            target += steps
+            # Border rocks stop every shot before it leaves its board; clipping only covers shots that already stopped.
+            square = np.clip(target, 0, last)
+            flying &= ~rocks[square]
+            ship = self._marks[square]
+            hit = flying & (ship != EMPTY)
+            victim = np.where(hit, ship, victim)
+            flying &= ~hit
+        self._marks[squares] = EMPTY
+
+        hit = victim != EMPTY
+        hits = np.zeros_like(self.damage)
+        np.add.at(hits, (np.nonzero(hit)[0], victim[hit]), 1)
+
+        # A ship sunk part way through the phase can't be hit by (or block) the shots after it.
+        sinks = (self.damage < THRESHOLD) & (self.damage + CANNON_DAMAGE * hits >= THRESHOLD)
+        replay = np.flatnonzero(sinks.any(axis=1) & (hits.sum(axis=1) > 1))
+        old_damage = self.damage[replay]
+        self.damage += CANNON_DAMAGE * hits
+        if len(replay):
+            _fire_in_order(self.cell[replay], old_damage, self.rocks[replay], shooters[replay], steps[replay])
+            self.damage[replay] = old_damage
+
+    def _scores(self):
+        alive = self.damage < THRESHOLD
+        team_0 = (alive & (self.team == 0)).any(axis=1)
+        team_1 = (alive & (self.team == 1)).any(axis=1)
+        ended = ~self.done & ~(team_0 & team_1)
+
+        scores = np.zeros((self.n_games, 2))
+        scores[ended & ~team_0 & ~team_1] = 0.5
+        scores[ended & team_0 & ~team_1, 0] = 1.
+        scores[ended & team_1 & ~team_0, 1] = 1.
+        self.done |= ended
+        return scores, self.done.copy()
+
+
+def _resolve_in_order(cell, damage, rocks, active, claims, ram_damage):
+    """SeaBattle.resolve_claims exactly: ships in player order, vectorized over games."""
+    rows = np.arange(len(cell))
+    for p in range(cell.shape[1]):
+        acting = active[:, p]
+        # Ships sunk earlier in this pass no longer claim anything; ships on p's square don't count.
+        same_claim = (damage < THRESHOLD) & (claims == claims[:, p, None])
+        collides = (same_claim & (cell != cell[:, p, None])).any(axis=1)
+        rock = rocks[rows, claims[:, p]]
+        damage[:, p] += acting & (rock | (collides & ram_damage))
+        np.copyto(cell[:, p], claims[:, p], where=acting & ~rock & ~collides)
+
+def _fire_in_order(cell, damage, rocks, shooters, steps):
+    """SeaBattle.fire_cannons exactly: shots in player order, vectorized over games."""
+    rows = np.arange(len(cell))
+    last = rocks.shape[1] - 1
+    for p in range(cell.shape[1]):
+        flying = shooters[:, p].copy()
+        target = cell[:, p].copy()
+        for _ in range(CANNON_RANGE):
+            target += steps[:, p]
+            flying &= ~rocks[rows, np.clip(target, 0, last)]
+            at_target = (damage < THRESHOLD) & (cell == target[:, None])
+            hit = flying & at_target.any(axis=1)
+            damage[rows[hit], at_target[hit].argmax(axis=1)] += CANNON_DAMAGE
+            flying &= ~hit
@@ -39,7 +39,7 @@ class TicTacToe(Game):
         return board_string
 
     def get_observation(self, agent : Agent) -> Tuple[Observation, AvailableActions]:
-        board_string = self.get_board_string()
+        board_string = "" if self.fast_mode else self.get_board_string()
         observation = Observation(text=board_string)
 
         marker = self.agent_data[agent.agent_id]["marker"]
@@ -2,6 +2,7 @@ from dataclasses import dataclass, field
 from api.classes import Observation, Action, Agent, AvailableActions, Game, Rules
 from typing import List, Dict, Optional, Tuple
 import random
+import asyncio
 import pdb
 import re
 
@@ -135,7 +136,104 @@ class TwoRoomsAndaBoom(Game):
 #for fun, {"I will destroy your team": None} still got responses though. Weird.
 #########################################
 
+    async def act(self, agent, observation, available_actions, concurrent) -> Action:
+        if concurrent:
+            return await agent.take_action_async(self.rules, observation, available_actions, show_state=self.show_state)
+        return agent.take_action(self.rules, observation, available_actions, show_state=self.show_state)
+
+    async def room_discussion(self, i, room_index, current_leader, concurrent):
+        if self.show_state: print(f"\nRoom {room_index} turn")
+
+        # currently allows *all* players a single opportunity to engage with another player
+        for card in self.rooms[room_index].cards:
+
+            discussion_context = "" # take agent's interaction, poss updates leader
+            room_ids = [player.identifier for player in self.rooms[room_index].cards]
+            room_ids.remove(card.identifier) # remove self from list of room agents
+
+
+            # playerA picks player to ask (playerB)
+            card.context += f"In round {i+1} I am in room {room_index} and need to talk with one of the following players with the following players: {room_ids}. "
+            discussion_context += f"In round {i+1} I am in room {room_index} and need to talk with one of the following players with the following players: {room_ids}. " 
+            observation, available_actions = self.observation_get_target(card.context, room_ids) 
+
+            try:
+                target_player_id = (await self.act(card.agent, observation, available_actions, concurrent)).action_id
+                target_player_id.isdigit()
+            except:
+                target_player_id = random.choice(room_ids) 
+
+            card.context += f"I decided to talk to player {target_player_id}. "
+            discussion_context += f"I decided to talk to player {target_player_id}. " 
+
+
+           # playerA generates question
+            observation, available_actions = self.observation_get_question(card.context) 
+            try:
+                question_to_ask = (await self.act(card.agent, observation, available_actions, concurrent)).openended_response
+            except:
+                continue
+
+            card.context += f"I asked them '{question_to_ask}'. "
+            discussion_context += f"I asked them '{question_to_ask}'. "
+
+
+           # playerB decides response
+            target_player = [card for card in self.rooms[room_index].cards if card.identifier == target_player_id][0]
+            observation, available_actions = self.observation_give_answer(target_player.context) 
+            try:
+                answer = (await self.act(target_player.agent, observation, available_actions, concurrent)).openended_response
+            except:
+                answer = "I can't answer that right now"
+
+            target_player.context += f"Player {card.identifier} asked me the question, '{question_to_ask}' I responded with '{answer}'. "
+            if self.show_state: print(f"{answer = }")
+
+
+            # playerA updates self with their response
+            card.context += f"They responded with '{answer}' "
+            discussion_context += f"They responded with '{answer}' "
+            if self.show_state: print(f"\n\tPlayer {card.identifier}:")
+            if self.show_state: print("\t" + card.context)
+
+
+            # Leader of room gets updated context
+            if card.is_leader != "Leader":
+                if card.team == current_leader.team:
+                    current_leader.context += f"""During round {i+1} Player {card.identifier} gave the following info for me to make decisions with ""{discussion_context}"". """
+
+    async def leader_trade(self, room_index, leader, concurrent):
+        room_ids = {card.identifier: card for card in self.rooms[room_index].show_cards() if card != leader}
+
+        observation, available_actions = self.observation_get_target(leader.context, room_ids)
+        try:
+            card_to_trade = (await self.act(leader.agent, observation, available_actions, concurrent)).action_id
+            card_to_trade.isdigit()
+        except:
+            items = list(room_ids.keys())
+            card_to_trade = random.choice(items)
+        
+        room_trade = room_ids[card_to_trade]
+        leader.context += f"I decided to trade card {room_trade.identifier}.\n"
+        if self.show_state: print(f"\n\tLEADER_{room_index} CONTEXT: \n\t{leader.context}") 
+        return room_trade
+
     def play(self):
+        # Without concurrency, play_rounds never suspends: step it to completion by hand instead of
+        # starting an event loop, so that play also works where a loop is already running.
+        rounds = self.play_rounds(concurrent=False)
+        try:
+            rounds.send(None)
+        except StopIteration as done:
+            return done.value
+        rounds.close()
+        raise RuntimeError("play_rounds suspended while playing synchronously; use play_async")
+
+    async def play_async(self):
+        """Like play, but the two rooms hold their discussions and pick their hostages concurrently, since neither depends on the other room."""
+        return await self.play_rounds(concurrent=True)
+
+    async def play_rounds(self, concurrent):
         self.winning_team = None
 
         def determine_winner():
@@ -179,106 +277,22 @@ class TwoRoomsAndaBoom(Game):
             ### Begin p2p decision making ###
             #################################
 
-            for room_index in range(2):
-                if self.show_state: print(f"\nRoom {room_index} turn")
-
-                # current_leader for adding discussion_context
-                if room_index == 0:
-                    current_leader = leader_0
-                else:
-                    current_leader = leader_1
-
-                # currently allows *all* players a single opportunity to engage with another player
-                for card in self.rooms[room_index].cards:
-
-                    discussion_context = "" # take agent's interaction, poss updates leader
-                    room_ids = [player.identifier for player in self.rooms[room_index].cards]
-                    room_ids.remove(card.identifier) # remove self from list of room agents
-
-
-                    # playerA picks player to ask (playerB)
-                    card.context += f"In round {i+1} I am in room {room_index} and need to talk with one of the following players with the following players: {room_ids}. "
-                    discussion_context += f"In round {i+1} I am in room {room_index} and need to talk with one of the following players with the following players: {room_ids}. " 
-                    observation, available_actions = self.observation_get_target(card.context, room_ids) 
-
-                    try:
-                        target_player_id = card.agent.take_action(self.rules, observation, available_actions, show_state=self.show_state).action_id
-                        target_player_id.isdigit()
-                    except:
-                        target_player_id = random.choice(room_ids) 
-
-                    card.context += f"I decided to talk to player {target_player_id}. "
-                    discussion_context += f"I decided to talk to player {target_player_id}. " 
-
-
-                   # playerA generates question
-                    observation, available_actions = self.observation_get_question(card.context) 
-                    try:
-                        question_to_ask = card.agent.take_action(self.rules, observation, available_actions, show_state=self.show_state).openended_response
-                    except:
-                        continue
-
-                    card.context += f"I asked them '{question_to_ask}'. "
-                    discussion_context += f"I asked them '{question_to_ask}'. "
-
-
-                   # playerB decides response
-                    target_player = [card for card in self.rooms[room_index].cards if card.identifier == target_player_id][0]
-                    observation, available_actions = self.observation_give_answer(target_player.context) 
-                    try:
-                        answer = target_player.agent.take_action(self.rules, observation, available_actions, show_state=self.show_state).openended_response
-                    except:
-                        answer = "I can't answer that right now"
-
-                    target_player.context += f"Player {card.identifier} asked me the question, '{question_to_ask}' I responded with '{answer}'. "
-                    if self.show_state: print(f"{answer = }")
-
-
-                    # playerA updates self with their response
-                    card.context += f"They responded with '{answer}' "
-                    discussion_context += f"They responded with '{answer}' "
-                    if self.show_state: print(f"\n\tPlayer {card.identifier}:")
-                    if self.show_state: print("\t" + card.context)
-
-
-                    # Leader of room gets updated context
-                    if card.is_leader != "Leader":
-                        if card.team == current_leader.team:
-                            current_leader.context += f"""During round {i+1} Player {card.identifier} gave the following info for me to make decisions with ""{discussion_context}"". """
-
+            discussions = [self.room_discussion(i, 0, leader_0, concurrent), self.room_discussion(i, 1, leader_1, concurrent)]
+            if concurrent:
+                await asyncio.gather(*discussions)
+            else:
+                for discussion in discussions:
+                    await discussion
 
             ####################################
             ### Begin leader decision making ###
             ####################################
-            
-            room_0_ids = {card.identifier: card for card in self.rooms[0].show_cards() if card != leader_0}
-            room_1_ids = {card.identifier: card for card in self.rooms[1].show_cards() if card != leader_1}
 
-            ### Room 0 ###
-            observation, available_actions = self.observation_get_target(leader_0.context, room_0_ids)
-            try:
-                card_to_trade = leader_0.agent.take_action(self.rules, observation, available_actions, show_state=self.show_state).action_id
-                card_to_trade.isdigit()
-            except:
-                items = list(room_0_ids.keys())
-                card_to_trade = random.choice(items)
-            
-            room_0_trade = room_0_ids[card_to_trade]
-            leader_0.context += f"I decided to trade card {room_0_trade.identifier}.\n"
-            if self.show_state: print(f"\n\tLEADER_0 CONTEXT: \n\t{leader_0.context}") 
-            
-            # Room 1
-            observation, available_actions = self.observation_get_target(leader_1.context, room_1_ids)
-            try:
-                card_to_trade = leader_1.agent.take_action(self.rules, observation, available_actions, show_state=self.show_state).action_id
-                card_to_trade.isdigit()
-            except:
-                items = list(room_1_ids.keys())
-                card_to_trade = random.choice(items)
-            
-            room_1_trade = room_1_ids[card_to_trade]
-            leader_1.context += f"I decided to trade card {room_1_trade.identifier}.\n"
-            if self.show_state: print(f"\n\tLEADER_1 CONTEXT: \n\t{leader_1.context}") 
+            if concurrent:
+                room_0_trade, room_1_trade = await asyncio.gather(self.leader_trade(0, leader_0, concurrent), self.leader_trade(1, leader_1, concurrent))
+            else:
+                room_0_trade = await self.leader_trade(0, leader_0, concurrent)
+                room_1_trade = await self.leader_trade(1, leader_1, concurrent)
 
             # Action
             self.trade_card(room_0_trade, room_1_trade)
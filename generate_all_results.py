@@ -18,7 +18,7 @@ complete_matches = {
 } | {"all": get_matches()}
 complete_bootstrapped_params = {
     g: bootstrap_params(m) for g, m in complete_matches.items()
-} | {"all": bootstrap_params(get_matches())}
+}
 
 ################################################################################
 ################################################################################
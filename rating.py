@@ -1,8 +1,6 @@
 from api.util import load_json
 from collections import defaultdict
 import random
-import functools
-import choix
 import numpy as np
 
 ################################################################################
@@ -32,10 +30,13 @@ import numpy as np
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 def lsr_pairwise(n_items, data, alpha=0.0, initial_params=None):
+    # data is a tuple of arrays (p1, p2, p1score, p2score), one entry per match.
+    import choix  # imports scipy, so only when ratings are actually fitted
+    p1, p2, p1score, p2score = data
     weights, chain = choix.lsr._init_lsr(n_items, alpha, initial_params)
-    for p1, p2, p1score, p2score in data:
-        chain[p1, p2] += float(p2score) / (weights[p1] + weights[p2])
-        chain[p2, p1] += float(p1score) / (weights[p1] + weights[p2])
+    denominator = weights[p1] + weights[p2]
+    np.add.at(chain, (p1, p2), p2score / denominator)
+    np.add.at(chain, (p2, p1), p1score / denominator)
     chain -= np.diag(chain.sum(axis=1))
     return choix.utils.log_transform(choix.utils.statdist(chain))
 
@@ -43,7 +44,9 @@ def lsr_pairwise(n_items, data, alpha=0.0, initial_params=None):
 def ilsr_pairwise(
     n_items, data, alpha=0.0, initial_params=None, max_iter=100, tol=1e-8
 ):
-    fun = functools.partial(lsr_pairwise, n_items=n_items, data=data, alpha=alpha)
+    import choix
+    def fun(initial_params=None):
+        return lsr_pairwise(n_items, data, alpha=alpha, initial_params=initial_params)
     return choix.lsr._ilsr(fun, initial_params, max_iter, tol)
 
 ################################################################################
@@ -58,39 +61,188 @@ def get_matches(game=None):
         return [m for m in load_json("matches.json") if m["game"] == game]
     return load_json("matches.json")
 
-def get_params(matches):
-    wins = []
+def match_arrays(matches):
+    """
+    Convert match dicts into integer/float arrays (i, j, score_i, score_j, weight) once, so
+    that fitting and resampling never walk the dicts again. weight is 1 / (number of matches
+    of that game), which resamples every game equally.
+    """
+    n = len(matches)
+    i = np.empty(n, dtype=np.int64)
+    j = np.empty(n, dtype=np.int64)
+    score_i = np.empty(n)
+    score_j = np.empty(n)
+    game_counts = defaultdict(int)
     for match in matches:
+        game_counts[match["game"]] += 1
+
+    weight = np.empty(n)
+    for k, match in enumerate(matches):
         agents = list(match.keys())[1:]
-        if match[agents[0]] == match[agents[1]]:
-            continue
+        i[k] = players.index(agents[0])
+        j[k] = players.index(agents[1])
+        score_i[k] = match[agents[0]]
+        score_j[k] = match[agents[1]]
+        weight[k] = 1 / game_counts[match["game"]]
+
+    return i, j, score_i, score_j, weight
 
-        i = players.index(agents[0])
-        j = players.index(agents[1])
+def fit_params(arrays, indices=None):
+    """Fit Bradley-Terry ratings to the matches selected by indices (all by default). Draws are ignored."""
+    i, j, score_i, score_j, _ = arrays
+    if indices is not None:
+        i, j, score_i, score_j = i[indices], j[indices], score_i[indices], score_j[indices]
+    decisive = score_i != score_j
+    data = (i[decisive], j[decisive], score_i[decisive], score_j[decisive])
+    return ilsr_pairwise(len(players), data, alpha=0.001)
 
-        wins.append((i, j, match[agents[0]], match[agents[1]]))
+def get_params(matches):
+    return fit_params(match_arrays(matches))
 
-    params = ilsr_pairwise(len(players), wins, alpha=0.001)
-    return params
+def _fit_resamples(arrays, resamples):
+    return np.array([fit_params(arrays, indices) for indices in resamples])
 
+def bootstrap_params(matches, n_samples=1000, num_workers=None, seed=None):
+    """
+    Bootstrap the ratings over n_samples resamples of matches, weighting each game equally.
 
-def bootstrap_params(matches):
-    weights = defaultdict(int)
-    for match in matches:
-        weights[match["game"]] += 1
-
-    bootstrapped_params = np.array(
-        [
-            get_params(
-                random.choices(
-                    matches, k=len(matches), weights=[1 / weights[m["game"]] for m in matches]
-                )
-            )
-            for _ in range(1000)
-        ]
-    )
+    Resamples are drawn up front as index arrays into the precomputed match arrays. With
+    num_workers, they are fitted across a process pool.
+    """
+    arrays = match_arrays(matches)
+    if seed is None:
+        # Draw from the random module so that random.seed() keeps the results reproducible.
+        seed = random.getrandbits(64)
+    rng = np.random.default_rng(seed)
+    weight = arrays[4]
+    resamples = rng.choice(len(matches), size=(n_samples, len(matches)), p=weight / weight.sum())
+
+    if not num_workers:
+        return _fit_resamples(arrays, resamples)
+
+    from concurrent.futures import ProcessPoolExecutor
+    chunks = np.array_split(resamples, num_workers)
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        return np.concatenate(list(executor.map(_fit_resamples, [arrays] * len(chunks), chunks)))
+
+class OnlineRatings:
+    """
+    Ratings that update as matches arrive, without re-reading the match history.
+
+    Per game (and pooled over all games under the key None), only sufficient statistics are
+    kept: points[i, j] is the total score agent i earned against agent j in decisive matches,
+    and draws[i, j] / totals[i, j] count draws and all matches between them. The LSR chain can be
+    rebuilt from points alone, and refits are warm-started from the previous parameters, so a
+    query after a few new matches converges in a couple of iterations.
+    """
+
+    def __init__(self, agents=players, alpha=0.001):
+        self.agents = list(agents)
+        self.alpha = alpha
+        self.points = {}
+        self.draws = {}
+        self.totals = {}
+        self.params = {}
+        self.stale = set()
+        self._store_position = 0
+
+    def _agent_index(self, agent):
+        if agent not in self.agents:
+            self.agents.append(agent)
+        return self.agents.index(agent)
 
-    return bootstrapped_params
+    def _stats(self, game):
+        n = len(self.agents)
+        for stats in (self.points, self.draws, self.totals):
+            matrix = stats.get(game)
+            if matrix is None or matrix.shape[0] < n:
+                matrix = np.zeros((0, 0)) if matrix is None else matrix
+                grown = np.zeros((n, n))
+                grown[:matrix.shape[0], :matrix.shape[1]] = matrix
+                stats[game] = grown
+        return self.points[game], self.draws[game], self.totals[game]
+
+    def add_match(self, match):
+        agents = list(match.keys())[1:]
+        i = self._agent_index(agents[0])
+        j = self._agent_index(agents[1])
+        for game in (match["game"], None):
+            points, draws, totals = self._stats(game)
+            totals[i, j] += 1
+            totals[j, i] += 1
+            if match[agents[0]] == match[agents[1]]:
+                draws[i, j] += 1
+                draws[j, i] += 1
+            else:
+                points[i, j] += match[agents[0]]
+                points[j, i] += match[agents[1]]
+            self.stale.add(game)
+
+    def add_matches(self, matches):
+        for match in matches:
+            self.add_match(match)
+
+    def follow(self, store):
+        """Add the matches appended to an api.match_store.MatchStore since the last call."""
+        store.refresh()
+        self.add_matches(store.matches[self._store_position:])
+        self._store_position = len(store.matches)
+
+    def _fit(self, game):
+        import choix
+        points, _, _ = self._stats(game)
+        n = len(self.agents)
+        initial_params = self.params.get(game)
+        if initial_params is not None and len(initial_params) < n:
+            initial_params = np.concatenate([initial_params, np.zeros(n - len(initial_params))])
+
+        def fun(initial_params=None):
+            weights, chain = choix.lsr._init_lsr(n, self.alpha, initial_params)
+            # chain[i, j] gets j's points against i, as in lsr_pairwise.
+            chain += points.T / (weights[:, None] + weights[None, :])
+            chain -= np.diag(chain.sum(axis=1))
+            return choix.utils.log_transform(choix.utils.statdist(chain))
+
+        # Without agents there is nothing to fit (and the LSR chain would be empty).
+        self.params[game] = choix.lsr._ilsr(fun, initial_params, 100, 1e-8) if n else np.zeros(0)
+        self.stale.discard(game)
+
+    def get_params(self, game=None):
+        """Current ratings as an array indexed like self.agents. game=None pools all games."""
+        # Params fitted before agents joined through other games are missing their entries.
+        if game in self.stale or game not in self.params or len(self.params[game]) != len(self.agents):
+            self._fit(game)
+        return self.params[game]
+
+    def ratings(self, game=None):
+        return dict(zip(self.agents, self.get_params(game)))
+
+    def confidence_intervals(self, game=None, z=1.96):
+        """
+        Normal-approximation intervals from the Fisher information of the Bradley-Terry model,
+        computed from the pairwise match counts alone.
+        """
+        params = self.get_params(game)
+        points, draws, totals = self._stats(game)
+        decisive = totals - draws
+        probabilities = 1 / (1 + np.exp(params[None, :] - params[:, None]))
+        information = decisive * probabilities * probabilities.T
+        information = np.diag(information.sum(axis=1)) - information
+        # Ratings are only defined up to a constant, so use the pseudo-inverse.
+        errors = z * np.sqrt(np.clip(np.diag(np.linalg.pinv(information)), 0, None))
+        return {agent: (rating - error, rating + error) for agent, rating, error in zip(self.agents, params, errors)}
+
+    def leaderboard(self, game=None):
+        """(agent, rating, (low, high), matches played) tuples, best first, for agents that have played."""
+        _, _, totals = self._stats(game)
+        intervals = self.confidence_intervals(game)
+        played = totals.sum(axis=1)
+        rows = [
+            (agent, rating, intervals[agent], int(played[k]))
+            for k, (agent, rating) in enumerate(self.ratings(game).items())
+            if played[k] > 0
+        ]
+        return sorted(rows, key=lambda row: row[1], reverse=True)
 
 games = ["sea_battle", "two_rooms_and_a_boom", "are_you_the_traitor", "air_land_sea", "santorini", "hive", "pit", "arctic_scavengers", "codenames"]
 games.sort()
@@ -0,0 +1,6 @@
+python api/benchmark.py games \
+    --n 10 \
+    --output_path benchmark_results.json
+
+python api/benchmark.py imports \
+    --output_path import_times.json
@@ -0,0 +1,4 @@
+python api/tournament.py \
+    --grid '[{"agent_1_path": "agents.random_agent.RandomAgent", "agent_2_path": "agents.gpt.GPT4", "game_path": "games.tic_tac_toe.TicTacToe", "num_matches": 20},
+             {"agent_1_path": "agents.random_agent.RandomAgent", "agent_2_path": "agents.gpt.GPT4", "game_path": "games.pit.pit.PitGame", "num_matches": 20}]' \
+    --num_workers 8
@@ -0,0 +1,17 @@
+from games.hive.board import Hex, HiveBoard
+from games.hive.engine import HiveEngine
+from games.hive.pieces import QueenBee, SoldierAnt
+
+
+def test_engine_mirrors_board_after_every_move():
+    board = HiveBoard()
+    board.add_piece(QueenBee(0), Hex(0, 0))
+    board.add_piece(QueenBee(1), Hex(1, 0))
+    board.add_piece(SoldierAnt(0), Hex(0, 1))
+
+    board.move_piece(Hex(0, 1), Hex(1, 1))
+    assert board.engine.pieces == HiveEngine.from_board(board).pieces
+
+    # onto an occupied hex
+    board.move_piece(Hex(1, 1), Hex(1, 0))
+    assert board.engine.pieces == HiveEngine.from_board(board).pieces
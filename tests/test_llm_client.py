@@ -0,0 +1,48 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from agents.llm_client import RequestScheduler, get_scheduler
+
+
+def identical_requests(scheduler, **request):
+    """Submit two identical requests while the first is still in flight; returns how many were sent."""
+    sent = threading.Semaphore(0)
+    release = threading.Event()
+    calls = []
+
+    def create(**request):
+        calls.append(request)
+        sent.release()
+        release.wait(5)
+        return object()
+
+    coalesced = scheduler.coalesced
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        first = executor.submit(scheduler.submit, create, **request)
+        sent.acquire(timeout=5)
+        second = executor.submit(scheduler.submit, create, **request)
+        # the second request is either sent too or joins the first
+        while not sent.acquire(timeout=0.01) and scheduler.coalesced == coalesced:
+            pass
+        release.set()
+        first.result(), second.result()
+    return len(calls)
+
+
+def test_only_deterministic_requests_are_coalesced():
+    scheduler = RequestScheduler(api_key="test")
+    assert identical_requests(scheduler, messages="hi", temperature=0) == 1
+    assert scheduler.coalesced == 1
+    assert identical_requests(scheduler, messages="hi", temperature=0.7) == 2
+    assert identical_requests(scheduler, messages="hi", temperature=0, n=3) == 2
+    assert scheduler.coalesced == 1
+
+
+def test_shared_scheduler_rejects_conflicting_limits():
+    scheduler = get_scheduler(api_key="test-limits", rpm=60)
+    assert get_scheduler(api_key="test-limits") is scheduler
+    assert get_scheduler(api_key="test-limits", rpm=60) is scheduler
+    with pytest.raises(ValueError):
+        get_scheduler(api_key="test-limits", rpm=120)
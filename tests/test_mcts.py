@@ -0,0 +1,86 @@
+import json
+
+from agents.llm_metrics import LLMMetrics, tagged
+from agents.rap.reasoners import SearchConfig, WorldModel
+from agents.rap.reasoners.algorithm import ArrayMCTS, MCTS
+
+
+class BinaryTree(WorldModel, SearchConfig):
+    """States are integers; action a leads from s to 2 * s + a and is rewarded a. States from 8 on are terminal."""
+
+    def __init__(self, start=1):
+        super().__init__()
+        self.start = start
+
+    def init_state(self):
+        return self.start
+
+    def step(self, state, action):
+        return 2 * state + action, {}
+
+    def is_terminal(self, state):
+        return state >= 8
+
+    def get_actions(self, state):
+        return [0, 1]
+
+    def fast_reward(self, state, action):
+        return 0.5, {}
+
+    def reward(self, state, action, **kwargs):
+        return float(action), {}
+
+
+def test_reuse_tree_keeps_subtree_when_prediction_matches():
+    world = BinaryTree()
+    mcts = MCTS(depth_limit=3, n_iters=8, reuse_tree=True)
+    mcts(world, world)
+    kept = mcts._reused_root
+    visits = len(kept.cum_rewards)
+
+    world.start = kept.state
+    mcts(world, world)
+    assert mcts.root is kept
+    assert len(mcts.root.cum_rewards) == visits + 8
+
+
+def test_reuse_tree_starts_afresh_when_prediction_misses():
+    world = BinaryTree()
+    mcts = MCTS(depth_limit=3, n_iters=8, reuse_tree=True)
+    mcts(world, world)
+    kept = mcts._reused_root
+
+    # the other move from the previous root
+    world.start = kept.state ^ 1
+    mcts(world, world)
+    assert mcts.root is not kept
+    assert mcts.root.state == world.start
+    assert len(mcts.root.cum_rewards) == 8
+    assert all(child.parent is mcts.root for child in mcts.root.children)
+
+
+def test_array_mcts_outputs_trace_in_each_iter():
+    world = BinaryTree()
+    mcts = ArrayMCTS(depth_limit=3, n_iters=8, output_trace_in_each_iter=True)
+    result = mcts(world, world)
+    assert len(result.trace_in_each_iter) == 8
+    # each trace is a snapshot of the tree after its iteration
+    assert [path[0].visits for path in result.trace_in_each_iter] == list(range(1, 9))
+    assert mcts.node_visualizer(result.tree_state)['visits'] == 8
+
+
+def test_wave_workers_keep_metrics_tags(tmp_path):
+    path = tmp_path / "llm_metrics.jsonl"
+    metrics = LLMMetrics(path=str(path))
+
+    class RecordingTree(BinaryTree):
+        def step(self, state, action):
+            metrics.record("completion", "test", 0.)
+            return super().step(state, action)
+
+    world = RecordingTree()
+    with tagged(agent="rap", turn=3):
+        MCTS(depth_limit=3, n_iters=8, n_workers=4)(world, world)
+    events = [json.loads(line) for line in path.read_text().splitlines()]
+    assert events
+    assert all(event["agent"] == "rap" and event["turn"] == 3 for event in events)
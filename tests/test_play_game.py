@@ -0,0 +1,11 @@
+import api.util as util
+from api.play_game import open_match_store, save_match
+
+
+def test_new_match_log_starts_with_legacy_matches(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    legacy = [{"game": "pit", "a": 1, "b": 0}, {"game": "pit", "a": 0, "b": 1}]
+    util.save_json(legacy, "matches.json")
+
+    save_match("pit", "a", "b", 1, 0)
+    assert open_match_store().query(game="pit", agents=("a", "b")) == legacy + [{"game": "pit", "a": 1, "b": 0}]
@@ -0,0 +1,20 @@
+from api.classes import AvailableActions, Observation, Rules
+from agents.rap.agent import ReasoningViaPlanning
+
+
+def test_reuse_tree_keeps_visits_across_turns():
+    agent = ReasoningViaPlanning(team_id=0, agent_id=0, agent_type=0, reuse_tree=True)
+    rules = Rules(title="Test", summary="A test game.", additional_details=None)
+    available_actions = AvailableActions(
+        instructions="Choose a move.", predefined={"0": "left", "1": "right"}, openended={}
+    )
+    agent.take_action(rules, Observation(text="start"), available_actions, show_state=False)
+    mcts = agent.reasoner.search_algo
+    kept = mcts._reused_root
+    visits = len(kept.cum_rewards)
+
+    # the game reports exactly the observation the world model predicted
+    observation = Observation(text=mcts._reused_state.observation)
+    agent.take_action(rules, observation, available_actions, show_state=False)
+    assert mcts.root is kept
+    assert len(mcts.root.cum_rewards) == visits + mcts.n_iters
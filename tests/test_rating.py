@@ -0,0 +1,18 @@
+from rating import OnlineRatings
+
+
+def match(game, first, first_score, second, second_score):
+    return {"game": game, first: first_score, second: second_score}
+
+
+def test_ratings_cover_agents_added_after_a_fit():
+    ratings = OnlineRatings(agents=[])
+    ratings.add_match(match("pit", "a", 1, "b", 0))
+    ratings.add_match(match("hive", "a", 0, "b", 1))
+    assert len(ratings.ratings("hive")) == 2
+
+    # c only plays pit, after hive has been fitted
+    ratings.add_match(match("pit", "a", 1, "c", 0))
+    assert set(ratings.ratings("hive")) == {"a", "b", "c"}
+    assert set(ratings.confidence_intervals("hive")) == {"a", "b", "c"}
+    assert [row[0] for row in ratings.leaderboard("hive")] == ["b", "a"]
@@ -0,0 +1,54 @@
+import random
+
+import numpy as np
+
+from agents.random_agent import RandomAgent
+from api.classes import Action
+from games.sea_battle import SeaBattle
+from games.sea_battle_batch import ACTIONS, HEADINGS, SeaBattleBatch
+
+
+def ships(game):
+    return [(player.location.xy, HEADINGS.index(player.location.heading), player.damage.damage) for player in game._players]
+
+def batch_ships(batch, b):
+    x, y = batch.positions()
+    return [((int(x[b, p]), int(y[b, p])), int(batch.heading[b, p]), int(batch.damage[b, p])) for p in range(batch.n_ships)]
+
+
+def test_step_matches_sea_battle():
+    random.seed(0)
+    rng = np.random.default_rng(0)
+    games = []
+    for _ in range(50):
+        game = SeaBattle(board_size=8, players_per_team=3, n_rocks=6, fast_mode=True)
+        game.init_game(RandomAgent, RandomAgent)
+        games.append(game)
+    batch = SeaBattleBatch.from_games(games)
+    over = [False] * len(games)
+
+    for _ in range(200):
+        actions = rng.integers(0, len(ACTIONS), (len(games), batch.n_ships))
+        scores, done = batch.step(actions)
+        for b, game in enumerate(games):
+            if over[b]:
+                continue
+            _, available_actions = game.get_observation(game._players[0].agent)
+            for player in game.players:
+                game.update(Action(action_id=ACTIONS[actions[b, player.agent.agent_id]]), available_actions, player.agent)
+            assert batch_ships(batch, b) == ships(game)
+            expected = game.scores()
+            assert done[b] == (expected is not None)
+            if expected is not None:
+                assert tuple(scores[b]) == expected
+                over[b] = True
+        if all(over):
+            break
+    assert all(over)
+
+
+def test_reset_without_finished_games():
+    batch = SeaBattleBatch(4, seed=0)
+    cell = batch.cell.copy()
+    batch.reset(np.zeros(4, dtype=bool))
+    assert (batch.cell == cell).all()